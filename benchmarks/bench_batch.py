@@ -0,0 +1,40 @@
+"""
+Multi-file lexing throughput with 1..N worker processes.
+
+    python -m benchmarks.bench_batch [num_files] [file_kb]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.lexer.batch import collect_inputs, lex_files
+from benchmarks.common import synthetic_source
+
+
+def main(argv):
+    num_files = int(argv[0]) if argv else 200
+    file_kb = int(argv[1]) if len(argv) > 1 else 16
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(num_files):
+            Path(tmp, f"file_{i:05}.src").write_text(synthetic_source(file_kb * 1024, seed=i), encoding="utf-8")
+        paths = collect_inputs([tmp])
+
+        baseline = None
+        jobs = 1
+        print(f"{num_files} files x {file_kb}KB, {cores} CPU(s)")
+        while True:
+            t0 = time.perf_counter()
+            tokens = sum(sum(r.counts.values()) for r in lex_files(paths, jobs=jobs))
+            elapsed = time.perf_counter() - t0
+            baseline = baseline or elapsed
+            print(f"  jobs={jobs:<3} {elapsed:7.2f}s  {tokens / elapsed:>12,.0f} tok/s  speedup x{baseline / elapsed:.2f}")
+            if jobs >= cores:
+                break
+            jobs = min(jobs * 2, cores)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+"""
+Throughput and peak RSS of the input modes on one large file: read() + Scanner,
+StreamScanner, read() + DFA and BytesScanner over mmap. Every mode runs in a
+fresh process, so ru_maxrss is the peak of that mode alone.
+
+    python -m benchmarks.bench_bytes [size_mb] [--unicode]   (default: 100 MB)
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.lexer.backends import BACKENDS
+from src.lexer.bytes_scanner import BytesScanner
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from benchmarks.common import synthetic_source, fmt_bytes
+
+
+def read_scanner(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in Scanner(f.read(), lazy=True))
+
+
+def stream(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in StreamScanner(f))
+
+
+def read_dfa(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in BACKENDS["dfa"](f.read(), lazy=True))
+
+
+def mmap_bytes(path: str) -> int:
+    with BytesScanner.from_file(path, lazy=True) as scanner:
+        return sum(1 for _ in scanner)
+
+
+MODES = {"read+scanner": read_scanner, "stream": stream, "read+dfa": read_dfa, "mmap+bytes": mmap_bytes}
+
+
+def child(mode: str, path: str):
+    t0 = time.perf_counter()
+    count = MODES[mode](path)
+    seconds = time.perf_counter() - t0
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({"tokens": count, "seconds": seconds, "peak": peak}))
+
+
+def write_input(size_mb: float, unicode: bool):
+    text = synthetic_source(int(size_mb * 1024 * 1024))
+    if unicode:
+        # Every fourth line gets non-ASCII identifiers and strings
+        lines = text.split("\n")
+        lines[::4] = [line.replace("counter", "счетчик").replace("value", "значение") for line in lines[::4]]
+        text = "\n".join(lines)
+    with tempfile.NamedTemporaryFile("w", suffix=".src", encoding="utf-8", delete=False) as f:
+        f.write(text)
+    print(f.name)
+
+
+def run_child(*args: str) -> str:
+    return subprocess.run([sys.executable, "-m", "benchmarks.bench_bytes", *args],
+                          check=True, capture_output=True, text=True).stdout
+
+
+def main(argv):
+    if argv[:1] == ["--child"]:
+        child(argv[1], argv[2])
+        return
+    unicode = "--unicode" in argv
+    sizes = [float(a) for a in argv if not a.startswith("--")]
+    size_mb = sizes[0] if sizes else 100
+    if argv[:1] == ["--write"]:
+        write_input(size_mb, unicode)
+        return
+    # The input is built in a child too: ru_maxrss survives exec, so the parent's
+    # peak with the whole text in memory would leak into every measurement
+    path = run_child("--write", str(size_mb), *(["--unicode"] if unicode else [])).strip()
+    try:
+        size = os.path.getsize(path)
+        print(f"{fmt_bytes(size)} input{' (non-ASCII lines)' if unicode else ''}")
+        print(f"{'mode':<14} {'time':>8} {'tok/s':>11} {'MB/s':>7} {'peak RSS':>10}")
+        expected = None
+        for mode in MODES:
+            result = json.loads(run_child("--child", mode, path))
+            if expected is None:
+                expected = result["tokens"]
+            assert result["tokens"] == expected, mode
+            seconds = result["seconds"]
+            print(f"{mode:<14} {seconds:>7.2f}s {result['tokens'] / seconds:>11,.0f} "
+                  f"{size / seconds / 2 ** 20:>7.2f} {fmt_bytes(result['peak']):>10}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""
+Reference Scanner vs table-driven DFAScanner: tokens per second and table load cost.
+
+    python -m benchmarks.bench_dfa [size_mb]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.lexer import lexgen
+from src.lexer.backends import BACKENDS
+from src.lexer.lexspec import RULES
+from benchmarks.common import synthetic_source
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main(argv):
+    size_mb = float(argv[0]) if argv else 1.0
+    source = synthetic_source(int(size_mb * 1024 * 1024))
+
+    _, compile_time = best_of(lambda: lexgen.compile_rules(RULES), repeat=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        lexgen.load_table(cache_dir=Path(tmp))
+        lexgen._loaded.clear()
+        _, load_time = best_of(lambda: lexgen.load_table(cache_dir=Path(tmp)), repeat=1)
+    print(f"table: compile {compile_time * 1000:.1f}ms, load from disk cache {load_time * 1000:.1f}ms")
+
+    reference = None
+    for name, scanner_class in BACKENDS.items():
+        tokens, elapsed = best_of(lambda: scanner_class(source)._tokens)
+        rate = len(tokens) / elapsed
+        reference = reference or rate
+        print(f"{name:>8}: {len(tokens)} tokens in {elapsed:.3f}s = {rate:,.0f} tok/s "
+              f"({size_mb / elapsed:.2f} MB/s, x{rate / reference:.2f})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+"""
+Error reporting cost on pathological inputs: a binary file read as text and
+error-heavy garbage. Compares the per-error stderr print with the
+DiagnosticCollector modes (everything, collapsed runs, capped, fail-fast).
+
+    python -m benchmarks.bench_diagnostics [megabytes]
+"""
+import contextlib
+import os
+import random
+import sys
+import time
+
+from src.lexer.diagnostics import DiagnosticCollector, TooManyErrors
+from src.lexer.dfa_scanner import DFAScanner
+from src.lexer.scanner import Scanner
+from benchmarks.corpus import corpus
+from benchmarks.common import fmt_bytes
+
+
+def binary_source(size_bytes: int, seed: int = 0) -> str:
+    """What the scanner sees when a binary file is decoded leniently (errors="replace")."""
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size_bytes)).decode("utf-8", "replace")
+
+
+def run(scanner_cls, source: str, collector_args):
+    """Scan to the end (or to the abort); returns (seconds, tokens, stored diagnostics, aborted)"""
+    # stderr is line buffered, like a terminal or a redirected file: one write per error line
+    with open(os.devnull, "w", buffering=1) as devnull, contextlib.redirect_stderr(devnull):
+        collector = DiagnosticCollector(**collector_args) if collector_args is not None else None
+        t0 = time.perf_counter()
+        tokens = 0
+        aborted = False
+        try:
+            for _ in scanner_cls(source, lazy=True, diagnostics=collector):
+                tokens += 1
+        except TooManyErrors:
+            aborted = True
+        if collector is not None:
+            stored = len(collector)
+            collector.render(sys.stderr)
+        else:
+            stored = 0
+        return time.perf_counter() - t0, tokens, stored, aborted
+
+
+MODES = [
+    ("print per error", None),
+    ("collect all", {"collapse": False}),
+    ("collapse runs", {}),
+    ("max 100", {"max_errors": 100}),
+    ("fail fast", {"abort": True}),
+]
+
+
+def main(argv):
+    megabytes = float(argv[0]) if argv else 1.0
+    size = int(megabytes * 1_000_000)
+    inputs = [("binary", binary_source(size)), ("garbage", corpus("garbage", size))]
+    for name, source in inputs:
+        print(f"{name}: {fmt_bytes(len(source))}")
+        for scanner_cls in (Scanner, DFAScanner):
+            for mode, collector_args in MODES:
+                seconds, tokens, stored, aborted = run(scanner_cls, source, collector_args)
+                rate = f"aborted after {tokens} tokens" if aborted else f"{tokens / seconds:,.0f} tok/s"
+                print(f"  {scanner_cls.__name__:<11}{mode:<17}{seconds:>8.3f}s{rate:>26}{stored:>10,} diagnostics")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+Bulk sub-scanners (re.match runs, str.find for '*/', '"' and '\\n') against the
+previous character-at-a-time loops through _peek/_advance, per corpus.
+
+    python -m benchmarks.bench_fast_paths [kilobytes] [scenario ...]
+"""
+import io
+import sys
+import time
+
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.tokens import KEYWORDS, TokenType
+from benchmarks.corpus import SCENARIOS, corpus
+
+DEFAULT_SCENARIOS = ["comments", "identifiers", "strings", "whitespace", "numbers", "mixed"]
+
+
+class CharByCharScanner(Scanner):
+    """The sub-scanners as they were before the fast paths (reference for timing and output)"""
+
+    def _scan_token(self):
+        c = self._source[self._current]
+        if c in (' ', '\r', '\t', '\n'):
+            self._advance()
+        elif c == '/' and self._peek_next() == '/':
+            self._current += 2
+            while self._peek() != '\n' and not self._is_at_source_end():
+                self._advance()
+        elif c == '/' and self._peek_next() == '*':
+            self._current += 2
+            while not self._is_at_source_end():
+                if self._peek() == '*' and self._peek_next() == '/':
+                    self._current += 2
+                    return
+                self._advance()
+            self._add_error_token("Незавершенный многострочный комментарий (EOF)")
+        else:
+            super()._scan_token()
+
+    def _string(self):
+        while self._peek() != '"' and not self._is_at_source_end():
+            if self._peek() == '\n':
+                self._add_error_token("Незавершенная строка (перенос в строке)")
+                return
+            self._advance()
+        if self._is_at_source_end():
+            self._add_error_token("Незавершенная строка (достигнут конец файла)")
+            return
+        self._advance()
+        self._add_token(TokenType.STRING_LITERAL, self._source[self._start + 1:self._current - 1])
+
+    def _number(self):
+        while self._peek().isdigit():
+            self._advance()
+        is_float = self._peek() == '.' and self._peek_next().isdigit()
+        if is_float:
+            self._advance()
+            while self._peek().isdigit():
+                self._advance()
+        text = self._source[self._start:self._current]
+        try:
+            value = float(text) if is_float else int(text)
+        except ValueError:
+            self._add_error_token(f"Некорректный числовой литерал '{text}'")
+            return
+        self._add_token(TokenType.FLOAT_LITERAL if is_float else TokenType.INT_LITERAL, value)
+
+    def _identifier(self):
+        while self._is_alphanumeric_or_underscore(self._peek()):
+            self._advance()
+        text = self._source[self._start:self._current]
+        if len(text) > 255:
+            self._add_error_token(f"Идентификатор слишком длинный ({len(text)} > 255)")
+            return
+        type_t = KEYWORDS.get(text, TokenType.IDENTIFIER)
+        if type_t in (TokenType.KW_TRUE, TokenType.KW_FALSE):
+            self._add_token(TokenType.BOOL_LITERAL, type_t == TokenType.KW_TRUE)
+        elif type_t == TokenType.IDENTIFIER:
+            self._add_token(TokenType.IDENTIFIER, text)
+        else:
+            self._add_token(type_t)
+
+
+def best(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv):
+    kilobytes = int(argv[0]) if argv else 500
+    names = argv[1:] or DEFAULT_SCENARIOS
+    print(f"{'corpus':<12}{'char-by-char':>14}{'bulk':>10}{'speedup':>9}{'stream':>10}")
+    for name in names:
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}")
+        source = corpus(name, kilobytes * 1000)
+        # Error-heavy corpora print to stderr; collect instead so the output stays readable
+        old_stderr, sys.stderr = sys.stderr, io.StringIO()
+        try:
+            reference = CharByCharScanner(source)._tokens
+            assert Scanner(source)._tokens == reference, name
+            slow = best(lambda: CharByCharScanner(source))
+            fast = best(lambda: Scanner(source))
+            stream = best(lambda: list(StreamScanner(io.StringIO(source))))
+        finally:
+            sys.stderr = old_stderr
+        print(f"{name:<12}{slow:>13.3f}s{fast:>9.3f}s{slow / fast:>8.1f}x{stream:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
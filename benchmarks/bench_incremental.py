@@ -0,0 +1,49 @@
+"""
+Per-edit latency of incremental re-lexing vs a full re-scan, against file size.
+"read tokens" is the extra cost of then reading snapshot.tokens as a list,
+which applies the pending line shift to every token after a newline edit.
+
+    python -m benchmarks.bench_incremental [size_kb ...]
+"""
+import sys
+import time
+
+from src.lexer.scanner import Scanner
+from src.lexer.incremental import LexSnapshot, TextEdit
+from benchmarks.common import synthetic_source
+
+EDITS = {
+    "type char": lambda src: TextEdit(len(src) // 2, 0, "x"),
+    "newline": lambda src: TextEdit(len(src) // 2, 0, "\n"),
+    "open /*": lambda src: TextEdit(src.index("\n", len(src) // 2) + 1, 0, "/*"),
+}
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [16, 64, 256, 1024]
+    print(f"{'size':>8} {'edit':>10} {'incremental':>12} {'read tokens':>12} {'rescanned':>10} {'full scan':>10}")
+    for size_kb in sizes:
+        source = synthetic_source(size_kb * 1024)
+        snapshot = LexSnapshot.from_source(source)
+        full = timed(lambda: Scanner(source), repeat=1)
+        for name, make_edit in EDITS.items():
+            edit = make_edit(source)
+            elapsed = timed(lambda: snapshot.apply_edit(*edit))
+            edited = [snapshot.apply_edit(*edit) for _ in range(5)]
+            read = timed(lambda: edited.pop().tokens)
+            rescanned = snapshot.apply_edit(*edit).rescanned_tokens
+            print(f"{size_kb:>6}KB {name:>10} {elapsed * 1000:>10.2f}ms {read * 1000:>10.2f}ms "
+                  f"{rescanned:>10} {full * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
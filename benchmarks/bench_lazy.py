@@ -0,0 +1,43 @@
+"""
+Eager vs lazy Scanner: time-to-first-token, total time and peak memory.
+
+    python -m benchmarks.bench_lazy [size_mb ...]
+"""
+import sys
+import time
+
+from src.lexer.scanner import Scanner
+from src.lexer.tokens import TokenType
+from benchmarks.common import synthetic_source, measure, fmt_bytes
+
+
+def first_token(source: str, lazy: bool):
+    t0 = time.perf_counter()
+    token = Scanner(source, lazy=lazy).next_token()
+    return token, time.perf_counter() - t0
+
+
+def drain(source: str, lazy: bool) -> int:
+    scanner = Scanner(source, lazy=lazy)
+    count = 0
+    while True:
+        token = scanner.next_token()
+        count += 1
+        if token.type == TokenType.END_OF_FILE:
+            return count
+
+
+def main(argv):
+    sizes = [float(a) for a in argv] or [1, 4]
+    print(f"{'size':>8} {'mode':>6} {'first token':>12} {'total':>9} {'tokens':>9} {'peak mem':>11}")
+    for size_mb in sizes:
+        source = synthetic_source(int(size_mb * 1024 * 1024))
+        for lazy in (False, True):
+            _, ttft = first_token(source, lazy)
+            count, elapsed, peak = measure(drain, source, lazy)
+            mode = "lazy" if lazy else "eager"
+            print(f"{size_mb:>6.1f}MB {mode:>6} {ttft * 1000:>10.2f}ms {elapsed:>8.2f}s {count:>9} {fmt_bytes(peak):>11}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,46 @@
+"""
+Speedup of lex_parallel on one large file against the core count.
+
+The baseline is a single eager Scanner over the whole text. Every row reports
+the wall time of lex_parallel with N worker processes (pool start-up, chunk
+transfer and the sequential fix-up pass included), the speedup over the
+baseline, the number of chunks and how many chunk guesses were wrong.
+
+    python -m benchmarks.bench_parallel [size_mb] [--jobs N ...]   (default: 20 MB, 1..cpu_count)
+"""
+import argparse
+import os
+import time
+
+from src.lexer.parallel import lex_parallel
+from src.lexer.scanner import Scanner
+from benchmarks.common import synthetic_source
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parallel",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("size", type=float, nargs="?", default=20, help="source size, MB")
+    parser.add_argument("--jobs", type=int, nargs="+", help="worker counts (default: powers of two up to cpu_count)")
+    args = parser.parse_args()
+    cpus = os.cpu_count() or 1
+    jobs_list = args.jobs or sorted({1, cpus} | {2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus})
+
+    source = synthetic_source(int(args.size * 1024 * 1024))
+    t0 = time.perf_counter()
+    expected = Scanner(source)._tokens
+    baseline = time.perf_counter() - t0
+    print(f"{args.size:.0f} MB, {len(expected):,} tokens, {cpus} CPUs")
+    print(f"{'jobs':>5} {'time':>8} {'speedup':>8} {'chunks':>7} {'mispredicted':>13}")
+    print(f"{'Scanner':>5} {baseline:>7.2f}s {1:>7.2f}x")
+    for jobs in jobs_list:
+        t0 = time.perf_counter()
+        result = lex_parallel(source, jobs)
+        elapsed = time.perf_counter() - t0
+        assert result.tokens == expected
+        print(f"{jobs:>5} {elapsed:>7.2f}s {baseline / elapsed:>7.2f}x {result.chunks:>7} "
+              f"{len(result.mispredicted):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Write and load throughput of the token output formats: text, jsonl and binary.
+
+    python -m benchmarks.bench_serialize [megabytes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from src.lexer.dfa_scanner import DFAScanner
+from src.lexer.serialize import TokenFile, format_token, read_jsonl, write_binary, write_lines
+from src.lexer.tokens import TokenType
+from benchmarks.common import synthetic_source, fmt_bytes
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def parse_text_line(line: str) -> tuple:
+    """What a downstream tool has to do with the text format: split it back into fields."""
+    position, type_name, rest = line.split(" ", 2)
+    line_no, column = position.split(":")
+    return TokenType[type_name], rest, int(line_no), int(column)
+
+
+def write_text(tokens, path, fmt):
+    with open(path, "w", encoding="utf-8") as f:
+        write_lines((format_token(t, fmt) for t in tokens), f)
+
+
+def write_bin(tokens, path):
+    with open(path, "wb") as f:
+        write_binary(tokens, f)
+
+
+def load_text(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in map(parse_text_line, f.read().splitlines()))
+
+
+def load_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in read_jsonl(f))
+
+
+def load_binary(path):
+    with TokenFile(path) as tokens:
+        return sum(1 for _ in tokens)
+
+
+def scan_binary_raw(path):
+    with TokenFile(path) as tokens:
+        return sum(1 for _ in tokens.raw_records())
+
+
+def main(argv):
+    megabytes = float(argv[0]) if argv else 4.0
+    source = synthetic_source(int(megabytes * 1024 * 1024))
+    tokens = list(DFAScanner(source, lazy=True))
+    count = len(tokens)
+    print(f"{count:,} tokens from {fmt_bytes(len(source))} of source")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {fmt: os.path.join(tmp, f"tokens.{fmt}") for fmt in ("text", "jsonl", "binary")}
+        _, t_text = timed(lambda: write_text(tokens, paths["text"], "text"))
+        _, t_jsonl = timed(lambda: write_text(tokens, paths["jsonl"], "jsonl"))
+        _, t_bin = timed(lambda: write_bin(tokens, paths["binary"]))
+        writes = {"text": t_text, "jsonl": t_jsonl, "binary": t_bin}
+
+        loads = {}
+        for fmt, load in (("text", load_text), ("jsonl", load_jsonl), ("binary", load_binary)):
+            loaded, loads[fmt] = timed(lambda: load(paths[fmt]))
+            assert loaded == count
+        raw, t_raw = timed(lambda: scan_binary_raw(paths["binary"]))
+        assert raw == count
+
+        print(f"  {'format':<8}{'size':>12}{'write tok/s':>14}{'load tok/s':>14}")
+        for fmt in ("text", "jsonl", "binary"):
+            size = os.path.getsize(paths[fmt])
+            print(f"  {fmt:<8}{fmt_bytes(size):>12}{count / writes[fmt]:>14,.0f}{count / loads[fmt]:>14,.0f}")
+        print(f"  binary records only (no string decoding): {count / t_raw:,.0f} tok/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,123 @@
+"""
+Latency and throughput of the lexing server under concurrent editor load,
+against starting ``python -m src.lexer`` for every request.
+
+Each client opens its own document, then repeatedly types one character
+(didChange with a range edit) and asks for semantic tokens (full/delta, as an
+editor does after each keystroke) or re-requests the cached full result.
+
+    python -m benchmarks.bench_server [kilobytes] [requests_per_client] [clients ...]
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.lexer.server import encode_message, read_message
+from benchmarks.common import synthetic_source
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(backend: str = "scanner"):
+    process = subprocess.Popen([sys.executable, "-m", "src.lexer.server", "--port", "0", "--backend", backend],
+                               cwd=ROOT_DIR, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    return process, int(line.rsplit(":", 1)[1])
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    async def notify(self, method: str, params: dict):
+        self.writer.write(encode_message({"jsonrpc": "2.0", "method": method, "params": params}))
+
+    async def request(self, method: str, params: dict):
+        self.next_id += 1
+        self.writer.write(encode_message({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}))
+        await self.writer.drain()
+        response = json.loads(await read_message(self.reader))
+        assert response.get("id") == self.next_id and "error" not in response, response
+        return response["result"]
+
+
+async def editor_session(port: int, n: int, source: str, requests: int, latencies: list):
+    client = Client(*await asyncio.open_connection("127.0.0.1", port))
+    uri = f"file:///bench{n}.src"
+    await client.request("initialize", {})
+    await client.notify("textDocument/didOpen", {"textDocument": {"uri": uri, "version": 1, "text": source}})
+    result = await client.request("textDocument/semanticTokens/full", {"textDocument": {"uri": uri}})
+    result_id = result["resultId"]
+    for i in range(requests):
+        t0 = time.perf_counter()
+        if i % 2 == 0:
+            # Keystroke: insert one character in the middle of line i, then refresh the highlighting
+            position = {"line": i % 50, "character": 4}
+            await client.notify("textDocument/didChange", {
+                "textDocument": {"uri": uri, "version": i + 2},
+                "contentChanges": [{"range": {"start": position, "end": position}, "text": "q"}],
+            })
+            result = await client.request("textDocument/semanticTokens/full/delta",
+                                          {"textDocument": {"uri": uri}, "previousResultId": result_id})
+            result_id = result["resultId"]
+        else:
+            await client.request("textDocument/semanticTokens/full", {"textDocument": {"uri": uri}})
+        latencies.append(time.perf_counter() - t0)
+    client.writer.close()
+
+
+async def load(port: int, clients: int, source: str, requests: int):
+    latencies: list = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(editor_session(port, n, source, requests, latencies) for n in range(clients)))
+    return time.perf_counter() - t0, latencies
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def cold_cli(source: str, runs: int = 5) -> float:
+    with tempfile.NamedTemporaryFile("w", suffix=".src", encoding="utf-8", delete=False) as f:
+        f.write(source)
+    try:
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "src.lexer", f.name, "--format", "jsonl"], cwd=ROOT_DIR,
+                           stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - t0)
+        return statistics.median(times)
+    finally:
+        os.unlink(f.name)
+
+
+def main(argv):
+    kilobytes = int(argv[0]) if argv else 20
+    requests = int(argv[1]) if len(argv) > 1 else 200
+    client_counts = [int(a) for a in argv[2:]] or [1, 8, 32]
+    source = synthetic_source(kilobytes * 1000)
+
+    print(f"document {len(source) / 1000:.0f} KB, {requests} requests per client")
+    print(f"  cold 'python -m src.lexer' per request: {cold_cli(source) * 1000:8.1f} ms")
+    process, port = start_server()
+    try:
+        print(f"  {'clients':>7}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for clients in client_counts:
+            seconds, latencies = asyncio.run(load(port, clients, source, requests))
+            print(f"  {clients:>7}{len(latencies) / seconds:>10,.0f}{percentile(latencies, 0.5) * 1000:>9.2f}"
+                  f"{percentile(latencies, 0.95) * 1000:>9.2f}{percentile(latencies, 0.99) * 1000:>9.2f}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+"""
+Cost of the SourceMap line index: building it with a str.find loop into an
+array vs str.split plus accumulated line lengths (time and tracemalloc peak),
+resolving positions with bisect, and rendering error snippets. Also the time
+to the first token of a lazy Scanner, which must not build the index.
+
+    python -m benchmarks.bench_source_map [megabytes]
+"""
+import random
+import sys
+import time
+from array import array
+from itertools import accumulate
+
+from src.lexer.scanner import Scanner
+from src.lexer.source_map import SourceMap
+from benchmarks.common import synthetic_source, fmt_bytes, measure
+
+
+def split_accumulate(source: str) -> array:
+    """The bulk alternative: faster, but holds one string per line while building"""
+    lines = source.split('\n')
+    lines.pop()
+    starts = array('q', [0])
+    starts.extend(accumulate(map((1).__add__, map(len, lines))))
+    return starts
+
+
+def best(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv):
+    megabytes = float(argv[0]) if argv else 10.0
+    source = synthetic_source(int(megabytes * 1_000_000))
+    source_map = SourceMap(source)
+    assert split_accumulate(source) == source_map.line_starts
+    print(f"{fmt_bytes(len(source))}, {len(source_map):,} lines")
+
+    for name, build in (("str.find loop", SourceMap), ("split + accumulate", split_accumulate)):
+        peak = measure(build, source)[2]
+        print(f"  build ({name + ')':<19} {best(lambda: build(source)):>8.3f}s  peak {fmt_bytes(peak)}")
+    _, elapsed, peak = measure(lambda s: Scanner(s, lazy=True).next_token(), source)
+    print(f"  lazy Scanner first token   {elapsed * 1000:>8.2f}ms peak {fmt_bytes(peak)}")
+
+    offsets = random.Random(0).sample(range(len(source)), 100_000)
+    seconds = best(lambda: [source_map.position(offset) for offset in offsets])
+    print(f"  position (bisect)          {len(offsets) / seconds:>12,.0f} lookups/s")
+    seconds = best(lambda: [source_map.snippet(offset, 3) for offset in offsets[:10_000]])
+    print(f"  snippet                    {10_000 / seconds:>12,.0f} snippets/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
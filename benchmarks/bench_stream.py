@@ -0,0 +1,41 @@
+"""
+Peak memory of streaming input vs reading the whole file, against input size.
+
+    python -m benchmarks.bench_stream [size_mb ...]
+"""
+import os
+import sys
+import tempfile
+
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from benchmarks.common import synthetic_source, measure, fmt_bytes
+
+
+def read_whole(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in Scanner(f.read(), lazy=True))
+
+
+def stream(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in StreamScanner(f))
+
+
+def main(argv):
+    sizes = [float(a) for a in argv] or [0.5, 1, 2]
+    print(f"{'size':>8} {'read()':>12} {'stream':>12} {'tokens':>9}")
+    for size_mb in sizes:
+        with tempfile.NamedTemporaryFile("w", suffix=".src", encoding="utf-8", delete=False) as f:
+            f.write(synthetic_source(int(size_mb * 1024 * 1024)))
+        try:
+            count, _, whole_peak = measure(read_whole, f.name)
+            streamed, _, stream_peak = measure(stream, f.name)
+        finally:
+            os.unlink(f.name)
+        assert streamed == count
+        print(f"{size_mb:>6.1f}MB {fmt_bytes(whole_peak):>12} {fmt_bytes(stream_peak):>12} {count:>9}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
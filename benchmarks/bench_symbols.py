@@ -0,0 +1,69 @@
+"""
+Retained memory of identifier tokens with interning (one string per distinct
+name plus a symbol_id) vs a fresh lexeme and value slice per occurrence, and
+the cost of comparing identifiers by string vs by symbol_id.
+
+    python -m benchmarks.bench_symbols [megabytes] [files]
+"""
+import sys
+import time
+
+from src.lexer.scanner import Scanner
+from src.lexer.symbols import SymbolTable
+from src.lexer.tokens import TokenType
+from benchmarks.bench_token_buffer import retained
+from benchmarks.common import synthetic_source, fmt_bytes
+
+
+class UninternedScanner(Scanner):
+    """Identifiers as before interning: two separate slices of the source per token"""
+
+    def _add_identifier(self, text: str):
+        self._add_token(TokenType.IDENTIFIER, self._source[self._start:self._current])
+
+
+def distinct_strings(tokens) -> int:
+    return len({id(t.lexeme) for t in tokens if t.type == TokenType.IDENTIFIER} |
+               {id(t.literal_value) for t in tokens if t.type == TokenType.IDENTIFIER})
+
+
+def count_matches(tokens, key) -> float:
+    """Downstream-style lookup: how often each identifier occurs, keyed by ``key(token)``"""
+    t0 = time.perf_counter()
+    counts = {}
+    for token in tokens:
+        if token.type == TokenType.IDENTIFIER:
+            k = key(token)
+            counts[k] = counts.get(k, 0) + 1
+    return time.perf_counter() - t0
+
+
+def main(argv):
+    megabytes = float(argv[0]) if argv else 2.0
+    files = int(argv[1]) if len(argv) > 1 else 4
+    # One compilation: several files written in the same style (shared names such as 'ratio', 'msg')
+    sources = [synthetic_source(int(megabytes * 1_000_000 / files), seed=i) for i in range(files)]
+
+    plain, plain_bytes, _, plain_time = retained(lambda: [UninternedScanner(s)._tokens for s in sources])
+    table = SymbolTable()
+    interned, interned_bytes, _, interned_time = retained(
+        lambda: [Scanner(s, symbols=table)._tokens for s in sources])
+    assert plain == interned
+
+    tokens = [t for file_tokens in interned for t in file_tokens]
+    identifiers = sum(1 for t in tokens if t.type == TokenType.IDENTIFIER)
+    print(f"{files} files, {fmt_bytes(sum(map(len, sources)))}, {len(tokens):,} tokens, "
+          f"{identifiers:,} identifiers, {len(table):,} distinct names")
+    plain_tokens = [t for file_tokens in plain for t in file_tokens]
+    print(f"  separate slices: retained {fmt_bytes(plain_bytes):>10}, "
+          f"{distinct_strings(plain_tokens):>9,} identifier strings, {plain_time:.2f}s")
+    print(f"  interned:        retained {fmt_bytes(interned_bytes):>10}, "
+          f"{distinct_strings(tokens):>9,} identifier strings, {interned_time:.2f}s")
+    print(f"  saved {fmt_bytes(plain_bytes - interned_bytes)} ({1 - interned_bytes / plain_bytes:.1%})")
+    by_name = count_matches(tokens, lambda t: t.lexeme)
+    by_id = count_matches(tokens, lambda t: t.symbol_id)
+    print(f"  occurrence count keyed by name {by_name * 1000:.1f} ms, by symbol_id {by_id * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
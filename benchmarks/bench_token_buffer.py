@@ -0,0 +1,52 @@
+"""
+Retained memory of the token list vs the compact TokenBuffer.
+
+    python -m benchmarks.bench_token_buffer [million_tokens]
+"""
+import sys
+import time
+import tracemalloc
+
+from src.lexer.dfa_scanner import DFAScanner
+from src.lexer.token_buffer import TokenBuffer
+from benchmarks.common import synthetic_source, fmt_bytes
+
+# The synthetic corpus yields roughly one token per 6.5 characters
+CHARS_PER_TOKEN = 6.5
+
+
+def retained(build):
+    """Memory still held by the result of ``build()`` after it returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - t0
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before, peak - before, elapsed
+
+
+def main(argv):
+    millions = float(argv[0]) if argv else 1.0
+    source = synthetic_source(int(millions * 1_000_000 * CHARS_PER_TOKEN))
+
+    tokens, list_bytes, list_peak, list_time = retained(lambda: list(DFAScanner(source, lazy=True)))
+    count = len(tokens)
+    del tokens
+    buffer, buf_bytes, buf_peak, buf_time = retained(
+        lambda: TokenBuffer.from_tokens(source, DFAScanner(source, lazy=True)))
+    assert len(buffer) == count
+
+    print(f"{count:,} tokens from {fmt_bytes(len(source))} of source")
+    print(f"  list[Token]: retained {fmt_bytes(list_bytes):>10} ({list_bytes / count:6.1f} B/token), "
+          f"peak {fmt_bytes(list_peak)}, {list_time:.2f}s")
+    print(f"  TokenBuffer: retained {fmt_bytes(buf_bytes):>10} ({buf_bytes / count:6.1f} B/token), "
+          f"peak {fmt_bytes(buf_peak)}, {buf_time:.2f}s")
+    print(f"  reduction: x{list_bytes / buf_bytes:.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,79 @@
+"""
+Backtracking parser access patterns: the whole eager token list vs TokenStream
+(ring buffer with mark/reset) over a lazy Scanner and over StreamScanner
+reading the file.
+
+Every 8th token the "parser" marks, looks 4 tokens ahead, consumes 6 tokens,
+backtracks and releases the mark, the way a recursive-descent parser tries an
+alternative. Reports time and the tracemalloc peak.
+
+    python -m benchmarks.bench_token_stream [size_mb ...]
+"""
+import os
+import sys
+import tempfile
+
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.token_stream import TokenStream
+from src.lexer.tokens import TokenType
+from benchmarks.common import synthetic_source, measure, fmt_bytes
+
+
+def eager_list(source: str) -> int:
+    tokens = Scanner(source)._tokens
+    pos = count = 0
+    while tokens[pos].type != TokenType.END_OF_FILE:
+        if pos % 8 == 0:
+            # Backtracking over a list is free: look ahead and return by index
+            tokens[min(pos + 4, len(tokens) - 1)]
+        pos += 1
+        count += 1
+    return count
+
+
+def drive(stream: TokenStream) -> int:
+    count = 0
+    while not stream.at_end():
+        if stream.position % 8 == 0:
+            mark = stream.mark()
+            stream.peek(4)
+            for _ in range(6):
+                stream.next()
+            stream.reset(mark)
+            stream.release(mark)
+        stream.next()
+        count += 1
+    return count
+
+
+def lazy_stream(source: str) -> int:
+    return drive(TokenStream(Scanner(source, lazy=True)))
+
+
+def streamed(path: str) -> int:
+    with open(path, "rb") as f:
+        return drive(TokenStream(StreamScanner(f)))
+
+
+def main(argv):
+    sizes = [float(a) for a in argv] or [1, 4]
+    print(f"{'size':>8} {'mode':>22} {'time':>8} {'peak mem':>11}")
+    for size_mb in sizes:
+        source = synthetic_source(int(size_mb * 1024 * 1024))
+        with tempfile.NamedTemporaryFile("w", suffix=".src", encoding="utf-8", delete=False) as f:
+            f.write(source)
+        counts = set()
+        try:
+            for name, fn, arg in (("eager list", eager_list, source), ("TokenStream(lazy)", lazy_stream, source),
+                                  ("TokenStream(stream)", streamed, f.name)):
+                count, elapsed, peak = measure(fn, arg)
+                counts.add(count)
+                print(f"{size_mb:>6.1f}MB {name:>22} {elapsed:>7.2f}s {fmt_bytes(peak):>11}")
+        finally:
+            os.unlink(f.name)
+        assert len(counts) == 1
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
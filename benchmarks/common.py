@@ -0,0 +1,54 @@
+"""Shared helpers for the lexer benchmarks (run from the repository root)."""
+import random
+import time
+import tracemalloc
+
+SNIPPET_LINES = [
+    "fn compute_{n}(int a, float b) {{",
+    "    int counter_{n} = {n} + a * 42;",
+    "    float ratio = 3.1415 / b;",
+    "    // single line comment number {n}",
+    '    string msg = "value {n}";',
+    "    /* block comment",
+    "       spanning lines */",
+    "    if (counter_{n} >= 40 && ratio != 0.5 || !false) {{",
+    "        counter_{n} += 1;",
+    "    }}",
+    "    return counter_{n};",
+    "}}",
+]
+
+
+def synthetic_source(size_bytes: int, seed: int = 0) -> str:
+    """Build a deterministic, valid source of roughly ``size_bytes`` characters."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    n = 0
+    while total < size_bytes:
+        line = SNIPPET_LINES[n % len(SNIPPET_LINES)].format(n=rng.randrange(1_000_000))
+        parts.append(line)
+        total += len(line) + 1
+        n += 1
+    return "\n".join(parts) + "\n"
+
+
+def measure(fn, *args, **kwargs):
+    """Run ``fn`` once and return ``(result, seconds, peak_bytes)`` measured by tracemalloc."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
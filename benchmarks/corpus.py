@@ -0,0 +1,154 @@
+"""
+Deterministic synthetic corpora, one per scanner path.
+
+Every scenario is a function ``(rng, size_bytes) -> str`` registered in
+SCENARIOS; ``corpus(name, size_bytes, seed)`` returns the same text for the
+same arguments on every run and platform.
+"""
+import random
+import string
+from typing import Callable, Dict, List
+
+from benchmarks.common import synthetic_source
+
+MAX_IDENTIFIER = 255
+
+# Two-character operators first so that the corpus hits the _match() branches
+OPERATORS = ["+=", "-=", "*=", "/=", "==", "!=", "<=", ">=", "&&", "||",
+             "+", "-", "*", "/", "%", "=", "!", "<", ">", "(", ")", "{", "}",
+             "[", "]", ";", ",", ":"]
+KEYWORDS = ["if", "else", "while", "for", "int", "float", "bool", "return",
+            "true", "false", "void", "struct", "fn"]
+IDENT_CHARS = string.ascii_letters + string.digits + "_"
+# Characters the scanner rejects, including lone '&' / '|' and non-ASCII symbols
+GARBAGE_CHARS = "@#$`~?\\'^.&|§€¤"
+
+Scenario = Callable[[random.Random, int], str]
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(fn: Scenario) -> Scenario:
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+def _fill_lines(rng: random.Random, size_bytes: int, make_line: Callable[[random.Random], str]) -> str:
+    lines: List[str] = []
+    total = 0
+    while total < size_bytes:
+        line = make_line(rng)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _identifier(rng: random.Random, length: int) -> str:
+    return rng.choice(string.ascii_letters + "_") + "".join(rng.choices(IDENT_CHARS, k=length - 1))
+
+
+@scenario
+def operators(rng: random.Random, size_bytes: int) -> str:
+    """Operators and punctuation separated by single spaces (never forming a comment)."""
+    def line(rng):
+        return " ".join(rng.choice(OPERATORS) if i % 4 else rng.choice("abcxyz")
+                        for i in range(rng.randint(20, 60)))
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def identifiers(rng: random.Random, size_bytes: int) -> str:
+    """Long identifiers around the 255-character limit; about 2% exceed it."""
+    def line(rng):
+        length = MAX_IDENTIFIER - rng.randint(0, 40)
+        if rng.random() < 0.02:
+            length = MAX_IDENTIFIER + rng.randint(1, 10)
+        keyword = rng.choice(KEYWORDS)
+        return f"{keyword} {_identifier(rng, length)} = {_identifier(rng, rng.randint(1, 12))};"
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def numbers(rng: random.Random, size_bytes: int) -> str:
+    """Integer and float literals, including values beyond 64 bits."""
+    def number(rng):
+        kind = rng.random()
+        if kind < 0.5:
+            return str(rng.randrange(10 ** rng.randint(1, 9)))
+        if kind < 0.9:
+            return f"{rng.randrange(100000)}.{rng.randrange(10 ** rng.randint(1, 6))}"
+        return str(rng.randrange(10 ** 30))
+    return _fill_lines(rng, size_bytes, lambda rng: ", ".join(number(rng) for _ in range(rng.randint(8, 16))) + ";")
+
+
+@scenario
+def comments(rng: random.Random, size_bytes: int) -> str:
+    """Long // lines and multi-line /* */ blocks with little code between them."""
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "*", "/", "\"", "//"]
+
+    def text(rng, count):
+        return " ".join(rng.choice(words) for _ in range(count))
+
+    def line(rng):
+        if rng.random() < 0.5:
+            return "// " + text(rng, rng.randint(20, 40))
+        body = "\n".join(" * " + text(rng, rng.randint(10, 20)) for _ in range(rng.randint(3, 10)))
+        return f"/*\n{body}\n */ int x;"
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def strings(rng: random.Random, size_bytes: int) -> str:
+    """String literals of varied length, including non-ASCII text and comment markers."""
+    alphabet = string.ascii_letters + string.digits + " .,;:/*-+=()" + "жукёЁ€"
+
+    def line(rng):
+        parts = ('"' + "".join(rng.choices(alphabet, k=rng.randint(0, 120))) + '"'
+                 for _ in range(rng.randint(1, 4)))
+        return "string s = " + " + ".join(parts) + ";"
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def whitespace(rng: random.Random, size_bytes: int) -> str:
+    """Sparse code buried in spaces, tabs, CRLF line ends and blank lines."""
+    def gap(rng):
+        return "".join(rng.choices(" \t", k=rng.randint(1, 30)))
+
+    def line(rng):
+        blank = "\r\n" * rng.randint(0, 4)
+        return f"{blank}{gap(rng)}x{gap(rng)}={gap(rng)}{rng.randrange(100)}{gap(rng)};{gap(rng)}\r"
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def garbage(rng: random.Random, size_bytes: int) -> str:
+    """Error-heavy input: invalid characters and unterminated strings."""
+    def line(rng):
+        parts = []
+        for _ in range(rng.randint(5, 20)):
+            kind = rng.random()
+            if kind < 0.6:
+                parts.append("".join(rng.choices(GARBAGE_CHARS, k=rng.randint(1, 8))))
+            elif kind < 0.9:
+                parts.append(_identifier(rng, rng.randint(1, 8)))
+            else:
+                parts.append('"unterminated')
+                break
+        return " ".join(parts)
+    return _fill_lines(rng, size_bytes, line)
+
+
+@scenario
+def mixed(rng: random.Random, size_bytes: int) -> str:
+    """Realistic program text (the corpus of the other benchmarks)."""
+    return synthetic_source(size_bytes, seed=rng.randrange(1 << 30))
+
+
+def corpus(name: str, size_bytes: int, seed: int = 0) -> str:
+    """Source text of roughly size_bytes characters for the named scenario"""
+    try:
+        generate = SCENARIOS[name]
+    except KeyError:
+        raise ValueError(f"Unknown scenario {name!r}; available: {', '.join(SCENARIOS)}")
+    # The seed is mixed with the name so that scenarios do not share random streams
+    return generate(random.Random(f"{name}:{seed}"), size_bytes)
@@ -0,0 +1,332 @@
+"""
+Differential fuzzing of the scanner backends and modes against the reference Scanner.
+
+Every case is a random source assembled from fragments that favour the tricky
+paths of the scanner: comment delimiters split across fragments, '3.' followed
+by a non-digit, lone '&' and '|', identifiers of exactly 255 and 256
+characters, strings unterminated at a line end or at EOF, non-ASCII letters
+and digits. Each mode scans the case and must produce the same tokens (one
+more next_token() past the end included) and, where the mode reports them,
+the same diagnostics as Scanner. A divergence is shrunk to a small reproducer
+by delta debugging.
+
+Cases are numbered: case ``(seed, index)`` is the same source on every run, so
+a failure can be replayed with ``--replay INDEX``.
+
+    python -m benchmarks.fuzz                               # 100k cases, all modes
+    python -m benchmarks.fuzz --cases 5000000 -j 8
+    python -m benchmarks.fuzz --mode dfa --mode stream-1 --seed 7
+    python -m benchmarks.fuzz --replay 123456 --seed 7
+"""
+import argparse
+import io
+import os
+import random
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.lexer.backends import BACKENDS
+from src.lexer.bytes_scanner import BytesScanner
+from src.lexer.diagnostics import DiagnosticCollector
+from src.lexer.incremental import LexSnapshot, TextEdit, relex
+from src.lexer.parallel import lex_parallel
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.tokens import Token
+from benchmarks.corpus import GARBAGE_CHARS, IDENT_CHARS, KEYWORDS, MAX_IDENTIFIER, OPERATORS
+
+# Tokens as strings, and diagnostics as tuples (None when the mode does not report them)
+Outcome = Tuple[List[str], Optional[List[tuple]]]
+
+BATCH_SIZE = 500
+
+
+# --- Source generation ---------------------------------------------------------
+
+def _identifier(rng: random.Random) -> str:
+    if rng.random() < 0.05:
+        length = rng.choice([MAX_IDENTIFIER - 1, MAX_IDENTIFIER, MAX_IDENTIFIER + 1])
+    else:
+        length = rng.choice([1, 1, 2, 3, 5, 8])
+    return rng.choice(string.ascii_letters + "_") + "".join(rng.choices(IDENT_CHARS, k=length - 1))
+
+
+def _unicode_word(rng: random.Random) -> str:
+    return "".join(rng.choices("щжЁé_aZ1٣²½ǅ", k=rng.randint(1, 6)))
+
+
+def _number(rng: random.Random) -> str:
+    return rng.choice([
+        str(rng.randrange(10 ** rng.randint(1, 25))),
+        f"{rng.randrange(1000)}.{rng.randrange(1000)}",
+        "3.", "3.x", "1..2", ".5", "0.0.0", "12.e", "3.٣", "٣٤", "2²", "1½",
+    ])
+
+
+def _string(rng: random.Random) -> str:
+    body = "".join(rng.choices(string.ascii_letters + " /*\\'ж€", k=rng.randint(0, 10)))
+    # Without the closing quote the string ends at the line end or at EOF
+    return rng.choice(['"' + body + '"', '"' + body + '"', '"' + body, '"' + body + "\n"])
+
+
+def _comment(rng: random.Random) -> str:
+    body = "".join(rng.choices("ab */\n\"", k=rng.randint(0, 8)))
+    return rng.choice(["//" + body, "/*" + body + "*/", "/*" + body, "/**/", "/*/", "**/", "/***/"])
+
+
+# Fragment makers with weights; fragments are concatenated with little or no
+# separation, so the boundaries between them produce '/' + '*', '*' + '/', '3' + '.' ...
+FRAGMENTS: List[Tuple[Callable[[random.Random], str], int]] = [
+    (lambda rng: rng.choice(KEYWORDS), 3),
+    (_identifier, 4),
+    (_unicode_word, 1),
+    (_number, 3),
+    (_string, 2),
+    (_comment, 2),
+    (lambda rng: rng.choice(["/", "*", "/*", "*/", "//", "."]), 2),
+    (lambda rng: rng.choice(OPERATORS), 4),
+    (lambda rng: rng.choice(["&", "|", "&&", "||", "&|"]), 1),
+    (lambda rng: rng.choice(GARBAGE_CHARS + "\x00\U0001F600"), 1),
+    (lambda rng: rng.choice([" ", "\t", "\n", "\r\n", "\r", "  \n\n"]), 3),
+]
+_MAKERS = [maker for maker, _ in FRAGMENTS]
+_WEIGHTS = [weight for _, weight in FRAGMENTS]
+_SEPARATORS = ["", "", " ", "\n"]
+
+
+def generate(rng: random.Random) -> str:
+    parts = []
+    for maker in rng.choices(_MAKERS, _WEIGHTS, k=rng.randint(1, 30)):
+        parts.append(maker(rng))
+        parts.append(rng.choice(_SEPARATORS))
+    source = "".join(parts)
+    if rng.random() < 0.2:
+        # Truncation leaves a string, comment or number unfinished at EOF
+        source = source[:rng.randrange(len(source) + 1)]
+    return source
+
+
+def case_source(seed: int, index: int) -> str:
+    return generate(random.Random(seed * 1_000_003 + index))
+
+
+# --- Modes ---------------------------------------------------------------------
+
+def _drain(scanner: Scanner) -> List[str]:
+    tokens = [str(token) for token in scanner]
+    tokens.append(str(scanner.next_token()))
+    return tokens
+
+
+def _scan(factory: Callable[..., Scanner], source: str) -> Outcome:
+    collector = DiagnosticCollector(collapse=False)
+    tokens = _drain(factory(source, diagnostics=collector))
+    # Plain tuples: Diagnostic.to_dict() (dataclasses.asdict) would dominate the run time
+    return tokens, [(d.code, d.message, d.line, d.column, d.offset, d.length, d.lexeme)
+                    for d in collector]
+
+
+def reference(source: str) -> Outcome:
+    return _scan(Scanner, source)
+
+
+def _relex(source: str) -> Outcome:
+    # The snapshot is built from a corrupted text; the edit restores the case source
+    rng = random.Random(source)
+    start = rng.randrange(len(source) + 1)
+    end = rng.randrange(start, len(source) + 1)
+    junk = rng.choice(['"', "/*", "*/", "x", "\n", "3.", ""])
+    before = source[:start] + junk + source[end:]
+    snapshot = LexSnapshot.from_source(before, diagnostics=DiagnosticCollector())
+    snapshot = relex(snapshot, TextEdit(start, len(junk), source[start:end]))
+    return _with_eof_after_end(snapshot.tokens), None
+
+
+def _parallel(source: str) -> Outcome:
+    # Tiny chunks put chunk boundaries (and wrong comment guesses) into short cases
+    collector = DiagnosticCollector(collapse=False)
+    tokens = lex_parallel(source, jobs=1, chunk_size=8, diagnostics=collector).tokens
+    return _with_eof_after_end(tokens), [(d.code, d.message, d.line, d.column, d.offset, d.length, d.lexeme)
+                                         for d in collector]
+
+
+def _with_eof_after_end(tokens: List[Token]) -> List[str]:
+    # Past the end Scanner repeats END_OF_FILE one column to the left
+    eof = tokens[-1]
+    return [str(token) for token in tokens] + [str(replace(eof, column=eof.column - 1))]
+
+
+MODES: Dict[str, Callable[[str], Outcome]] = {}
+for _name, _backend in sorted(BACKENDS.items()):
+    if _backend is not Scanner:
+        MODES[_name] = lambda source, backend=_backend: _scan(backend, source)
+    MODES[f"{_name}-lazy"] = lambda source, backend=_backend: _scan(
+        lambda text, **kwargs: backend(text, lazy=True, **kwargs), source)
+MODES["compact"] = lambda source: _scan(lambda text, **kwargs: Scanner(text, compact=True, **kwargs), source)
+for _chunk_size in (1, 3, 7):
+    MODES[f"stream-{_chunk_size}"] = lambda source, chunk_size=_chunk_size: _scan(
+        lambda text, **kwargs: StreamScanner(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size, **kwargs),
+        source)
+MODES["bytes"] = lambda source: _scan(lambda text, **kwargs: BytesScanner(text.encode("utf-8"), **kwargs), source)
+MODES["bytes-lazy"] = lambda source: _scan(
+    lambda text, **kwargs: BytesScanner(text.encode("utf-8"), lazy=True, **kwargs), source)
+MODES["relex"] = _relex
+MODES["parallel"] = _parallel
+
+
+# --- Comparison and minimization -----------------------------------------------
+
+@dataclass
+class Divergence:
+    mode: str
+    index: int
+    source: str
+    reproducer: str
+    detail: str
+
+    def render(self) -> str:
+        return (f"[{self.mode}] case {self.index}: {self.detail}\n"
+                f"    reproducer ({len(self.reproducer)} of {len(self.source)} chars): {self.reproducer!r}")
+
+
+def _run(fn: Callable[[str], Outcome], source: str) -> Outcome:
+    try:
+        return fn(source)
+    except Exception as e:
+        return [f"exception {type(e).__name__}: {e}"], None
+
+
+def compare(mode: str, source: str, expected: Optional[Outcome] = None) -> Optional[str]:
+    """The first difference between ``mode`` and Scanner on ``source``, or None."""
+    expected_tokens, expected_diagnostics = expected if expected is not None else _run(reference, source)
+    tokens, diagnostics = _run(MODES[mode], source)
+    if tokens != expected_tokens:
+        for i, (want, got) in enumerate(zip(expected_tokens, tokens)):
+            if want != got:
+                return f"token {i}: expected {want!r}, got {got!r}"
+        return f"expected {len(expected_tokens)} tokens, got {len(tokens)}: {tokens[-1]!r}"
+    if diagnostics is not None and diagnostics != expected_diagnostics:
+        for i, (want, got) in enumerate(zip(expected_diagnostics, diagnostics)):
+            if want != got:
+                return f"diagnostic {i}: expected {want}, got {got}"
+        return f"expected {len(expected_diagnostics)} diagnostics, got {len(diagnostics)}"
+    return None
+
+
+def minimize(source: str, fails: Callable[[str], bool], budget: int = 2000) -> str:
+    """
+    Delta debugging: drop ever smaller chunks while the divergence persists,
+    then try to replace the remaining characters with a plain 'a'.
+    ``budget`` bounds the number of predicate calls.
+    """
+    calls = 0
+    chunk = max(1, len(source) // 2)
+    while chunk >= 1 and calls < budget:
+        removed = False
+        start = 0
+        while start < len(source) and calls < budget:
+            candidate = source[:start] + source[start + chunk:]
+            calls += 1
+            if fails(candidate):
+                source = candidate
+                removed = True
+            else:
+                start += chunk
+        if not removed:
+            chunk //= 2
+    for i in range(len(source)):
+        if calls >= budget:
+            break
+        if source[i] != "a":
+            candidate = source[:i] + "a" + source[i + 1:]
+            calls += 1
+            if fails(candidate):
+                source = candidate
+    return source
+
+
+def check_case(source: str, modes: Sequence[str], index: int = -1) -> List[Divergence]:
+    expected = _run(reference, source)
+    found = []
+    for mode in modes:
+        detail = compare(mode, source, expected)
+        if detail is not None:
+            reproducer = minimize(source, lambda text: compare(mode, text) is not None)
+            found.append(Divergence(mode, index, source, reproducer, compare(mode, reproducer)))
+    return found
+
+
+def _check_batch(args) -> Tuple[int, List[Divergence]]:
+    seed, start, count, modes = args
+    found: List[Divergence] = []
+    # Modes without a collector print scanner errors to stderr
+    stderr, sys.stderr = sys.stderr, io.StringIO()
+    try:
+        for index in range(start, start + count):
+            found.extend(check_case(case_source(seed, index), modes, index))
+    finally:
+        sys.stderr = stderr
+    return count, found
+
+
+def fuzz(cases: int, modes: Sequence[str], seed: int = 0, jobs: int = 1,
+         first: int = 0) -> Iterator[Tuple[int, List[Divergence]]]:
+    """
+    Check cases ``first .. first + cases - 1`` in batches, in a process pool
+    when ``jobs > 1``; yields ``(cases checked, divergences)`` per batch.
+    """
+    batches = [(seed, start, min(BATCH_SIZE, first + cases - start), list(modes))
+               for start in range(first, first + cases, BATCH_SIZE)]
+    if jobs <= 1:
+        yield from map(_check_batch, batches)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_check_batch, batches)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fuzz", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--mode", action="append", choices=sorted(MODES), help="modes to check (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-failures", type=int, default=10, help="stop after this many divergences")
+    parser.add_argument("--replay", type=int, metavar="INDEX", help="check a single case and print its source")
+    args = parser.parse_args(argv)
+    modes = args.mode or list(MODES)
+
+    if args.replay is not None:
+        source = case_source(args.seed, args.replay)
+        print(repr(source))
+        found = check_case(source, modes, args.replay)
+        for divergence in found:
+            print(divergence.render())
+        return 1 if found else 0
+
+    t0 = time.perf_counter()
+    done = 0
+    failures: List[Divergence] = []
+    last_report = t0
+    for count, found in fuzz(args.cases, modes, args.seed, args.jobs):
+        done += count
+        for divergence in found:
+            print(divergence.render(), flush=True)
+        failures.extend(found)
+        now = time.perf_counter()
+        if now - last_report > 10:
+            print(f"{done:,} cases, {done / (now - t0):,.0f} cases/s", file=sys.stderr, flush=True)
+            last_report = now
+        if len(failures) >= args.max_failures:
+            break
+    elapsed = time.perf_counter() - t0
+    print(f"{done:,} cases x {len(modes)} modes in {elapsed:.1f}s ({done / elapsed:,.0f} cases/s), "
+          f"{len(failures)} divergences")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
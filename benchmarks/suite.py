@@ -0,0 +1,162 @@
+"""
+Lexer benchmark suite: every corpus scenario against every backend.
+
+Reports tokens/s, MB/s (source bytes in UTF-8) and the tracemalloc peak of a
+full scan. Results can be written as JSON and compared with a stored
+baseline; the run fails (exit code 1) when throughput drops or peak memory
+grows by more than the threshold.
+
+    python -m benchmarks.suite                              # all scenarios, 1 MB each
+    python -m benchmarks.suite --size 4 --scenario identifiers --backend dfa
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.15
+
+Baselines are machine specific: record them on the machine that checks them.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from src.lexer.backends import BACKENDS, create_scanner
+from benchmarks.corpus import SCENARIOS, corpus
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+
+
+class _NullWriter:
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def scan(source: str, backend: str) -> int:
+    """Eager scan (the default Scanner mode), so the peak includes the token list"""
+    # Error-heavy scenarios print a diagnostic per error; keep that out of the terminal
+    with contextlib.redirect_stderr(_NullWriter()):
+        return len(create_scanner(source, backend)._tokens)
+
+
+def run_case(source: str, backend: str, repeat: int) -> dict:
+    """Best-of-repeat timing, then one separate run under tracemalloc for the peak"""
+    best = float("inf")
+    tokens = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        tokens = scan(source, backend)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        scan(source, backend)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    size = len(source.encode("utf-8", "surrogatepass"))
+    return {
+        "tokens": tokens,
+        "bytes": size,
+        "seconds": best,
+        "tokens_per_sec": tokens / best,
+        "mb_per_sec": size / best / 1e6,
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(scenarios: List[str], backends: List[str], size_mb: float, seed: int, repeat: int) -> dict:
+    results: Dict[str, dict] = {}
+    for name in scenarios:
+        source = corpus(name, int(size_mb * 1e6), seed)
+        for backend in backends:
+            key = f"{name}/{backend}"
+            results[key] = run_case(source, backend, repeat)
+            print(format_row(key, results[key]), flush=True)
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "size_mb": size_mb,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def format_row(key: str, row: dict) -> str:
+    return (f"  {key:<24}{row['tokens']:>11,} tok{row['tokens_per_sec']:>13,.0f} tok/s"
+            f"{row['mb_per_sec']:>8.2f} MB/s{row['peak_bytes'] / 1e6:>9.2f} MB peak")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Regressions of current against baseline (cases missing from either side are skipped)"""
+    regressions = []
+    for key, base in baseline["results"].items():
+        row = current["results"].get(key)
+        if row is None:
+            continue
+        if row["tokens"] != base["tokens"]:
+            regressions.append(f"{key}: token count changed {base['tokens']} -> {row['tokens']}")
+        if row["tokens_per_sec"] < base["tokens_per_sec"] * (1 - threshold):
+            regressions.append(f"{key}: throughput {row['tokens_per_sec']:,.0f} tok/s "
+                               f"< baseline {base['tokens_per_sec']:,.0f} tok/s")
+        if row["peak_bytes"] > base["peak_bytes"] * (1 + threshold):
+            regressions.append(f"{key}: peak memory {row['peak_bytes']:,} B "
+                               f"> baseline {base['peak_bytes']:,} B")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend to run (repeatable; default: all)")
+    parser.add_argument("--size", type=float, default=1.0, help="corpus size per scenario, MB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="fail on regressions against this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenario or list(SCENARIOS)
+    backends = args.backend or sorted(BACKENDS)
+    print(f"{len(scenarios)} scenarios x {len(backends)} backends, {args.size} MB each, best of {args.repeat}")
+    current = run_suite(scenarios, backends, args.size, args.seed, args.repeat)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+                f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["size_mb"] != args.size or baseline["meta"]["seed"] != args.seed:
+            print("baseline was recorded with a different --size/--seed", file=sys.stderr)
+            return 2
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,15 @@
 import sys
 from pathlib import Path
 from src.lexer.scanner import Scanner
+from src.lexer.token_cache import TokenCache
 
 def generate():
     tests_dir = Path("tests/lexer")
+    # Opt-in persistent token cache: set MINICOMPILER_TOKEN_CACHE to a directory
+    cache = TokenCache.from_env()
     for src_path in tests_dir.rglob("*.src"):
         source = src_path.read_text(encoding="utf-8")
-        scanner = Scanner(source)
+        scanner = Scanner(source, cache=cache)
         # Capture tokens as strings
         tokens = [str(t) for t in scanner._tokens]
         # Write cleanly to txt without BOM
@@ -1,22 +1,179 @@
+import argparse
+import io
+import os
 import sys
-from .scanner import Scanner
+from collections import Counter
+from typing import BinaryIO, Optional
+from .backends import BACKENDS, DEFAULT_BACKEND, create_scanner
+from .diagnostics import DiagnosticCollector, TooManyErrors
+from .bytes_scanner import BytesScanner
+from .parallel import lex_parallel
+from .batch import FileResult, collect_inputs, format_summary, lex_files, write_tokens
+from .serialize import FORMATS, write_binary
+from .stats import LexerStats
+from .stream import StreamScanner
+from .token_cache import TokenCache
 
-def main():
-    if len(sys.argv) < 2:
-        print("Использование: python -m src.lexer.scanner <file.src>")
-        sys.exit(1)
+def _write_binary_tokens(scanner, out: BinaryIO, counts: Counter) -> Counter:
+    def counted():
+        for token in scanner:
+            counts[token.type.name] += 1
+            yield token
+
+    write_binary(counted(), out)
+    return counts
 
-    file_path = sys.argv[1]
+def lex_single(file_path: str, backend: str, print_tokens: bool,
+               cache: Optional[TokenCache] = None, fmt: str = "text",
+               binary_out: Optional[BinaryIO] = None,
+               stats: Optional[LexerStats] = None,
+               diagnostics: Optional[DiagnosticCollector] = None,
+               use_mmap: bool = False, parallel_jobs: int = 0) -> FileResult:
+    """
+    Один файл (или stdin): токены печатаются по мере сканирования, ошибки
+    выводятся в stderr одной записью после файла. С use_mmap файл сканируется
+    как байты через mmap (BytesScanner), без декодирования в str. С parallel_jobs
+    файл читается целиком и сканируется кусками в parallel_jobs процессах.
+    """
+    result = FileResult(file_path)
+    diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+    counts: Counter = Counter()
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            source = f.read()
+        if use_mmap:
+            f = (BytesScanner(sys.stdin.buffer.read(), lazy=True, diagnostics=diagnostics)
+                 if file_path == "-" else BytesScanner.from_file(file_path, lazy=True, diagnostics=diagnostics))
+        elif file_path == "-":
+            f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        else:
+            f = open(file_path, "r", encoding="utf-8")
     except Exception as e:
-        print(f"Ошибка при чтении файла {file_path}: {e}")
-        sys.exit(1)
+        result.failure = f"Ошибка при чтении файла {file_path}: {e}"
+        return result
+
+    out = sys.stdout if print_tokens else io.StringIO()
+    try:
+        with f:
+            if use_mmap:
+                scanner = f
+            elif parallel_jobs:
+                scanner = lex_parallel(f.read(), parallel_jobs, backend, diagnostics=diagnostics).tokens
+            elif backend == DEFAULT_BACKEND and cache is None:
+                # Потоковое чтение порциями: память не зависит от размера входа
+                scanner = StreamScanner(f, stats=stats, diagnostics=diagnostics)
+            else:
+                scanner = create_scanner(f.read(), backend, lazy=True, cache=cache, stats=stats,
+                                         diagnostics=diagnostics)
+            if fmt == "binary":
+                # Таблица строк пишется после записей, поэтому файл собирается целиком
+                if binary_out is None:
+                    binary_out = sys.stdout.buffer if print_tokens else io.BytesIO()
+                _write_binary_tokens(scanner, binary_out, counts)
+            else:
+                # Ленивый режим: токены печатаются по мере сканирования, без хранения всего списка
+                write_tokens(scanner, out, fmt, counts=counts)
+            result.cached = cache is not None and cache.hits > 0
+    except TooManyErrors as e:
+        result.aborted = True
+        result.stderr = f"{file_path}: {e}\n"
+    except (OSError, UnicodeDecodeError) as e:
+        result.failure = f"Ошибка при чтении файла {file_path}: {e}"
+    result.counts = dict(counts)
+    sys.stdout.flush()
+    diagnostics.render(sys.stderr)
+    sys.stderr.write(result.stderr)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.lexer",
+        description="Вывод потока токенов исходных файлов",
+    )
+    parser.add_argument("files", nargs="+",
+                        help="файлы .src, каталоги (обходятся рекурсивно) или glob-шаблоны; '-' -- stdin")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="реализация сканера (по умолчанию: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="число процессов для нескольких файлов (по умолчанию: %(default)s)")
+    parser.add_argument("--summary", action="store_true",
+                        help="напечатать в stderr сводку по типам токенов и ошибкам")
+    parser.add_argument("--no-tokens", action="store_true", help="не печатать токены")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="формат вывода токенов (по умолчанию: %(default)s)")
+    parser.add_argument("-o", "--output", help="файл для вывода в формате binary (по умолчанию stdout)")
+    parser.add_argument("--stats", nargs="?", const="text", choices=("text", "json"),
+                        help="напечатать в stderr статистику сканирования: время и объем по категориям")
+    parser.add_argument("--max-errors", type=int, metavar="N",
+                        help="выводить не больше N ошибок на файл (остальные только подсчитываются)")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="прекратить сканирование файла после первой ошибки (или после --max-errors)")
+    parser.add_argument("--cache", action="store_true",
+                        help="использовать постоянный кэш токенов по хэшу содержимого файлов")
+    parser.add_argument("--cache-dir", help="каталог кэша токенов (включает --cache)")
+    parser.add_argument("--parallel", action="store_true",
+                        help="сканировать один большой файл кусками в -j процессах")
+    parser.add_argument("--mmap", action="store_true",
+                        help="сканировать файлы как UTF-8 байты через mmap, без декодирования в str")
+    args = parser.parse_args()
 
-    scanner = Scanner(source)
-    for token in scanner._tokens:
-        print(token)
+    inputs = collect_inputs(args.files)
+    if len(inputs) > 1 and "-" in inputs:
+        parser.error("'-' (stdin) нельзя сочетать с другими входными файлами")
+    if args.format == "binary" and len(inputs) > 1:
+        parser.error("формат binary поддерживается только для одного входного файла")
+    if args.output and args.format != "binary":
+        parser.error("--output используется только с --format binary")
+    if args.stats and (args.cache or args.cache_dir):
+        parser.error("--stats несовместим с кэшем токенов: файлы из кэша не сканируются")
+    if args.mmap and (args.backend != DEFAULT_BACKEND or args.cache or args.cache_dir or args.stats):
+        parser.error("--mmap несовместим с --backend, кэшем токенов и --stats")
+    if args.parallel and (len(inputs) > 1 or args.mmap or args.cache or args.cache_dir or args.stats):
+        parser.error("--parallel используется для одного файла и несовместим с --mmap, кэшем токенов и --stats")
+    if args.max_errors is not None and args.max_errors <= 0:
+        parser.error("--max-errors должен быть положительным")
+    print_tokens = not args.no_tokens
+    cache = TokenCache(args.cache_dir) if args.cache or args.cache_dir else None
+    stats = LexerStats() if args.stats else None
+    diagnostics = DiagnosticCollector(args.max_errors, abort=args.fail_fast)
+    results = []
+    if len(inputs) == 1:
+        if args.format == "binary" and args.output:
+            with open(args.output, "wb") as binary_out:
+                results.append(lex_single(inputs[0], args.backend, print_tokens, cache, args.format,
+                                          binary_out, stats, diagnostics, args.mmap,
+                                          args.jobs if args.parallel else 0))
+        else:
+            results.append(lex_single(inputs[0], args.backend, print_tokens, cache, args.format,
+                                      stats=stats, diagnostics=diagnostics, use_mmap=args.mmap,
+                                      parallel_jobs=args.jobs if args.parallel else 0))
+        if results[0].failure:
+            print(results[0].failure)
+    else:
+        cache_dir = str(cache.directory) if cache is not None else None
+        for result in lex_files(inputs, args.jobs, args.backend, render=print_tokens,
+                                cache_dir=cache_dir, fmt=args.format, stats=stats is not None,
+                                max_errors=args.max_errors, fail_fast=args.fail_fast,
+                                use_mmap=args.mmap):
+            # Вывод строго в порядке входных файлов; в jsonl файл указан в каждой записи
+            if print_tokens and args.format == "text":
+                sys.stdout.write(f"==> {result.path} <==\n")
+                sys.stdout.write(result.output)
+            elif print_tokens:
+                sys.stdout.write(result.output)
+            if result.failure:
+                print(result.failure)
+            sys.stdout.flush()
+            sys.stderr.write(result.stderr)
+            if result.stats is not None:
+                stats.merge(LexerStats.from_dict(result.stats))
+            results.append(result)
+
+    if args.summary:
+        sys.stderr.write(format_summary(results))
+    if stats is not None:
+        sys.stderr.write(stats.to_json() + "\n" if args.stats == "json" else stats.format())
+    # Код возврата 1, если есть лексические ошибки, нечитаемые или прерванные файлы
+    if any(result.errors or result.failure or result.aborted for result in results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,21 @@
+from typing import Dict, Type
+
+from .scanner import Scanner
+from .dfa_scanner import DFAScanner
+
+# Реестр реализаций сканера, выбираемых по имени (CLI: --backend)
+BACKENDS: Dict[str, Type[Scanner]] = {
+    "scanner": Scanner,
+    "dfa": DFAScanner,
+}
+
+DEFAULT_BACKEND = "scanner"
+
+
+def create_scanner(source: str, backend: str = DEFAULT_BACKEND, **kwargs) -> Scanner:
+    """Создать сканер выбранной реализации"""
+    try:
+        scanner_class = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Неизвестный бэкенд сканера '{backend}'. Доступны: {', '.join(BACKENDS)}")
+    return scanner_class(source, **kwargs)
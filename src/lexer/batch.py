@@ -0,0 +1,185 @@
+import glob
+import io
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from .backends import DEFAULT_BACKEND, create_scanner
+from .bytes_scanner import BytesScanner
+from .diagnostics import DiagnosticCollector, TooManyErrors
+from .scanner import Scanner
+from .serialize import format_token, write_lines
+from .stats import LexerStats
+from .token_cache import TokenCache
+from .tokens import TokenType
+
+SOURCE_SUFFIX = ".src"
+
+
+@dataclass
+class FileResult:
+    """Результат лексического анализа одного файла (передается между процессами)"""
+    path: str
+    output: str = ""                 # токены в текстовом формате (по одному на строку)
+    counts: Dict[str, int] = field(default_factory=dict)  # число токенов по типам
+    stderr: str = ""                 # сообщения сканера об ошибках
+    failure: Optional[str] = None    # ошибка чтения файла
+    cached: bool = False             # токены взяты из кэша, файл не сканировался
+    stats: Optional[dict] = None     # LexerStats.to_dict(), если статистика включена
+    aborted: bool = False            # сканирование прервано по пределу ошибок (fail_fast)
+
+    @property
+    def errors(self) -> int:
+        return self.counts.get(TokenType.ERROR.name, 0)
+
+
+def collect_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    Развернуть аргументы командной строки в список файлов: каталоги обходятся
+    рекурсивно (файлы *.src), шаблоны раскрываются glob. Порядок детерминирован,
+    повторы удаляются.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if pattern == "-" or os.path.isfile(pattern):
+            paths.append(pattern)
+        elif os.path.isdir(pattern):
+            paths.extend(sorted(str(p) for p in Path(pattern).rglob(f"*{SOURCE_SUFFIX}") if p.is_file()))
+        else:
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+            # Несуществующий путь оставляем: об ошибке сообщит чтение файла
+            paths.extend(matches or [pattern])
+    return list(dict.fromkeys(paths))
+
+
+def write_tokens(scanner: Scanner, out: TextIO, fmt: str = "text", extra: Optional[dict] = None,
+                 counts: Optional[Counter] = None) -> Counter:
+    """
+    Напечатать токены сканера в out (text или jsonl, буферизованно) и вернуть
+    счетчик типов. Переданный counts заполняется на месте: при прерывании
+    сканирования в нем остаются уже напечатанные токены.
+    """
+    counts = Counter() if counts is None else counts
+
+    def lines():
+        for token in scanner:
+            counts[token.type.name] += 1
+            yield format_token(token, fmt, extra)
+
+    write_lines(lines(), out)
+    return counts
+
+
+class _NullWriter:
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def lex_file(path: str, backend: str = DEFAULT_BACKEND, render: bool = True,
+             cache_dir: Optional[str] = None, fmt: str = "text", stats: bool = False,
+             max_errors: Optional[int] = None, fail_fast: bool = False,
+             use_mmap: bool = False) -> FileResult:
+    """
+    Отсканировать один файл. Ошибки собираются DiagnosticCollector (с пределом
+    max_errors) и выводятся в result.stderr одной записью после файла; каждое
+    сообщение начинается с пути файла (вывод файлов склеивается).
+    С use_mmap файл сканируется через mmap без декодирования (BytesScanner).
+    """
+    result = FileResult(path)
+    source = None
+    try:
+        if not use_mmap:
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        result.failure = f"Ошибка при чтении файла {path}: {e}"
+        return result
+
+    cache = TokenCache(cache_dir) if cache_dir is not None else None
+    file_stats = LexerStats() if stats else None
+    diagnostics = DiagnosticCollector(max_errors, abort=fail_fast)
+    out = io.StringIO() if render else _NullWriter()
+    captured = io.StringIO()
+    # В jsonl каждая запись помечается файлом, так как вывод файлов склеивается
+    extra = {"file": path} if fmt == "jsonl" else None
+    counts: Counter = Counter()
+    try:
+        if use_mmap:
+            with BytesScanner.from_file(path, lazy=True, diagnostics=diagnostics) as scanner:
+                write_tokens(scanner, out, fmt, extra, counts)
+        else:
+            scanner = create_scanner(source, backend, lazy=True, cache=cache, stats=file_stats,
+                                     diagnostics=diagnostics)
+            write_tokens(scanner, out, fmt, extra, counts)
+    except TooManyErrors as e:
+        result.aborted = True
+        diagnostics.render(captured, path=path)
+        captured.write(f"{path}: {e}\n")
+    except (OSError, UnicodeDecodeError) as e:
+        # Некорректный UTF-8 в режиме mmap обнаруживается во время сканирования
+        result.failure = f"Ошибка при чтении файла {path}: {e}"
+        diagnostics.render(captured, path=path)
+    else:
+        diagnostics.render(captured, path=path)
+    result.counts = dict(counts)
+    result.cached = cache is not None and cache.hits > 0
+    result.stats = file_stats.to_dict() if file_stats is not None else None
+    result.output = out.getvalue() if render else ""
+    result.stderr = captured.getvalue()
+    return result
+
+
+def _lex_file_task(args) -> FileResult:
+    return lex_file(*args)
+
+
+def lex_files(paths: List[str], jobs: int = 1, backend: str = DEFAULT_BACKEND,
+              render: bool = True, cache_dir: Optional[str] = None,
+              fmt: str = "text", stats: bool = False, max_errors: Optional[int] = None,
+              fail_fast: bool = False, use_mmap: bool = False) -> Iterator[FileResult]:
+    """
+    Отсканировать файлы, при jobs > 1 -- в пуле процессов. Результаты отдаются
+    в порядке входного списка, по мере готовности. С cache_dir токены берутся
+    из общего кэша TokenCache (и сохраняются в него). Со stats каждый результат
+    содержит статистику сканирования файла.
+    """
+    tasks = [(path, backend, render, cache_dir, fmt, stats, max_errors, fail_fast, use_mmap)
+             for path in paths]
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(_lex_file_task, tasks)
+        return
+    # Крупные порции снижают накладные расходы на передачу задач между процессами
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_lex_file_task, tasks, chunksize=chunksize)
+
+
+def format_summary(results: List[FileResult]) -> str:
+    """Сводка: число токенов по типам и число ошибок по файлам"""
+    total: Counter = Counter()
+    for result in results:
+        total.update(result.counts)
+    errors = sum(result.errors for result in results)
+    failed = sum(1 for result in results if result.failure)
+    cached = sum(1 for result in results if result.cached)
+    aborted = sum(1 for result in results if result.aborted)
+    lines = [f"Итого: файлов {len(results)}, токенов {sum(total.values())}, "
+             f"лексических ошибок {errors}, ошибок чтения {failed}, из кэша {cached}"
+             + (f", прервано {aborted}" if aborted else "")]
+    width = max((len(name) for name in total), default=0)
+    for type_t in TokenType:
+        if total[type_t.name]:
+            lines.append(f"  {type_t.name:<{width}} {total[type_t.name]}")
+    with_errors = [result for result in results if result.errors or result.failure or result.aborted]
+    if with_errors:
+        lines.append("Ошибки по файлам:")
+        for result in with_errors:
+            if result.failure:
+                status = "не прочитан"
+            else:
+                status = f"{result.errors}, прерван" if result.aborted else str(result.errors)
+            lines.append(f"  {result.path}: {status}")
+    return "\n".join(lines) + "\n"
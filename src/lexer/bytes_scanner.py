@@ -0,0 +1,340 @@
+import mmap
+import re
+from typing import Optional, Union
+
+from .scanner import Scanner
+from .tokens import KEYWORDS, Token, TokenType
+
+# Лексемы, целиком состоящие из ASCII: одно регулярное выражение по байтам.
+# Пробелы внутри строки пропускаются префиксом выражения, номер группы
+# (m.lastindex) определяет вид лексемы
+_TOKEN = re.compile(
+    rb'[ \t\r]*(?:'
+    rb'(\n[ \t\r\n]*)'                               # пробелы с переводами строк
+    rb'|([A-Za-z_][A-Za-z0-9_]*)'                     # идентификатор или ключевое слово
+    rb'|(//[^\n]*)'                                  # однострочный комментарий
+    rb'|(/\*)'                                       # начало многострочного комментария
+    rb'|([\-+*/=!<>]=?|&&|\|\||[%(){}\[\];,:])'       # оператор или разделитель
+    rb'|([0-9]+)(\.[0-9]+)?'                         # число: целая и дробная часть
+    rb'|("[^"\n]*"?)'                                # строка (без кавычки -- незавершенная)
+    rb')'
+)
+_NEWLINES, _WORD, _LINE_COMMENT, _BLOCK_COMMENT, _OPERATOR, _NUMBER, _FRACTION, _STRING = range(1, 9)
+_SPACES = re.compile(rb'[ \t\r]*')
+
+_HIGH = re.compile(rb"[\x80-\xff]")
+# Байты, которые могут входить в идентификатор или число с не-ASCII символами
+# (включая '.' дробной части): внутри этой серии лексема разбирается по символам
+_UNICODE_RUN = re.compile(rb"[A-Za-z0-9_.\x80-\xff]*")
+# Начальный размер декодируемого окна этой серии, байт
+_UNICODE_WINDOW = 256
+
+_OPERATORS = {}
+for _lexeme, _type in {
+    "+": TokenType.PLUS, "-": TokenType.MINUS, "*": TokenType.STAR, "/": TokenType.SLASH,
+    "%": TokenType.PERCENT, "=": TokenType.ASSIGN, "!": TokenType.BANG, "<": TokenType.LESS,
+    ">": TokenType.GREATER, "+=": TokenType.PLUS_ASSIGN, "-=": TokenType.MINUS_ASSIGN,
+    "*=": TokenType.STAR_ASSIGN, "/=": TokenType.SLASH_ASSIGN, "==": TokenType.EQUAL_EQUAL,
+    "!=": TokenType.BANG_EQUAL, "<=": TokenType.LESS_EQUAL, ">=": TokenType.GREATER_EQUAL,
+    "&&": TokenType.AND_AND, "||": TokenType.OR_OR, "(": TokenType.LPAREN, ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE, "}": TokenType.RBRACE, "[": TokenType.LBRACKET, "]": TokenType.RBRACKET,
+    ";": TokenType.SEMICOLON, ",": TokenType.COMMA, ":": TokenType.COLON,
+}.items():
+    _OPERATORS[_lexeme.encode("ascii")] = (_type, _lexeme)
+
+ByteSource = Union[bytes, bytearray, mmap.mmap]
+
+
+class BytesScanner(Scanner):
+    """
+    Сканер UTF-8 байтов (bytes или mmap файла) без декодирования всего текста.
+
+    ASCII-лексемы распознаются регулярным выражением по байтам, декодируется
+    только текст самих лексем. Если рядом с лексемой встречается не-ASCII
+    байт, идентификатор или число разбираются по символам с семантикой
+    Scanner (isalpha/isdigit), а столбцы считаются в символах, а не байтах:
+    для этого декодируется только отрезок строки с не-ASCII символами.
+    Токены совпадают с Scanner над декодированным текстом.
+
+    Байты проверяются как UTF-8 только там, где они декодируются (лексемы и
+    отрезки строк перед ними): некорректный UTF-8 внутри комментария, в
+    отличие от чтения файла в str, ошибкой не считается. Компактный режим,
+    кэш токенов и статистика не поддерживаются: они работают со str.
+    """
+    def __init__(self, source: Union[ByteSource, str], **kwargs):
+        if kwargs.get("compact") or kwargs.get("cache") is not None or kwargs.get("stats") is not None:
+            raise ValueError("BytesScanner не поддерживает компактный режим, кэш токенов и статистику")
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        self._mmap: Optional[mmap.mmap] = None
+        # Позиция конца файла (строка, столбец) для next_token после EOF
+        self._eof_position = (1, 1)
+        # Курсор перевода байтовых смещений ошибок в смещения в символах
+        self._offset_bytes = 0
+        self._offset_chars = 0
+        super().__init__(source, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "BytesScanner":
+        """Сканер над mmap файла (пустой файл читается как b"": его нельзя отобразить)"""
+        with open(path, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return cls(b"", **kwargs)
+        scanner = cls(mapped, **kwargs)
+        scanner._mmap = mapped
+        return scanner
+
+    def close(self):
+        """Закрыть отображение файла (токены -- копии строк, они остаются валидными)"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "BytesScanner":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _eof_after_end(self) -> Token:
+        line, column = self._eof_position
+        return Token(TokenType.END_OF_FILE, "", line, column - 1, None)
+
+    def _chars(self, start: int, end: int) -> int:
+        """Число символов в байтах [start, end) (границы -- на границах символов)"""
+        buf = self._source
+        if _HIGH.search(buf, start, end) is None:
+            return end - start
+        return len(buf[start:end].decode("utf-8"))
+
+    def _error(self, start: int, end: int, line: int, column: int, message: str) -> Token:
+        token = Token(TokenType.ERROR, self._source[start:end].decode("utf-8"), line, column, message)
+        if self._diagnostics is not None:
+            # Смещение ошибки -- в символах, как у Scanner; ошибки идут по возрастанию смещений
+            self._offset_chars += self._chars(self._offset_bytes, start)
+            self._offset_bytes = start
+            self._report_error(token, self._offset_chars)
+        else:
+            self._report_error(token, start)
+        return token
+
+    def _unicode_token(self, start: int, line: int, column: int) -> tuple:
+        """
+        Медленный путь: идентификатор, число или недопустимый символ рядом с
+        не-ASCII байтами. Возвращает (токен, байтовый конец лексемы).
+
+        Серия _UNICODE_RUN ищется и декодируется не целиком (в не-ASCII тексте
+        она может тянуться до конца файла, и сканирование стало бы
+        квадратичным), а в окне от начала лексемы: если лексема (с
+        предпросмотром на два символа) доходит до конца окна, окно удваивается.
+        """
+        buf = self._source
+        length = len(buf)
+        size = _UNICODE_WINDOW
+        while True:
+            limit = min(length, start + size)
+            run_end = max(_UNICODE_RUN.match(buf, start, limit).end(), start + 1)
+            complete = run_end < limit or limit == length
+            end = run_end
+            if not complete:
+                # Окно обрезается по границе символа (байты продолжения -- 10xxxxxx)
+                while buf[end] & 0xC0 == 0x80:
+                    end -= 1
+            result = self._unicode_lexeme(buf[start:end].decode("utf-8"), complete,
+                                          start, line, column)
+            if result is not None:
+                return result
+            size *= 2
+
+    def _unicode_lexeme(self, text: str, complete: bool, start: int, line: int, column: int) -> Optional[tuple]:
+        """Разбор лексемы в начале text; None -- text (не вся серия) может оборвать лексему"""
+        c = text[0]
+        if c.isdigit():
+            i = 1
+            while i < len(text) and text[i].isdigit():
+                i += 1
+            if not complete and i + 2 > len(text):
+                return None
+            is_float = i + 1 < len(text) and text[i] == '.' and text[i + 1].isdigit()
+            if is_float:
+                i += 2
+                while i < len(text) and text[i].isdigit():
+                    i += 1
+                if not complete and i >= len(text):
+                    return None
+            lexeme = text[:i]
+            end = start + len(lexeme.encode("utf-8"))
+            try:
+                value = float(lexeme) if is_float else int(lexeme)
+            except ValueError:
+                return self._error(start, end, line, column, f"Некорректный числовой литерал '{lexeme}'"), end
+            type_t = TokenType.FLOAT_LITERAL if is_float else TokenType.INT_LITERAL
+            return Token(type_t, lexeme, line, column, value), end
+        if c.isalpha() or c == '_':
+            i = 1
+            while i < len(text) and (text[i].isalpha() or text[i] == '_' or text[i].isdigit()):
+                i += 1
+            if not complete and i >= len(text):
+                return None
+            lexeme = text[:i]
+            end = start + len(lexeme.encode("utf-8"))
+            return self._word(lexeme, start, end, line, column), end
+        end = start + len(c.encode("utf-8"))
+        return self._error(start, end, line, column, f"Недопустимый символ '{c}'"), end
+
+    def _word(self, text: str, start: int, end: int, line: int, column: int) -> Token:
+        """Идентификатор или ключевое слово (как Scanner._identifier)"""
+        if len(text) > 255:
+            return self._error(start, end, line, column, f"Идентификатор слишком длинный ({len(text)} > 255)")
+        type_t = KEYWORDS.get(text, TokenType.IDENTIFIER)
+        if type_t == TokenType.IDENTIFIER:
+            if self.symbols is None:
+                return Token(TokenType.IDENTIFIER, text, line, column, text)
+            symbol_id = self.symbols.intern(text)
+            name = self.symbols.names[symbol_id]
+            return Token(TokenType.IDENTIFIER, name, line, column, name, symbol_id)
+        if type_t == TokenType.KW_TRUE or type_t == TokenType.KW_FALSE:
+            return Token(TokenType.BOOL_LITERAL, text, line, column, type_t == TokenType.KW_TRUE)
+        return Token(type_t, text, line, column, None)
+
+    def _token_stream(self):
+        buf = self._source
+        length = len(buf)
+        match_token = _TOKEN.match
+        search_high = _HIGH.search
+        operators = _OPERATORS
+        keywords = KEYWORDS
+        symbols = self.symbols
+        intern = symbols.intern if symbols is not None else None
+        names = symbols.names if symbols is not None else None
+        IDENTIFIER = TokenType.IDENTIFIER
+
+        # Курсор строк и столбцов: строка, байтовое начало строки, опорная точка
+        # col_byte с числом символов col_chars от начала строки до нее и позиция
+        # ближайшего не-ASCII байта next_high (не раньше col_byte)
+        line = 1
+        line_start = col_byte = col_chars = 0
+        m = search_high(buf, 0)
+        next_high = m.start() if m else length
+
+        pos = self._current
+        while pos < length:
+            m = match_token(buf, pos)
+            if m is None:
+                # Не ASCII-лексема: не-ASCII символ или недопустимый ASCII-символ
+                start = _SPACES.match(buf, pos).end()
+                if start >= length:
+                    break
+                kind = 0
+            else:
+                kind = m.lastindex
+                if kind == _NEWLINES:
+                    end = m.end()
+                    newline = m.start(_NEWLINES)
+                    line += buf[newline:end].count(b"\n") if end - newline > 1 else 1
+                    line_start = col_byte = buf.rfind(b"\n", newline, end) + 1
+                    col_chars = 0
+                    pos = end
+                    continue
+                if kind == _LINE_COMMENT:
+                    pos = m.end()  # Перевод строки не поглощается
+                    continue
+                if kind == _FRACTION:
+                    kind = _NUMBER
+                start = m.start(kind)
+
+            # Столбец начала лексемы в символах
+            if next_high < col_byte:
+                m2 = search_high(buf, col_byte)
+                next_high = m2.start() if m2 else length
+            if start <= next_high:
+                column = col_chars + start - col_byte + 1
+            else:
+                col_chars += len(buf[col_byte:start].decode("utf-8"))
+                col_byte = start
+                m2 = search_high(buf, start)
+                next_high = m2.start() if m2 else length
+                column = col_chars + 1
+
+            if kind == _WORD:
+                end = m.end()
+                if end < length and buf[end] >= 0x80:
+                    token, pos = self._unicode_token(start, line, column)
+                    yield token
+                    continue
+                pos = end
+                text = buf[start:end].decode("ascii")
+                if end - start > 255 or text in keywords:
+                    yield self._word(text, start, end, line, column)
+                elif intern is None:
+                    yield Token(IDENTIFIER, text, line, column, text)
+                else:
+                    symbol_id = intern(text)
+                    name = names[symbol_id]
+                    yield Token(IDENTIFIER, name, line, column, name, symbol_id)
+            elif kind == _OPERATOR:
+                pos = m.end()
+                type_t, lexeme = operators[m.group(_OPERATOR)]
+                yield Token(type_t, lexeme, line, column, None)
+            elif kind == _NUMBER:
+                # За ASCII-цифрами может идти не-ASCII цифра ('2²', '3.٣')
+                end = m.end()
+                fraction = m.start(_FRACTION) != -1
+                if end < length and (buf[end] >= 0x80 or (not fraction and buf[end] == 0x2E
+                                                          and end + 1 < length and buf[end + 1] >= 0x80)):
+                    token, pos = self._unicode_token(start, line, column)
+                    yield token
+                    continue
+                pos = end
+                lexeme = buf[start:end].decode("ascii")
+                if fraction:
+                    yield Token(TokenType.FLOAT_LITERAL, lexeme, line, column, float(lexeme))
+                else:
+                    yield Token(TokenType.INT_LITERAL, lexeme, line, column, int(lexeme))
+            elif kind == _STRING:
+                pos = end = m.end()
+                if end - start >= 2 and buf[end - 1] == 0x22:
+                    lexeme = buf[start:end].decode("utf-8")
+                    yield Token(TokenType.STRING_LITERAL, lexeme, line, column, lexeme[1:-1])
+                elif end < length:
+                    yield self._error(start, end, line, column, "Незавершенная строка (перенос в строке)")
+                else:
+                    yield self._error(start, end, line, column, "Незавершенная строка (достигнут конец файла)")
+            elif kind == _BLOCK_COMMENT:
+                close = buf.find(b"*/", start + 2)
+                end = close + 2 if close != -1 else length
+                newlines = buf[start:end].count(b"\n")  # у mmap нет count
+                if newlines:
+                    line += newlines
+                    line_start = col_byte = buf.rfind(b"\n", start, end) + 1
+                    col_chars = 0
+                pos = end
+                if close == -1:
+                    # Строка ошибки -- строка конца лексемы, столбец от ее начала
+                    if start < line_start:
+                        column = 1 - self._chars(start, line_start)
+                    yield self._error(start, end, line, column, "Незавершенный многострочный комментарий (EOF)")
+            elif buf[start] >= 0x80:
+                token, pos = self._unicode_token(start, line, column)
+                yield token
+            else:
+                pos = start + 1
+                char = chr(buf[start])
+                if char == '&' or char == '|':
+                    message = f"Неожиданный символ '{char}', ожидалось '{char * 2}'"
+                else:
+                    message = f"Недопустимый символ '{char}'"
+                yield self._error(start, pos, line, column, message)
+
+        if next_high < col_byte:
+            m = search_high(buf, col_byte)
+            next_high = m.start() if m else length
+        if length <= next_high:
+            column = col_chars + length - col_byte + 1
+        else:
+            column = col_chars + len(buf[col_byte:length].decode("utf-8")) + 1
+        self._start = self._current = length
+        self._eof_position = (line, column)
+        yield Token(TokenType.END_OF_FILE, "", line, column, None)
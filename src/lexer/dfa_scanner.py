@@ -0,0 +1,202 @@
+import re
+from typing import Dict, Iterator, Optional
+from pathlib import Path
+
+from .scanner import Scanner
+from .tokens import Token, TokenType
+from .lexgen import DFATable, load_table
+from . import lexspec
+
+# Виды действий для принятых правил
+_SKIP, _PLAIN, _IDENTIFIER, _INT, _FLOAT, _STRING, _TRUE, _FALSE, _ERROR = range(9)
+
+_KINDS = {
+    lexspec.SKIP: _SKIP,
+    TokenType.IDENTIFIER.name: _IDENTIFIER,
+    TokenType.INT_LITERAL.name: _INT,
+    TokenType.FLOAT_LITERAL.name: _FLOAT,
+    TokenType.STRING_LITERAL.name: _STRING,
+    TokenType.KW_TRUE.name: _TRUE,
+    TokenType.KW_FALSE.name: _FALSE,
+}
+
+# Сообщения специальных правил-ошибок (как в Scanner)
+_ERROR_MESSAGES = {
+    lexspec.UNTERMINATED_STRING: "Незавершенная строка (достигнут конец файла)",
+    lexspec.UNTERMINATED_COMMENT: "Незавершенный многострочный комментарий (EOF)",
+    lexspec.LONE_AMPERSAND: "Неожиданный символ '&', ожидалось '&&'",
+    lexspec.LONE_PIPE: "Неожиданный символ '|', ожидалось '||'",
+}
+
+
+class _Runtime:
+    """
+    Подготовленные для горячего цикла структуры одной таблицы DFA.
+    Строятся один раз на таблицу и разделяются всеми экземплярами сканера.
+    """
+    def __init__(self, table: DFATable):
+        self.table = table
+        classes = table.classes
+        self._alpha_other = classes.alpha_other
+        self._digit_other = classes.digit_other
+        self._other = classes.other
+        self.class_map: Dict[str, int] = table.class_map()
+        # Действие для каждого правила: вид обработки и TokenType (если есть)
+        self.kinds = [_KINDS.get(name, _ERROR if name in _ERROR_MESSAGES else _PLAIN)
+                      for name in table.rules]
+        self.types = [TokenType[name] if name in TokenType.__members__ else None
+                      for name in table.rules]
+        # Переходы по ASCII-символам без промежуточного класса: rows[state][char]
+        ascii_classes = [(chr(code), self.char_class(chr(code))) for code in range(128)]
+        self.rows = []
+        self.runs = []
+        for state in range(table.num_states):
+            row = table.transitions[state * table.num_classes:(state + 1) * table.num_classes]
+            self.rows.append({c: row[cls] for c, cls in ascii_classes})
+            # Для состояний с петлей (тело комментария, хвост идентификатора, цифры,
+            # пробелы) регулярное выражение проглатывает серию символов за один вызов.
+            # В серию попадают только ASCII-символы: их класс известен точно,
+            # а на остальных цикл DFA продолжает работу посимвольно.
+            loop = "".join(re.escape(c) for c, cls in ascii_classes if row[cls] == state)
+            self.runs.append(re.compile(f"[{loop}]*").match if loop else None)
+
+    def char_class(self, c: str) -> int:
+        """Класс символа; для символов вне спецификации результат кэшируется"""
+        cls = self.class_map.get(c)
+        if cls is None:
+            if c.isalpha() or c == '_':
+                cls = self._alpha_other
+            elif c.isdigit():
+                cls = self._digit_other
+            else:
+                cls = self._other
+            self.class_map[c] = cls
+        return cls
+
+
+_runtimes: Dict[str, _Runtime] = {}
+
+
+def _get_runtime(table: DFATable) -> _Runtime:
+    runtime = _runtimes.get(table.spec_hash)
+    if runtime is None or runtime.table is not table:
+        runtime = _runtimes[table.spec_hash] = _Runtime(table)
+    return runtime
+
+
+class DFAScanner(Scanner):
+    """
+    Табличный сканер: вместо цепочки if/elif в _scan_token лексема распознается
+    минимизированным DFA из lexgen (самое длинное совпадение, приоритет по порядку правил).
+    Поток токенов совпадает с Scanner.
+    """
+    def __init__(self, source: str, table: Optional[DFATable] = None,
+                 cache_dir: Optional[Path] = None, **kwargs):
+        self._runtime = _get_runtime(table or load_table(cache_dir=cache_dir))
+        super().__init__(source, **kwargs)
+
+    def _token_stream(self) -> Iterator[Token]:
+        """Основной цикл: самое длинное совпадение по таблице DFA"""
+        source = self._source
+        length = len(source)
+        runtime = self._runtime
+        table = runtime.table
+        transitions = table.transitions
+        accept = table.accept
+        multiline = table.multiline
+        num_classes = table.num_classes
+        rows = runtime.rows
+        runs = runtime.runs
+        kinds = runtime.kinds
+        types = runtime.types
+        pending = self._pending
+        symbols = self.symbols
+        intern = symbols.intern if symbols is not None else None
+        names = symbols.names if symbols is not None else None
+
+        pos = self._current
+        # Курсор строк -- локальные переменные: сдвигается только на многострочных
+        # правилах (пробелы, комментарии), а не на каждом символе
+        line, line_start = self._line, self._column_start_of_line
+        while pos < length:
+            state = 0
+            rule = -1
+            end = pos
+            i = pos
+            while i < length:
+                c = source[i]
+                target = rows[state].get(c)
+                if target is None:
+                    # Символ вне ASCII: переход через класс символа
+                    target = transitions[state * num_classes + runtime.char_class(c)]
+                state = target
+                if state < 0:
+                    break
+                i += 1
+                run = runs[state]
+                if run is not None:
+                    i = run(source, i).end()
+                if accept[state] >= 0:
+                    rule = accept[state]
+                    end = i
+
+            self._start = pos
+            if rule < 0:
+                # Ни одно правило не подошло: ошибка на один символ
+                self._current = pos = pos + 1
+                self._add_error_token(f"Недопустимый символ '{source[pos - 1]}'")
+            else:
+                self._current = end
+                if multiline[rule]:
+                    newlines = source.count('\n', pos, end)
+                    if newlines:
+                        line += newlines
+                        line_start = source.rindex('\n', pos, end) + 1
+
+                kind = kinds[rule]
+                if kind != _SKIP and kind != _ERROR:
+                    # Горячий путь: токен создается напрямую, без _add_token
+                    text = source[pos:end]
+                    type_t = types[rule]
+                    message = None
+                    symbol_id = None
+                    if kind == _PLAIN:
+                        value = None
+                    elif kind == _IDENTIFIER:
+                        if end - pos > 255:
+                            # Проверка длины (MAX 255)
+                            message = f"Идентификатор слишком длинный ({end - pos} > 255)"
+                        elif intern is None:
+                            value = text
+                        else:
+                            symbol_id = intern(text)
+                            text = value = names[symbol_id]
+                    elif kind == _INT or kind == _FLOAT:
+                        try:
+                            value = int(text) if kind == _INT else float(text)
+                        except ValueError:
+                            # \d (isdigit) пропускает и надстрочные цифры ('²'), которые int() не принимает
+                            message = f"Некорректный числовой литерал '{text}'"
+                    elif kind == _STRING:
+                        value = text[1:-1]
+                    else:
+                        type_t = TokenType.BOOL_LITERAL
+                        value = kind == _TRUE
+                    if message is not None:
+                        self._add_error_token(message)
+                    else:
+                        pending.append(Token(type_t, text, line, pos - line_start + 1, value, symbol_id))
+                elif kind == _ERROR:
+                    if table.rules[rule] == lexspec.UNTERMINATED_STRING and end < length:
+                        self._add_error_token("Незавершенная строка (перенос в строке)")
+                    else:
+                        self._add_error_token(_ERROR_MESSAGES[table.rules[rule]])
+                pos = end
+
+            if pending:
+                yield from pending
+                pending.clear()
+
+        # EOF по локальному курсору, без построения индекса строк
+        self._start = self._current = pos
+        yield Token(TokenType.END_OF_FILE, "", line, pos - line_start + 1, None)
@@ -0,0 +1,172 @@
+"""
+Структурированная диагностика лексических ошибок.
+
+Сканер с DiagnosticCollector (Scanner(source, diagnostics=...)) не печатает
+ошибки по одной, а передает их сборщику: сборщик хранит код, серьезность и
+позицию каждой ошибки, склеивает подряд идущие недопустимые символы,
+ограничивает число сохраняемых сообщений и выводит их одной записью (render).
+Токены ERROR в потоке при этом не меняются.
+"""
+import json
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from .scanner import ScannerError
+from .source_map import SourceMap
+from .tokens import Token
+
+
+class Severity(Enum):
+    ERROR = "Ошибка"
+    WARNING = "Предупреждение"
+    NOTE = "Примечание"
+
+
+# Коды ошибок по началу сообщения сканера (сообщения одинаковы во всех бэкендах)
+CODES = (
+    ("Недопустимый символ", "L001"),
+    ("Незавершенная строка (перенос", "L002"),
+    ("Незавершенная строка (достигнут", "L003"),
+    ("Незавершенный многострочный комментарий", "L004"),
+    ("Идентификатор слишком длинный", "L005"),
+    ("Неожиданный символ '&'", "L006"),
+    ("Неожиданный символ '|'", "L007"),
+    ("Некорректный числовой литерал", "L008"),
+)
+INVALID_CHARACTER = "L001"
+UNKNOWN_CODE = "L000"
+
+# Сколько символов склеенной последовательности сохраняется в лексеме
+MAX_RUN_LEXEME = 32
+
+
+_codes_by_message: Dict[str, str] = {}
+
+
+def error_code(message: str) -> str:
+    code = _codes_by_message.get(message)
+    if code is None:
+        code = next((code for prefix, code in CODES if message.startswith(prefix)), UNKNOWN_CODE)
+        if len(_codes_by_message) < 4096:
+            _codes_by_message[message] = code
+    return code
+
+
+@dataclass
+class Diagnostic:
+    """Одна ошибка: позиция начала (строка, столбец, смещение) и длина лексемы"""
+    severity: Severity
+    code: str
+    message: str
+    line: int
+    column: int
+    offset: int
+    length: int
+    lexeme: str
+    count: int = 1  # сколько ошибок склеено в эту (подряд идущие недопустимые символы)
+
+    @property
+    def span(self) -> tuple:
+        return self.offset, self.offset + self.length
+
+    def render(self, path: Optional[str] = None) -> str:
+        """Сообщение об ошибке; с path -- в виде 'path:строка:столбец: ...' (несколько файлов)"""
+        message = self.message
+        if self.count > 1:
+            message = f"{message} (и еще {self.count - 1} подряд)"
+        location = f"{path}:{self.line}:{self.column}:" if path is not None else f"[{self.line}:{self.column}]"
+        return f"{location} {self.severity.value}: {message}. Лексема: '{self.lexeme}'"
+
+    def snippet(self, source_map: SourceMap) -> str:
+        """Строка исходного текста с подчеркнутой лексемой ошибки"""
+        return source_map.snippet(self.offset, self.length)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["severity"] = self.severity.name
+        return data
+
+
+class TooManyErrors(ScannerError):
+    """Сканирование прервано: достигнут предел числа ошибок (режим abort)"""
+    def __init__(self, count: int):
+        super().__init__(f"Сканирование прервано после {count} ошибок")
+        self.count = count
+
+
+class DiagnosticCollector:
+    """
+    Сборщик диагностики одного или нескольких файлов.
+
+    max_errors -- сколько ошибок сохранять (None -- без ограничения); остальные
+    только подсчитываются. С abort=True после max_errors ошибок (или после
+    первой, если предел не задан) сканирование прерывается исключением
+    TooManyErrors. collapse=True склеивает непрерывную последовательность
+    недопустимых символов в одну диагностику.
+    """
+    def __init__(self, max_errors: Optional[int] = None, collapse: bool = True, abort: bool = False):
+        if max_errors is not None and max_errors <= 0:
+            raise ValueError("max_errors должен быть положительным")
+        self.max_errors = max_errors
+        self.collapse = collapse
+        self.abort = abort
+        self.diagnostics: List[Diagnostic] = []
+        self.error_count = 0   # все ошибки, включая склеенные и не сохраненные
+        self.suppressed = 0    # ошибки сверх max_errors
+
+    def report_token(self, token: Token, offset: int):
+        """Ошибка сканера: токен ERROR и смещение начала его лексемы"""
+        code = error_code(token.literal_value)
+        self.error_count += 1
+        last = self.diagnostics[-1] if self.diagnostics else None
+        if (self.collapse and code == INVALID_CHARACTER and last is not None
+                and last.code == INVALID_CHARACTER and last.offset + last.length == offset):
+            last.length += len(token.lexeme)
+            last.count += 1
+            if len(last.lexeme) < MAX_RUN_LEXEME:
+                last.lexeme += token.lexeme
+        elif self.max_errors is not None and len(self.diagnostics) >= self.max_errors:
+            self.suppressed += 1
+        else:
+            self.diagnostics.append(Diagnostic(Severity.ERROR, code, token.literal_value, token.line,
+                                               token.column, offset, len(token.lexeme), token.lexeme))
+        if self.abort and self.error_count >= (self.max_errors or 1):
+            raise TooManyErrors(self.error_count)
+
+    def __len__(self) -> int:
+        return len(self.diagnostics)
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        return iter(self.diagnostics)
+
+    def clear(self):
+        self.diagnostics.clear()
+        self.error_count = 0
+        self.suppressed = 0
+
+    def render(self, out: TextIO, source_map: Optional[SourceMap] = None, path: Optional[str] = None):
+        """
+        Вывести накопленную диагностику одной записью и очистить сборщик.
+        С source_map под каждым сообщением печатается строка исходника, с path
+        каждое сообщение начинается с пути файла (вывод нескольких файлов).
+        """
+        lines = []
+        for diagnostic in self.diagnostics:
+            lines.append(diagnostic.render(path))
+            if source_map is not None:
+                lines.append(diagnostic.snippet(source_map))
+        if self.suppressed:
+            prefix = f"{path}: " if path is not None else ""
+            lines.append(f"{prefix}{Severity.NOTE.value}: еще {self.suppressed} ошибок не показано "
+                         f"(предел {self.max_errors})")
+        if lines:
+            out.write("\n".join(lines) + "\n")
+        self.clear()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "errors": self.error_count,
+            "suppressed": self.suppressed,
+            "diagnostics": [diagnostic.to_dict() for diagnostic in self.diagnostics],
+        }, ensure_ascii=False)
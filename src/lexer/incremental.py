@@ -0,0 +1,247 @@
+from bisect import bisect_right
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+
+from .backends import DEFAULT_BACKEND, create_scanner
+from .source_map import SourceMap
+from .symbols import SymbolTable
+from .tokens import Token
+
+if TYPE_CHECKING:
+    from .diagnostics import DiagnosticCollector
+
+# Сколько символов после конца лексемы сканер может просмотреть, решая, где она
+# заканчивается (_peek и _peek_next в _number): правка ближе этого портит токен
+LOOKAHEAD = 2
+
+
+class TextEdit(NamedTuple):
+    """Правка текста: удалить deleted_length символов с offset и вставить inserted_text"""
+    offset: int
+    deleted_length: int
+    inserted_text: str
+
+
+def _line_starts(source: str) -> List[int]:
+    return SourceMap(source).line_starts.tolist()
+
+
+class _Piece(NamedTuple):
+    """
+    Отрезок [start, stop) списка токенов base, номера строк которого сдвинуты
+    на line_delta. Списки разделяются снимками: сдвиг строк после правки не
+    создает новых Token, а прибавляется при чтении.
+    """
+    base: List[Token]
+    start: int
+    stop: int
+    line_delta: int
+
+
+# Больше отрезков снимок не накапливает: они склеиваются в один список (с
+# созданием сдвинутых токенов). Правки в одном месте число отрезков не растят
+MAX_PIECES = 64
+
+
+class LexSnapshot:
+    """
+    Исходный текст вместе с его потоком токенов и индексом начал строк.
+    Новый снимок после правки строится функцией relex (или apply_edit).
+    Поток хранится отрезками старых списков со сдвигом строк (_Piece) и
+    собирается в список Token только при обращении к tokens.
+    """
+    def __init__(self, source: str, tokens: List[Token], line_starts: Optional[List[int]] = None,
+                 backend: str = DEFAULT_BACKEND, symbols: Optional[SymbolTable] = None,
+                 diagnostics: Optional["DiagnosticCollector"] = None):
+        self.source = source
+        self.line_starts = line_starts if line_starts is not None else _line_starts(source)
+        self.backend = backend
+        # Таблица, по которой получены symbol_id токенов (None -- без интернирования);
+        # relex интернирует новые идентификаторы в нее же, и номера старых и
+        # пересканированных токенов согласованы
+        self.symbols = symbols
+        # Сборщик ошибок пересканирования (без него ошибки печатаются в stderr)
+        self.diagnostics = diagnostics
+        # Сколько токенов было пересканировано при построении снимка
+        self.rescanned_tokens = len(tokens)
+        self._set_pieces([_Piece(tokens, 0, len(tokens), 0)])
+
+    @classmethod
+    def from_source(cls, source: str, backend: str = DEFAULT_BACKEND, symbols: Optional[SymbolTable] = None,
+                    diagnostics: Optional["DiagnosticCollector"] = None) -> "LexSnapshot":
+        scanner = create_scanner(source, backend, lazy=True, symbols=symbols, diagnostics=diagnostics)
+        return cls(source, list(scanner), backend=backend, symbols=scanner.symbols, diagnostics=diagnostics)
+
+    def _set_pieces(self, pieces: List[_Piece]):
+        # Соседние отрезки одного списка с одним сдвигом склеиваются, пустые отбрасываются
+        merged: List[_Piece] = []
+        for piece in pieces:
+            if piece.start >= piece.stop:
+                continue
+            if merged:
+                last = merged[-1]
+                if last.base is piece.base and last.stop == piece.start and last.line_delta == piece.line_delta:
+                    merged[-1] = last._replace(stop=piece.stop)
+                    continue
+            merged.append(piece)
+        self._pieces = merged
+        # Индекс в потоке, которым кончается каждый отрезок (для бинарного поиска)
+        self._ends: List[int] = []
+        total = 0
+        for piece in merged:
+            total += piece.stop - piece.start
+            self._ends.append(total)
+        self._tokens: Optional[List[Token]] = None
+        if len(merged) > MAX_PIECES:
+            self._set_pieces([_Piece(self.tokens, 0, total, 0)])
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Поток токенов списком (собирается при первом обращении)"""
+        if self._tokens is None:
+            tokens: List[Token] = []
+            for base, start, stop, line_delta in self._pieces:
+                if line_delta:
+                    tokens += [Token(t.type, t.lexeme, t.line + line_delta, t.column, t.literal_value, t.symbol_id)
+                               for t in base[start:stop]]
+                else:
+                    tokens += base[start:stop]
+            # Собранный список заменяет отрезки: сдвинутые токены создаются один раз
+            self._pieces = [_Piece(tokens, 0, len(tokens), 0)]
+            self._ends = [len(tokens)]
+            self._tokens = tokens
+        return self._tokens
+
+    def __len__(self) -> int:
+        """Число токенов (включая END_OF_FILE)"""
+        return self._ends[-1] if self._ends else 0
+
+    def _locate(self, index: int) -> tuple:
+        """(токен из базового списка, его строка в этом снимке)"""
+        number = bisect_right(self._ends, index)
+        base, start, _, line_delta = self._pieces[number]
+        token = base[start + index - (self._ends[number - 1] if number else 0)]
+        return token, token.line + line_delta
+
+    def _slice(self, lo: int, hi: int, line_delta: int = 0) -> List[_Piece]:
+        """Отрезки, покрывающие токены [lo, hi) этого снимка, с дополнительным сдвигом строк"""
+        pieces = []
+        begin = 0
+        for piece, end in zip(self._pieces, self._ends):
+            if begin < hi and lo < end:
+                pieces.append(_Piece(piece.base, piece.start + max(lo, begin) - begin,
+                                     piece.start + min(hi, end) - begin, piece.line_delta + line_delta))
+            begin = end
+        return pieces
+
+    def token_start(self, index: int) -> int:
+        """
+        Смещение начала лексемы. Строка токена -- строка конца его лексемы
+        (так Scanner сообщает позицию незакрытого многострочного комментария),
+        а столбец отсчитывается от начала этой строки, поэтому формула общая.
+        """
+        token, line = self._locate(index)
+        return self.line_starts[line - 1] + token.column - 1
+
+    def token_end(self, index: int) -> int:
+        return self.token_start(index) + len(self._locate(index)[0].lexeme)
+
+    def apply_edit(self, offset: int, deleted_length: int, inserted_text: str) -> "LexSnapshot":
+        return relex(self, TextEdit(offset, deleted_length, inserted_text))
+
+
+def relex(snapshot: LexSnapshot, edit: TextEdit) -> LexSnapshot:
+    """
+    Инкрементальное пересканирование после правки.
+
+    Токены, закончившиеся заметно раньше правки, переиспользуются как есть.
+    Сканирование возобновляется с конца последнего из них и идет, пока начало
+    нового токена не совпадет (с учетом сдвига) с началом старого токена за
+    правкой: с этой границы сканер видит тот же текст, поэтому хвост старого
+    потока переиспользуется: столбцы пересчитываются только на строке конца
+    правки, а сдвиг строк остальных токенов запоминается отрезком и
+    прибавляется при чтении. Результат совпадает с полным пересканированием.
+    """
+    old_source = snapshot.source
+    old_count = len(snapshot)
+    old_starts = snapshot.line_starts
+    offset, deleted, inserted = edit
+    if not (0 <= offset and deleted >= 0 and offset + deleted <= len(old_source)):
+        raise ValueError(f"Правка {edit} выходит за пределы текста длины {len(old_source)}")
+
+    edit_end = offset + deleted
+    delta = len(inserted) - deleted
+    source = old_source[:offset] + inserted + old_source[edit_end:]
+
+    # Начала строк нового текста: префикс без изменений, строки вставки, сдвинутый хвост
+    keep = bisect_right(old_starts, offset)
+    tail = bisect_right(old_starts, edit_end)
+    line_starts = old_starts[:keep]
+    pos = inserted.find('\n')
+    while pos >= 0:
+        line_starts.append(offset + pos + 1)
+        pos = inserted.find('\n', pos + 1)
+    line_starts += [start + delta for start in old_starts[tail:]] if delta else old_starts[tail:]
+    line_delta = len(line_starts) - len(old_starts)
+
+    # Последний токен (кроме EOF), который правка не могла задеть
+    lo, hi = 0, old_count - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if snapshot.token_end(mid) + LOOKAHEAD <= offset:
+            lo = mid + 1
+        else:
+            hi = mid
+    keep_tokens = lo
+    restart = snapshot.token_end(keep_tokens - 1) if keep_tokens else 0
+
+    scanner = create_scanner(source, snapshot.backend, lazy=True, symbols=snapshot.symbols,
+                             diagnostics=snapshot.diagnostics)
+    # Индекс строк нового текста уже известен: сканер не строит его заново
+    scanner._source_map = SourceMap(source, line_starts)
+    scanner._resume_at(restart)
+
+    insert_end = offset + len(inserted)
+    fresh: List[Token] = []
+    reuse_from = old_count
+    j = keep_tokens
+    for token in scanner:
+        start = line_starts[token.line - 1] + token.column - 1
+        if start >= insert_end:
+            # Ищем старый токен, начинающийся в той же позиции неизмененного хвоста
+            old_start = start - delta
+            while j < old_count and snapshot.token_start(j) < old_start:
+                j += 1
+            if j < old_count and snapshot.token_start(j) == old_start:
+                reuse_from = j
+                break
+        fresh.append(token)
+
+    pieces = snapshot._slice(0, keep_tokens) + [_Piece(fresh, 0, len(fresh), 0)]
+    if reuse_from < old_count:
+        pieces += _shift_tail(snapshot, reuse_from, edit_end, delta, line_delta, line_starts)
+
+    result = LexSnapshot(source, [], line_starts, snapshot.backend, snapshot.symbols, snapshot.diagnostics)
+    result._set_pieces(pieces)
+    result.rescanned_tokens = len(fresh)
+    return result
+
+
+def _shift_tail(snapshot: LexSnapshot, first: int, edit_end: int, delta: int, line_delta: int,
+                line_starts: List[int]) -> List[_Piece]:
+    """Отрезки старых токенов за точкой синхронизации с пересчитанными позициями"""
+    # Строка, на которой закончилась правка: у токенов на ней меняется и столбец
+    edit_line = bisect_right(snapshot.line_starts, edit_end)
+    shifted: List[Token] = []
+    index = first
+    count = len(snapshot)
+    while index < count:
+        token, line = snapshot._locate(index)
+        if line != edit_line:
+            break
+        new_line = line + line_delta
+        column = snapshot.token_start(index) + delta - line_starts[new_line - 1] + 1
+        shifted.append(Token(token.type, token.lexeme, new_line, column, token.literal_value, token.symbol_id))
+        index += 1
+    # На последующих строках меняется только номер строки: токены разделяются со
+    # старым снимком, а сдвиг прибавляется при чтении
+    return [_Piece(shifted, 0, len(shifted), 0)] + snapshot._slice(index, count, line_delta)
@@ -0,0 +1,414 @@
+"""
+Генератор лексера: компилирует декларативную спецификацию (lexspec.RULES)
+в минимизированную таблицу переходов DFA и кэширует ее на диске.
+
+Диалект регулярных выражений: литералы, '.', классы '[...]' и '[^...]',
+группы '(...)', альтернатива '|', повторения '*', '+', '?', экранирование '\\'.
+Именованные классы: '\\a' -- буква или '_' (str.isalpha), '\\d' -- цифра (str.isdigit),
+'\\n', '\\t', '\\r' -- управляющие символы.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .lexspec import LexRule, RULES
+
+# Версия формата таблицы: меняется при изменении алгоритма генерации
+GENERATOR_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "__pycache__"
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+_NAMED = {"a": "alpha", "d": "digit"}
+
+
+class LexSpecError(Exception):
+    """Ошибка в декларативной спецификации лексики"""
+    pass
+
+
+# --- Разбор регулярных выражений ---
+
+@dataclass(frozen=True)
+class CharSet:
+    chars: FrozenSet[str]
+    named: FrozenSet[str] = frozenset()
+    negated: bool = False
+
+
+class _RegexParser:
+    def __init__(self, pattern: str):
+        self._pattern = pattern
+        self._pos = 0
+
+    def parse(self):
+        node = self._alternation()
+        if self._pos != len(self._pattern):
+            raise LexSpecError(f"Лишний символ в шаблоне {self._pattern!r} на позиции {self._pos}")
+        return node
+
+    def _peek(self) -> str:
+        return self._pattern[self._pos] if self._pos < len(self._pattern) else ""
+
+    def _alternation(self):
+        branches = [self._concat()]
+        while self._peek() == "|":
+            self._pos += 1
+            branches.append(self._concat())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _concat(self):
+        items = []
+        while self._peek() not in ("", "|", ")"):
+            items.append(self._repeat())
+        return ("cat", items)
+
+    def _repeat(self):
+        node = self._atom()
+        while self._peek() in ("*", "+", "?"):
+            node = (self._peek(), node)
+            self._pos += 1
+        return node
+
+    def _atom(self):
+        c = self._peek()
+        self._pos += 1
+        if c == "(":
+            node = self._alternation()
+            if self._peek() != ")":
+                raise LexSpecError(f"Незакрытая скобка в шаблоне {self._pattern!r}")
+            self._pos += 1
+            return node
+        if c == "[":
+            return ("set", self._set())
+        if c == ".":
+            return ("set", CharSet(frozenset(), negated=True))
+        if c == "\\":
+            return ("set", self._escape())
+        if c in ("*", "+", "?", ")", ""):
+            raise LexSpecError(f"Неожиданный символ {c!r} в шаблоне {self._pattern!r}")
+        return ("set", CharSet(frozenset(c)))
+
+    def _escape(self) -> CharSet:
+        c = self._peek()
+        if not c:
+            raise LexSpecError(f"Обрыв экранирования в шаблоне {self._pattern!r}")
+        self._pos += 1
+        if c in _NAMED:
+            return CharSet(frozenset(), frozenset([_NAMED[c]]))
+        return CharSet(frozenset(_ESCAPES.get(c, c)))
+
+    def _set(self) -> CharSet:
+        negated = self._peek() == "^"
+        if negated:
+            self._pos += 1
+        chars, named = set(), set()
+        while self._peek() != "]":
+            c = self._peek()
+            if not c:
+                raise LexSpecError(f"Незакрытый класс символов в шаблоне {self._pattern!r}")
+            self._pos += 1
+            if c == "\\":
+                item = self._escape()
+                chars |= item.chars
+                named |= item.named
+            else:
+                chars.add(c)
+        self._pos += 1
+        return CharSet(frozenset(chars), frozenset(named), negated)
+
+
+def parse_regex(pattern: str):
+    return _RegexParser(pattern).parse()
+
+
+def _collect_sets(node, out: List[CharSet]):
+    kind = node[0]
+    if kind == "set":
+        out.append(node[1])
+    elif kind in ("cat", "alt"):
+        for child in node[1]:
+            _collect_sets(child, out)
+    else:
+        _collect_sets(node[1], out)
+
+
+# --- Классы символов ---
+
+@dataclass
+class CharClasses:
+    """
+    Разбиение алфавита на классы эквивалентности: по классу на каждый символ,
+    явно упомянутый в спецификации, плюс "прочие буквы", "прочие цифры" и "прочее".
+    """
+    literals: List[str]
+
+    @property
+    def alpha_other(self) -> int:
+        return len(self.literals)
+
+    @property
+    def digit_other(self) -> int:
+        return len(self.literals) + 1
+
+    @property
+    def other(self) -> int:
+        return len(self.literals) + 2
+
+    @property
+    def count(self) -> int:
+        return len(self.literals) + 3
+
+    def resolve(self, char_set: CharSet) -> FrozenSet[int]:
+        """Множество номеров классов, входящих в char_set"""
+        alpha = "alpha" in char_set.named
+        digit = "digit" in char_set.named
+        members = set()
+        for index, c in enumerate(self.literals):
+            if c in char_set.chars or (alpha and (c.isalpha() or c == "_")) or (digit and c.isdigit()):
+                members.add(index)
+        if alpha:
+            members.add(self.alpha_other)
+        if digit:
+            members.add(self.digit_other)
+        if char_set.negated:
+            members = set(range(self.count)) - members
+        return frozenset(members)
+
+
+# --- NFA (конструкция Томпсона) ---
+
+class _NFA:
+    def __init__(self):
+        self.eps: List[List[int]] = []
+        self.edges: List[List[Tuple[FrozenSet[int], int]]] = []
+        self.accept: Dict[int, int] = {}
+
+    def new_state(self) -> int:
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+    def build(self, node, classes: CharClasses) -> Tuple[int, int]:
+        kind = node[0]
+        if kind == "set":
+            start, end = self.new_state(), self.new_state()
+            self.edges[start].append((classes.resolve(node[1]), end))
+            return start, end
+        if kind == "cat":
+            start = end = self.new_state()
+            for child in node[1]:
+                s, e = self.build(child, classes)
+                self.eps[end].append(s)
+                end = e
+            return start, end
+        if kind == "alt":
+            start, end = self.new_state(), self.new_state()
+            for child in node[1]:
+                s, e = self.build(child, classes)
+                self.eps[start].append(s)
+                self.eps[e].append(end)
+            return start, end
+        s, e = self.build(node[1], classes)
+        start, end = self.new_state(), self.new_state()
+        self.eps[start].append(s)
+        self.eps[e].append(end)
+        if kind in ("*", "?"):
+            self.eps[start].append(end)
+        if kind in ("*", "+"):
+            self.eps[e].append(s)
+        return start, end
+
+    def closure(self, states) -> FrozenSet[int]:
+        stack = list(states)
+        seen = set(states)
+        while stack:
+            for target in self.eps[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+
+# --- Таблица DFA ---
+
+@dataclass
+class DFATable:
+    """Минимизированная таблица переходов. Состояние 0 -- начальное, -1 -- тупик."""
+    rules: List[str]
+    multiline: List[bool]
+    literals: List[str]
+    num_classes: int
+    transitions: List[int]  # плоская таблица: transitions[state * num_classes + cls]
+    accept: List[int]       # номер правила для принимающего состояния или -1
+    spec_hash: str = ""
+
+    @property
+    def num_states(self) -> int:
+        return len(self.accept)
+
+    @property
+    def classes(self) -> CharClasses:
+        return CharClasses(self.literals)
+
+    def class_map(self) -> Dict[str, int]:
+        return {c: i for i, c in enumerate(self.literals)}
+
+    def to_json(self) -> dict:
+        return {
+            "version": GENERATOR_VERSION,
+            "spec_hash": self.spec_hash,
+            "rules": self.rules,
+            "multiline": self.multiline,
+            "literals": self.literals,
+            "num_classes": self.num_classes,
+            "transitions": self.transitions,
+            "accept": self.accept,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DFATable":
+        return cls(
+            rules=data["rules"],
+            multiline=data["multiline"],
+            literals=data["literals"],
+            num_classes=data["num_classes"],
+            transitions=data["transitions"],
+            accept=data["accept"],
+            spec_hash=data["spec_hash"],
+        )
+
+
+def spec_hash(rules: Sequence[LexRule]) -> str:
+    payload = json.dumps([GENERATOR_VERSION, [list(rule) for rule in rules]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_rules(rules: Sequence[LexRule]) -> DFATable:
+    """Спецификация -> NFA -> DFA (построение подмножеств) -> минимизация"""
+    trees = [parse_regex(rule.pattern) for rule in rules]
+    sets: List[CharSet] = []
+    for tree in trees:
+        _collect_sets(tree, sets)
+    classes = CharClasses(sorted({c for s in sets for c in s.chars}))
+
+    nfa = _NFA()
+    nfa_start = nfa.new_state()
+    for index, tree in enumerate(trees):
+        s, e = nfa.build(tree, classes)
+        nfa.eps[nfa_start].append(s)
+        nfa.accept[e] = index
+
+    # Построение подмножеств
+    start = nfa.closure([nfa_start])
+    dfa_states: Dict[FrozenSet[int], int] = {start: 0}
+    order = [start]
+    moves: List[List[int]] = []
+    i = 0
+    while i < len(order):
+        current = order[i]
+        row = []
+        for cls in range(classes.count):
+            targets = [t for s in current for members, t in nfa.edges[s] if cls in members]
+            if not targets:
+                row.append(-1)
+                continue
+            target = nfa.closure(targets)
+            if target not in dfa_states:
+                dfa_states[target] = len(order)
+                order.append(target)
+            row.append(dfa_states[target])
+        moves.append(row)
+        i += 1
+    accept = [min((nfa.accept[s] for s in state if s in nfa.accept), default=-1) for state in order]
+
+    moves, accept = _minimize(moves, accept)
+    return DFATable(
+        rules=[rule.name for rule in rules],
+        multiline=[rule.multiline for rule in rules],
+        literals=classes.literals,
+        num_classes=classes.count,
+        transitions=[target for row in moves for target in row],
+        accept=accept,
+        spec_hash=spec_hash(rules),
+    )
+
+
+def _minimize(moves: List[List[int]], accept: List[int]) -> Tuple[List[List[int]], List[int]]:
+    """Минимизация DFA разбиением на классы эквивалентности (алгоритм Мура)"""
+    block = list(accept)
+    num_blocks = -1
+    while True:
+        signatures: Dict[tuple, int] = {}
+        new_block = []
+        for state, row in enumerate(moves):
+            sig = (block[state],) + tuple(block[t] if t >= 0 else None for t in row)
+            new_block.append(signatures.setdefault(sig, len(signatures)))
+        if len(signatures) == num_blocks:
+            break
+        block, num_blocks = new_block, len(signatures)
+
+    # Перенумеруем блоки так, чтобы начальное состояние осталось нулевым
+    renumber: Dict[int, int] = {}
+    for state in range(len(moves)):
+        renumber.setdefault(block[state], len(renumber))
+    new_moves: List[List[int]] = [[] for _ in renumber]
+    new_accept = [-1] * len(renumber)
+    for state, row in enumerate(moves):
+        b = renumber[block[state]]
+        new_moves[b] = [renumber[block[t]] if t >= 0 else -1 for t in row]
+        new_accept[b] = accept[state]
+    return new_moves, new_accept
+
+
+# --- Кэш таблиц ---
+
+_loaded: Dict[str, DFATable] = {}
+
+
+def load_table(rules: Sequence[LexRule] = RULES, cache_dir: Optional[Path] = None) -> DFATable:
+    """
+    Получить таблицу для спецификации: из памяти процесса, из файла на диске
+    или сгенерировать заново (с сохранением на диск).
+    """
+    key = spec_hash(rules)
+    table = _loaded.get(key)
+    if table is not None:
+        return table
+
+    path = Path(cache_dir or DEFAULT_CACHE_DIR) / f"lexer_dfa.{key}.json"
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == GENERATOR_VERSION and data.get("spec_hash") == key:
+            table = DFATable.from_json(data)
+    except (OSError, ValueError, KeyError):
+        table = None
+
+    if table is None:
+        table = compile_rules(rules)
+        _write_atomic(path, json.dumps(table.to_json(), ensure_ascii=False))
+
+    _loaded[key] = table
+    return table
+
+
+def _write_atomic(path: Path, text: str):
+    """Запись через временный файл + os.replace; ошибки записи кэша не критичны"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,81 @@
+from typing import List, NamedTuple
+from .tokens import TokenType, KEYWORDS
+
+# Имена специальных правил (не являются TokenType, обрабатываются действиями сканера)
+SKIP = "SKIP"
+UNTERMINATED_COMMENT = "UNTERMINATED_COMMENT"
+UNTERMINATED_STRING = "UNTERMINATED_STRING"
+LONE_AMPERSAND = "LONE_AMPERSAND"
+LONE_PIPE = "LONE_PIPE"
+
+
+class LexRule(NamedTuple):
+    """
+    Декларативное правило лексики.
+
+    name      -- имя TokenType или специального действия
+    pattern   -- регулярное выражение (упрощенный диалект, см. lexgen.parse_regex)
+    multiline -- может ли совпадение содержать перенос строки
+    """
+    name: str
+    pattern: str
+    multiline: bool = False
+
+
+# Операторы и разделители (docs/language_spec.md). Двухсимвольные варианты
+# выигрывают у односимвольных по правилу самого длинного совпадения.
+OPERATORS = [
+    ("+=", TokenType.PLUS_ASSIGN), ("+", TokenType.PLUS),
+    ("-=", TokenType.MINUS_ASSIGN), ("-", TokenType.MINUS),
+    ("*=", TokenType.STAR_ASSIGN), ("*", TokenType.STAR),
+    ("/=", TokenType.SLASH_ASSIGN), ("/", TokenType.SLASH),
+    ("%", TokenType.PERCENT),
+    ("==", TokenType.EQUAL_EQUAL), ("=", TokenType.ASSIGN),
+    ("!=", TokenType.BANG_EQUAL), ("!", TokenType.BANG),
+    ("<=", TokenType.LESS_EQUAL), ("<", TokenType.LESS),
+    (">=", TokenType.GREATER_EQUAL), (">", TokenType.GREATER),
+    ("&&", TokenType.AND_AND), ("||", TokenType.OR_OR),
+    ("(", TokenType.LPAREN), (")", TokenType.RPAREN),
+    ("{", TokenType.LBRACE), ("}", TokenType.RBRACE),
+    ("[", TokenType.LBRACKET), ("]", TokenType.RBRACKET),
+    (";", TokenType.SEMICOLON), (",", TokenType.COMMA), (":", TokenType.COLON),
+]
+
+_META = set("()[]|*+?.\\")
+
+
+def escape(text: str) -> str:
+    """Экранировать текст для использования как литерал в шаблоне"""
+    return "".join("\\" + c if c in _META else c for c in text)
+
+
+def build_rules() -> List[LexRule]:
+    """
+    Спецификация лексики языка. Порядок правил задает приоритет
+    при совпадениях одинаковой длины (ключевые слова раньше идентификаторов).
+    """
+    rules = [
+        # Пробельные символы и комментарии (LEX-6)
+        LexRule(SKIP, r"[ \t\r\n]+", multiline=True),
+        LexRule(SKIP, r"//[^\n]*"),
+        LexRule(SKIP, r"/\*([^*]|\*+[^*/])*\*+/", multiline=True),
+        # Незакрытый комментарий может быть самым длинным совпадением только в конце файла
+        LexRule(UNTERMINATED_COMMENT, r"/\*([^*]|\*+[^*/])*\**", multiline=True),
+        # Строки (LEX-4): без переноса строки внутри
+        LexRule(TokenType.STRING_LITERAL.name, r'"[^"\n]*"'),
+        LexRule(UNTERMINATED_STRING, r'"[^"\n]*'),
+        # Числа (LEX-4)
+        LexRule(TokenType.FLOAT_LITERAL.name, r"\d+\.\d+"),
+        LexRule(TokenType.INT_LITERAL.name, r"\d+"),
+    ]
+    # Ключевые слова (LEX-3)
+    rules += [LexRule(type_t.name, escape(word)) for word, type_t in KEYWORDS.items()]
+    # Идентификаторы (LEX-2): буква или '_' (как в Scanner._is_alpha_or_underscore)
+    rules.append(LexRule(TokenType.IDENTIFIER.name, r"\a(\a|\d)*"))
+    rules += [LexRule(type_t.name, escape(text)) for text, type_t in OPERATORS]
+    # Одиночные '&' и '|' - ошибки со своим сообщением
+    rules += [LexRule(LONE_AMPERSAND, "&"), LexRule(LONE_PIPE, r"\|")]
+    return rules
+
+
+RULES = build_rules()
@@ -0,0 +1,194 @@
+"""
+Параллельное сканирование одного большого файла.
+
+Текст делится на куски по границам строк, куски сканируются в пуле процессов.
+На границе строки состояние сканера определяется одним признаком: находится
+ли начало куска внутри многострочного комментария (строки и однострочные
+комментарии не переходят через перевод строки). Процесс-исполнитель не знает
+конца предыдущего куска и угадывает это состояние и сдвигает номера строк
+своих токенов на число строк перед куском; последовательный проход проверяет
+каждую догадку по состоянию конца предыдущего куска, пересканирует куски с
+неверной догадкой и склеивает токены.
+Результат совпадает с Scanner(source).
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .backends import DEFAULT_BACKEND, create_scanner
+from .diagnostics import DiagnosticCollector
+from .scanner import report_token_error
+from .source_map import SourceMap
+from .symbols import SymbolTable
+from .tokens import Token, TokenType
+
+# Меньше этого размера куска параллельное сканирование не окупает пул процессов
+MIN_CHUNK_SIZE = 256 * 1024
+# Кусков больше, чем процессов: выравнивание нагрузки между процессами
+CHUNKS_PER_JOB = 4
+
+UNTERMINATED_COMMENT = "Незавершенный многострочный комментарий (EOF)"
+
+# Состояние конца куска: комментарий, открытый до начала куска, в нем не закрылся
+CARRIED = -1
+
+_NOT_NEWLINE = re.compile(r'[^\n]')
+
+
+@dataclass
+class ChunkTokens:
+    """
+    Токены куска по полям: списки передаются между процессами и превращаются в
+    Token заметно быстрее, чем сами экземпляры Token. Строки -- сквозные по
+    файлу, symbol_ids -- номера в names (таблице символов куска; пустой, если
+    идентификаторы не интернируются).
+    """
+    types: List[TokenType]
+    lexemes: List[str]
+    lines: List[int]
+    columns: List[int]
+    values: List[object]
+    symbol_ids: List[Optional[int]]
+    names: List[str]
+    errors: List[int]              # индексы токенов ERROR
+    open_at: Optional[int] = None  # состояние конца куска
+
+
+@dataclass
+class ParallelResult:
+    tokens: List[Token]
+    chunks: int = 1
+    # Номера кусков, начальное состояние которых было угадано неверно (они пересканированы)
+    mispredicted: List[int] = field(default_factory=list)
+
+
+def split_chunks(source: str, count: int) -> List[int]:
+    """Смещения начал кусков: каждое, кроме первого, -- сразу после '\\n'"""
+    starts = [0]
+    step = len(source) // count
+    for i in range(1, count):
+        newline = source.find('\n', max(i * step, starts[-1]))
+        if newline == -1 or newline + 1 >= len(source):
+            break
+        if newline + 1 > starts[-1]:
+            starts.append(newline + 1)
+    return starts
+
+
+def guess_in_comment(text: str) -> bool:
+    """
+    Догадка о начале куска внутри комментария: первый '*/' встречается раньше
+    первого '/*'. Догадка ошибается, если '*/' стоит, например, в строке или
+    однострочном комментарии; такие куски исправляет последовательный проход.
+    """
+    close = text.find("*/")
+    if close == -1:
+        return False
+    opening = text.find("/*")
+    return opening == -1 or close < opening
+
+
+def lex_chunk(text: str, in_comment: bool, line_offset: int = 0,
+              backend: str = DEFAULT_BACKEND, intern: bool = False) -> ChunkTokens:
+    """
+    Отсканировать кусок, начинающийся со строки line_offset + 1, при заданном
+    начальном состоянии. Токены -- без END_OF_FILE и без ошибки незакрытого
+    комментария в конце куска; состояние конца (open_at) -- None, смещение в
+    куске начала незакрытого комментария или CARRIED.
+    """
+    length = len(text)
+    if in_comment:
+        close = text.find("*/")
+        if close == -1:
+            return ChunkTokens([], [], [], [], [], [], [], [], CARRIED)
+        # Закрытая часть комментария заменяется пробелами с сохранением переводов
+        # строк: строки и столбцы остальных токенов куска не меняются
+        text = _NOT_NEWLINE.sub(' ', text[:close + 2]) + text[close + 2:]
+    # Ошибки куска не печатаются: их в порядке файла сообщает последовательный проход
+    scanner = create_scanner(text, backend, diagnostics=DiagnosticCollector(max_errors=1),
+                             symbols=SymbolTable() if intern else None)
+    tokens = list(scanner)
+    tokens.pop()  # END_OF_FILE
+    open_at = None
+    if tokens and tokens[-1].type == TokenType.ERROR and tokens[-1].literal_value == UNTERMINATED_COMMENT:
+        # Незакрытый комментарий всегда тянется до конца куска
+        open_at = length - len(tokens.pop().lexeme)
+    # Кусок начинается с начала строки: столбцы уже верны, а номера строк
+    # сдвигаются к сквозным по файлу
+    return ChunkTokens(
+        [t.type for t in tokens], [t.lexeme for t in tokens], [t.line + line_offset for t in tokens],
+        [t.column for t in tokens], [t.literal_value for t in tokens], [t.symbol_id for t in tokens],
+        scanner.symbols.names if intern else [], [i for i, t in enumerate(tokens) if t.type == TokenType.ERROR], open_at)
+
+
+def _lex_chunk_task(args) -> Tuple[bool, ChunkTokens]:
+    text, line_offset, backend, intern = args
+    # Первый кусок начинается с начала файла: угадывать нечего
+    guess = line_offset > 0 and guess_in_comment(text)
+    return guess, lex_chunk(text, guess, line_offset, backend, intern)
+
+
+def lex_parallel(source: str, jobs: Optional[int] = None, backend: str = DEFAULT_BACKEND,
+                 chunk_size: int = MIN_CHUNK_SIZE,
+                 diagnostics: Optional[DiagnosticCollector] = None,
+                 symbols: Optional[SymbolTable] = None) -> ParallelResult:
+    """
+    Отсканировать source кусками в jobs процессах (по умолчанию -- по числу
+    процессоров). Кусков не больше jobs * CHUNKS_PER_JOB и не меньше
+    chunk_size символов каждый; при одном куске пул не создается. Ошибки
+    сообщаются в порядке файла сборщику diagnostics (без него -- в stderr);
+    с таблицей symbols идентификаторы интернируются в нее в порядке файла, как у Scanner.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    count = max(1, min(jobs * CHUNKS_PER_JOB, len(source) // max(1, chunk_size)))
+    source_map = SourceMap(source)
+    starts = split_chunks(source, count)
+    bounds = list(zip(starts, starts[1:] + [len(source)]))
+    intern = symbols is not None
+    tasks = [(source[start:end], source_map.line_of(start) - 1, backend, intern) for start, end in bounds]
+    if jobs <= 1 or len(tasks) <= 1:
+        results = list(map(_lex_chunk_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_lex_chunk_task, tasks))
+
+    result = ParallelResult([], chunks=len(tasks))
+    line_starts = source_map.line_starts
+    tokens = result.tokens
+    comment_start: Optional[int] = None  # начало открытого комментария (смещение в source)
+    for index, ((start, end), (guess, chunk)) in enumerate(zip(bounds, results)):
+        if guess != (comment_start is not None):
+            # Догадка опровергнута концом предыдущего куска: пересканировать
+            result.mispredicted.append(index)
+            text, line_offset, _, _ = tasks[index]
+            chunk = lex_chunk(text, comment_start is not None, line_offset, backend, intern)
+        lexemes, values, symbol_ids = chunk.lexemes, chunk.values, chunk.symbol_ids
+        if intern:
+            # Номера символов куска -> номера в общей таблице (имена добавляются в порядке файла)
+            names = symbols.names
+            mapping = [symbols.intern(name) for name in chunk.names]
+            symbol_ids = [None if i is None else mapping[i] for i in symbol_ids]
+            lexemes = [lexeme if i is None else names[i] for lexeme, i in zip(lexemes, symbol_ids)]
+            values = [value if i is None else names[i] for value, i in zip(values, symbol_ids)]
+        first = len(tokens)
+        tokens.extend(map(Token, chunk.types, lexemes, chunk.lines, chunk.columns, values, symbol_ids))
+        for i in chunk.errors:
+            token = tokens[first + i]
+            report_token_error(token, line_starts[token.line - 1] + token.column - 1, diagnostics)
+        if chunk.open_at is None:
+            comment_start = None
+        elif chunk.open_at != CARRIED:
+            comment_start = start + chunk.open_at
+
+    if comment_start is not None:
+        # Ошибка незакрытого комментария: позиция -- строка конца файла, как у Scanner
+        line, column = source_map.token_position(comment_start, len(source))
+        token = Token(TokenType.ERROR, source[comment_start:], line, column, UNTERMINATED_COMMENT)
+        tokens.append(token)
+        report_token_error(token, comment_start, diagnostics)
+    line, column = source_map.position(len(source))
+    tokens.append(Token(TokenType.END_OF_FILE, "", line, column, None))
+    return result
+
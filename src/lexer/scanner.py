@@ -1,5 +1,50 @@
-from typing import List
+import re
+import sys
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
 from .tokens import Token, TokenType, KEYWORDS
+from .source_map import SourceMap
+from .symbols import SymbolTable
+from .token_buffer import TokenBuffer
+from .token_cache import TokenCache
+
+if TYPE_CHECKING:
+    from .diagnostics import DiagnosticCollector
+    from .stats import LexerStats
+
+# Серии символов, которые подсканеры поглощают одним вызовом re.match вместо
+# посимвольного _peek/_advance. \w шире, чем isalpha/isdigit/'_' (включает,
+# например, дроби '½'), поэтому не-ASCII серия идентификатора или числа
+# дополнительно проверяется посимвольно (_skip_run)
+_WHITESPACE_RUN = re.compile(r'[ \t\r\n]*')
+_WORD_RUN = re.compile(r'\w*')
+_DIGIT_RUN = re.compile(r'[^\W_a-zA-Z]*')
+_STRING_BODY = re.compile(r'[^"\n]*')
+
+# Односимвольные токены и операторы вида X / X= (таблицы вместо цепочки if/elif)
+_SINGLE_CHAR_TOKENS = {
+    '(': TokenType.LPAREN, ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE, '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET, ']': TokenType.RBRACKET,
+    ';': TokenType.SEMICOLON, ',': TokenType.COMMA, ':': TokenType.COLON,
+    '%': TokenType.PERCENT,
+}
+_ASSIGN_OPERATORS = {
+    '+': (TokenType.PLUS, TokenType.PLUS_ASSIGN),
+    '-': (TokenType.MINUS, TokenType.MINUS_ASSIGN),
+    '*': (TokenType.STAR, TokenType.STAR_ASSIGN),
+    '=': (TokenType.ASSIGN, TokenType.EQUAL_EQUAL),
+    '!': (TokenType.BANG, TokenType.BANG_EQUAL),
+    '<': (TokenType.LESS, TokenType.LESS_EQUAL),
+    '>': (TokenType.GREATER, TokenType.GREATER_EQUAL),
+}
+
+def report_token_error(token: Token, offset: int, diagnostics: Optional["DiagnosticCollector"]):
+    """Передать ошибку сборщику диагностики или вывести ее в sys.stderr"""
+    if diagnostics is not None:
+        diagnostics.report_token(token, offset)
+        return
+    print(f"[{token.line}:{token.column}] Ошибка: {token.literal_value}. Лексема: '{token.lexeme}'", file=sys.stderr)
+
 
 class ScannerError(Exception):
     """Исключение для ошибок лексики (опционально, используем для восстановления)"""
@@ -9,45 +54,112 @@ class Scanner:
     """
     Лексический анализатор (сканер) по требованию LEX-2.
     """
-    def __init__(self, source: str):
+    # Смещение self._source во всем исходном тексте (ненулевое у StreamScanner)
+    _window_base = 0
+
+    def __init__(self, source: str, lazy: bool = False, compact: bool = False,
+                 cache: Optional[TokenCache] = None, stats: Optional["LexerStats"] = None,
+                 diagnostics: Optional["DiagnosticCollector"] = None,
+                 symbols: Optional[SymbolTable] = None):
         self._source = source
-        self._tokens: List[Token] = []
+        # Таблица символов компиляции: с ней идентификаторы интернируются и получают
+        # symbol_id; без нее таблицы нет (память сканера не растет с числом имен)
+        self.symbols = symbols
+        # В компактном режиме токены хранятся в TokenBuffer (структура массивов)
+        # и материализуются в Token только при обращении
+        self._compact = compact
+        self._tokens: Union[List[Token], TokenBuffer] = TokenBuffer(source, self.symbols) if compact else []
+        # Токены, созданные последним вызовом _scan_token и еще не отданные потребителю
+        self._pending: List[Token] = []
         
         # Указатели сканирования
         self._start = 0      # Начало текущей сканируемой лексемы
         self._current = 0    # Текущий символ (lookahead)
-        self._line = 1       # Текущая строка (1-based)
-        self._column_start_of_line = 0 # Индекс символа, где началась текущая строка
+        # Строки и столбцы не отслеживаются посимвольно: курсор строк только
+        # продвигается вперед, переводы строк между концами соседних токенов
+        # считаются пачкой. _line -- номер строки позиции _counted,
+        # _column_start_of_line -- начало этой строки, _line_end -- ближайший
+        # перевод строки после _counted (до него токены лежат на строке _line)
+        self._line = 1
+        self._column_start_of_line = 0
+        self._counted = 0
+        self._line_end = -1
+        # Индекс строк всего текста для произвольного доступа (строится по требованию)
+        self._source_map: Optional[SourceMap] = None
         
         # Кэш для next_token/peek_token
         self._scanned = False
         self._token_index = 0
-        
-        # Сразу сканируем весь файл в конструкторе (можно было бы лениво, 
-        # но для упрощения интерфейса next/peek сделаем так)
-        self._scan_all()
+
+        # В ленивом режиме токены порождаются по требованию генератором,
+        # а в памяти хранится только один токен предпросмотра
+        self._lazy = lazy
+        self._stream: Optional[Iterator[Token]] = None
+        self._lookahead: Optional[Token] = None
+
+        # Постоянный кэш токенов (по хэшу содержимого): при попадании файл не сканируется
+        self._cache = cache
+
+        # Сборщик ошибок; без него каждая ошибка сразу печатается в stderr
+        self._diagnostics = diagnostics
+
+        # Статистика подключается подменой методов этого экземпляра: без нее
+        # основной цикл не выполняет никаких дополнительных проверок
+        if stats is not None:
+            if cache is not None:
+                raise ValueError("Статистика сканирования несовместима с кэшем токенов")
+            stats.attach(self)
+
+        if lazy:
+            self._stream = self._cached_stream() if cache is not None else self._token_stream()
+        else:
+            # Сразу сканируем весь файл в конструкторе
+            self._scan_all()
         
     def next_token(self) -> Token:
         """Метод для получения следующего токена с продвижением (LEX-2)"""
+        if self._lazy:
+            token = self._fill_lookahead()
+            if token is not None:
+                self._lookahead = None
+                self._token_index += 1
+                return token
+            return self._eof_after_end()
         if self._token_index < len(self._tokens):
             token = self._tokens[self._token_index]
             self._token_index += 1
             return token
         # Если вышли за пределы, всегда возвращаем EOF с последней позицией
-        return Token(TokenType.END_OF_FILE, "", self._line, self._get_column() - 1, None)
+        return self._eof_after_end()
 
     def peek_token(self) -> Token:
         """Просмотр следующего токена без продвижения (LEX-2)"""
+        if self._lazy:
+            token = self._fill_lookahead()
+            return token if token is not None else self._eof_after_end()
         if self._token_index < len(self._tokens):
             return self._tokens[self._token_index]
-        return Token(TokenType.END_OF_FILE, "", self._line, self._get_column() - 1, None)
+        return self._eof_after_end()
 
     def is_at_end(self) -> bool:
         """Достигнут ли конец списка токенов"""
+        if self._lazy:
+            token = self._fill_lookahead()
+            return token is None or token.type == TokenType.END_OF_FILE
         if self._token_index >= len(self._tokens):
             return True
         return self._tokens[self._token_index].type == TokenType.END_OF_FILE
 
+    def __iter__(self) -> Iterator[Token]:
+        """Итерация по оставшимся токенам (включая EOF) с продвижением"""
+        while True:
+            if self._lazy:
+                if self._fill_lookahead() is None:
+                    return
+            elif self._token_index >= len(self._tokens):
+                return
+            yield self.next_token()
+
     def get_line(self) -> int:
         """Возвращает текущую строку сканера или следующего токена"""
         return self.peek_token().line
@@ -57,24 +169,67 @@ class Scanner:
         return self.peek_token().column
 
     # --- Внутренние методы сканирования ---
+
+    def _fill_lookahead(self) -> Optional[Token]:
+        """Ленивый режим: вытянуть из генератора один токен предпросмотра"""
+        if self._lookahead is None and self._stream is not None:
+            self._lookahead = next(self._stream, None)
+            if self._lookahead is None:
+                self._stream = None
+        return self._lookahead
+
+    def _eof_after_end(self) -> Token:
+        line, column = self._position(self._start, self._start)
+        return Token(TokenType.END_OF_FILE, "", line, column - 1, None)
     
     def _is_at_source_end(self) -> bool:
         return self._current >= len(self._source)
 
-    def _get_column(self) -> int:
-        """Вычисляет столбец для начала текущей лексемы (1-based)"""
-        return self._start - self._column_start_of_line + 1
-        
-    def _get_current_column(self) -> int:
-        return self._current - self._column_start_of_line + 1
+    def _fill(self) -> bool:
+        """
+        Подкачать следующую порцию текста в self._source (потоковый ввод).
+        Сканер над готовой строкой уже имеет весь текст -- подкачивать нечего.
+        """
+        return False
+
+    @property
+    def source_map(self) -> SourceMap:
+        """Индекс строк исходного текста (строится при первом обращении)"""
+        if self._source_map is None:
+            self._source_map = SourceMap(self._source)
+        return self._source_map
+
+    def _count_lines(self, end: int):
+        """Продвинуть курсор строк до смещения end (переводы строк считаются пачкой)"""
+        if end > self._counted:
+            newlines = self._source.count('\n', self._counted, end)
+            if newlines:
+                self._line += newlines
+                self._column_start_of_line = self._source.rindex('\n', self._counted, end) + 1
+            self._counted = end
+        line_end = self._source.find('\n', end)
+        self._line_end = line_end if line_end != -1 else len(self._source)
+
+    def _position(self, start: int, end: int) -> tuple:
+        """(строка, столбец) лексемы [start, end): строка ее конца, столбец от начала этой строки"""
+        # Токены идут по возрастанию смещений, поэтому курсор только продвигается;
+        # соседние токены обычно на той же строке, и считать переводы строк не нужно
+        if end > self._line_end:
+            self._count_lines(end)
+        return self._line, start - self._column_start_of_line + 1
+
+    def _resume_at(self, offset: int):
+        """Начать сканирование со смещения offset (курсор строк -- по индексу строк)"""
+        line = self.source_map.line_of(offset)
+        self._line = line
+        self._column_start_of_line = self.source_map.line_start(line)
+        self._counted = self._start = self._current = offset
+        self._line_end = -1
 
     def _advance(self) -> str:
         """Прочитать следующий символ и сдвинуть указатель"""
         char = self._source[self._current]
         self._current += 1
-        if char == '\n':
-            self._line += 1
-            self._column_start_of_line = self._current
         return char
 
     def _peek(self) -> str:
@@ -97,85 +252,157 @@ class Scanner:
         self._current += 1
         return True
 
+    def _find(self, sub: str) -> int:
+        """Смещение ближайшего вхождения sub от текущей позиции или -1"""
+        return self._source.find(sub, self._current)
+
+    def _skip_run(self, pattern: re.Pattern, accept=None):
+        """
+        Продвинуться по серии символов, совпадающей с pattern (вида '[...]*').
+        Если задан accept, не-ASCII часть серии проверяется посимвольно и
+        серия обрывается на первом символе, для которого accept ложно.
+        Серия, дошедшая до конца окна, продолжается после подкачки текста.
+        """
+        while True:
+            source = self._source
+            start = self._current
+            end = pattern.match(source, start).end()
+            if accept is not None and not source[start:end].isascii():
+                for index in range(start, end):
+                    if not accept(source[index]):
+                        self._current = index
+                        return
+            self._current = end
+            if end < len(source) or not self._fill():
+                return
+
     def _add_token(self, type_t: TokenType, literal_value=None):
         """Создать токен и добавить в список"""
-        text = self._source[self._start:self._current]
-        self._tokens.append(Token(
+        line, column = self._position(self._start, self._current)
+        self._pending.append(Token(
             type=type_t,
-            lexeme=text,
-            line=self._line if text != '\n' else self._line - 1, # Если это перенос, позиция на предыдущей строке
-            column=self._get_column(),
+            lexeme=self._source[self._start:self._current],
+            line=line,
+            column=column,
             literal_value=literal_value
         ))
 
+    def _add_identifier(self, text: str):
+        """Токен идентификатора: лексема и значение -- одна (интернированная) строка"""
+        symbols = self.symbols
+        line, column = self._position(self._start, self._current)
+        if symbols is None:
+            self._pending.append(Token(TokenType.IDENTIFIER, text, line, column, text))
+            return
+        symbol_id = symbols.intern(text)
+        name = symbols.names[symbol_id]
+        self._pending.append(Token(TokenType.IDENTIFIER, name, line, column, name, symbol_id))
+
     def _add_error_token(self, message: str):
         """Добавить токен ошибки для восстановления (LEX-5)"""
-        text = self._source[self._start:self._current]
-        # Выводим сообщение в sys.stderr или сохраняем как лексему ошибки
-        import sys
-        print(f"[{self._line}:{self._get_column()}] Ошибка: {message}. Лексема: '{text}'", file=sys.stderr)
-        self._tokens.append(Token(
+        line, column = self._position(self._start, self._current)
+        token = Token(
             type=TokenType.ERROR,
-            lexeme=text,
-            line=self._line,
-            column=self._get_column(),
+            lexeme=self._source[self._start:self._current],
+            line=line,
+            column=column,
             literal_value=message
-        ))
+        )
+        self._pending.append(token)
+        self._report_error(token, self._window_base + self._start)
+
+    def _report_error(self, token: Token, offset: int):
+        """Передать ошибку сборщику диагностики или вывести ее в sys.stderr"""
+        report_token_error(token, offset, self._diagnostics)
 
     def _scan_all(self):
-        """Основной цикл лексического анализатора"""
+        """Жадный режим: отсканировать весь файл в self._tokens"""
+        if self._cache is None:
+            self._tokens.extend(self._token_stream())
+            return
+        buffer = self._cache.get(self._source, type(self).__name__)
+        if buffer is not None:
+            if self.symbols is not None:
+                buffer.intern_identifiers(self.symbols)
+            for index in range(len(buffer)):
+                if buffer.type_at(index) == TokenType.ERROR:
+                    self._report_error(buffer[index], buffer.span_at(index)[0])
+            self._restore_end_state()
+            self._tokens = buffer if self._compact else list(buffer)
+            return
+        self._tokens.extend(self._token_stream())
+        if not isinstance(self._tokens, TokenBuffer):
+            buffer = TokenBuffer.from_tokens(self._source, self._tokens)
+        else:
+            buffer = self._tokens
+        self._cache.put(self._source, type(self).__name__, buffer)
+
+    def _cached_stream(self) -> Iterator[Token]:
+        """Ленивый режим с кэшем: токены из кэша или сканирование с записью в кэш"""
+        backend = type(self).__name__
+        buffer = self._cache.get(self._source, backend)
+        if buffer is not None:
+            buffer.symbols = self.symbols
+            for index, token in enumerate(buffer):
+                if token.type == TokenType.ERROR:
+                    self._report_error(token, buffer.span_at(index)[0])
+                yield token
+            self._restore_end_state()
+            return
+        buffer = TokenBuffer(self._source)
+        for token in self._token_stream():
+            buffer.append(token)
+            yield token
+        self._cache.put(self._source, backend, buffer)
+
+    def _restore_end_state(self):
+        """Состояние сканера после конца файла, как если бы файл был отсканирован"""
+        self._current = self._start = len(self._source)
+
+    def _token_stream(self) -> Iterator[Token]:
+        """Основной цикл лексического анализатора (генератор токенов)"""
+        pending = self._pending
         while not self._is_at_source_end():
             self._start = self._current
             self._scan_token()
-            
+            if pending:
+                yield from pending
+                pending.clear()
+
         # Вставляем EOF последним
+        yield self._eof_token()
+
+    def _eof_token(self) -> Token:
         self._start = self._current
-        self._tokens.append(Token(
+        line, column = self._position(self._current, self._current)
+        return Token(
             type=TokenType.END_OF_FILE,
             lexeme="",
-            line=self._line,
-            column=self._get_current_column(),
+            line=line,
+            column=column,
             literal_value=None
-        ))
+        )
         
     def _scan_token(self):
         c = self._advance()
         
-        # Пробельные символы (LEX-6)
+        # Пробельные символы (LEX-6): серия до конца окна за один вызов (без
+        # подкачки -- продолжение серии в следующей порции пропустит следующий вызов)
         if c in (' ', '\r', '\t', '\n'):
+            self._current = _WHITESPACE_RUN.match(self._source, self._current).end()
             return  # Игнорируем
         
         # Односимвольные или потенциально двусимвольные
-        if c == '(': self._add_token(TokenType.LPAREN)
-        elif c == ')': self._add_token(TokenType.RPAREN)
-        elif c == '{': self._add_token(TokenType.LBRACE)
-        elif c == '}': self._add_token(TokenType.RBRACE)
-        elif c == '[': self._add_token(TokenType.LBRACKET)
-        elif c == ']': self._add_token(TokenType.RBRACKET)
-        elif c == ';': self._add_token(TokenType.SEMICOLON)
-        elif c == ',': self._add_token(TokenType.COMMA)
-        elif c == ':': self._add_token(TokenType.COLON)
-        
-        # Операторы
-        elif c == '+':
-            self._add_token(TokenType.PLUS_ASSIGN if self._match('=') else TokenType.PLUS)
-        elif c == '-':
-            self._add_token(TokenType.MINUS_ASSIGN if self._match('=') else TokenType.MINUS)
-        elif c == '*':
-            self._add_token(TokenType.STAR_ASSIGN if self._match('=') else TokenType.STAR)
-        elif c == '%':
-            self._add_token(TokenType.PERCENT)
-            
-        elif c == '=':
-            self._add_token(TokenType.EQUAL_EQUAL if self._match('=') else TokenType.ASSIGN)
-        elif c == '!':
-            self._add_token(TokenType.BANG_EQUAL if self._match('=') else TokenType.BANG)
-        elif c == '<':
-            self._add_token(TokenType.LESS_EQUAL if self._match('=') else TokenType.LESS)
-        elif c == '>':
-            self._add_token(TokenType.GREATER_EQUAL if self._match('=') else TokenType.GREATER)
-            
-        elif c == '&':
+        type_t = _SINGLE_CHAR_TOKENS.get(c)
+        if type_t is not None:
+            self._add_token(type_t)
+            return
+        pair = _ASSIGN_OPERATORS.get(c)
+        if pair is not None:
+            self._add_token(pair[1] if self._match('=') else pair[0])
+            return
+
+        if c == '&':
             if self._match('&'):
                 self._add_token(TokenType.AND_AND)
             else:
@@ -189,9 +416,9 @@ class Scanner:
         # Деление или комментарий (LEX-6)
         elif c == '/':
             if self._match('/'):
-                # Однострочный комментарий
-                while self._peek() != '\n' and not self._is_at_source_end():
-                    self._advance()
+                # Однострочный комментарий: до перевода строки (он не поглощается)
+                end = self._find('\n')
+                self._current = end if end != -1 else len(self._source)
             elif self._match('*'):
                 # Многострочный комментарий
                 self._block_comment()
@@ -216,35 +443,24 @@ class Scanner:
             self._add_error_token(f"Недопустимый символ '{c}'")
 
     def _block_comment(self):
-        """Обработка многострочного комментария"""
-        nesting = 1 # Если бы поддерживали вложенные комментарии. Спринт 1 разрешает просто до */
-        while nesting > 0 and not self._is_at_source_end():
-            if self._peek() == '*' and self._peek_next() == '/':
-                self._advance() # *
-                self._advance() # /
-                nesting -= 1
-            # Дополнительно: поддержка вложенных (опционально)
-            # elif self._peek() == '/' and self._peek_next() == '*':
-            #     self._advance()
-            #     self._advance()
-            #     nesting += 1
-            else:
-                self._advance()
-
-        if nesting > 0:
+        """Обработка многострочного комментария (вложенные не поддерживаются: до первого */)"""
+        end = self._find('*/')
+        if end == -1:
+            self._current = len(self._source)
             self._add_error_token("Незавершенный многострочный комментарий (EOF)")
+        else:
+            self._current = end + 2
 
     def _string(self):
         """Строковый литерал (LEX-4)"""
-        while self._peek() != '"' and not self._is_at_source_end():
-            if self._peek() == '\n':
-                self._add_error_token("Незавершенная строка (перенос в строке)")
-                return
-            self._advance()
+        self._skip_run(_STRING_BODY)
 
         if self._is_at_source_end():
             self._add_error_token("Незавершенная строка (достигнут конец файла)")
             return
+        if self._source[self._current] == '\n':
+            self._add_error_token("Незавершенная строка (перенос в строке)")
+            return
 
         # Закрывающая кавычка
         self._advance()
@@ -257,23 +473,27 @@ class Scanner:
         """Числовой литерал (LEX-4)"""
         is_float = False
         
-        while self._peek().isdigit():
-            self._advance()
+        self._skip_run(_DIGIT_RUN, str.isdigit)
 
         # Дробная часть
         if self._peek() == '.' and self._peek_next().isdigit():
             is_float = True
             self._advance() # Поглощаем '.'
-            while self._peek().isdigit():
-                self._advance()
+            self._skip_run(_DIGIT_RUN, str.isdigit)
 
         value_str = self._source[self._start:self._current]
+        try:
+            value = float(value_str) if is_float else int(value_str)
+        except ValueError:
+            # isdigit() пропускает и надстрочные цифры ('²'), которые int() не принимает
+            self._add_error_token(f"Некорректный числовой литерал '{value_str}'")
+            return
         if is_float:
-            self._add_token(TokenType.FLOAT_LITERAL, float(value_str))
+            self._add_token(TokenType.FLOAT_LITERAL, value)
         else:
             # Для Sprint 1 диапазон [-2³¹, 2³¹-1] проверяться строго может на этапе парсинга, 
             # но мы ограничимся сохранением int()
-            self._add_token(TokenType.INT_LITERAL, int(value_str))
+            self._add_token(TokenType.INT_LITERAL, value)
 
     def _is_alpha_or_underscore(self, c: str) -> bool:
         return c.isalpha() or c == '_'
@@ -283,8 +503,7 @@ class Scanner:
 
     def _identifier(self):
         """Идентификатор или Ключевое слово (LEX-2, LEX-3)"""
-        while self._is_alphanumeric_or_underscore(self._peek()):
-            self._advance()
+        self._skip_run(_WORD_RUN, self._is_alphanumeric_or_underscore)
 
         text = self._source[self._start:self._current]
         
@@ -301,6 +520,6 @@ class Scanner:
         elif type_t == TokenType.KW_FALSE:
             self._add_token(TokenType.BOOL_LITERAL, False)
         elif type_t == TokenType.IDENTIFIER:
-            self._add_token(TokenType.IDENTIFIER, text)
+            self._add_identifier(text)
         else:
             self._add_token(type_t)
@@ -0,0 +1,242 @@
+"""
+Форматы вывода потока токенов: text (Token.__str__), jsonl и двоичный.
+
+Двоичный формат (версия 1, все числа little-endian):
+
+    заголовок   "<8sHHIQQQ": сигнатура b"MCTOKENS", версия, размер записи,
+                резерв, число токенов, смещение таблицы строк, число строк
+    записи      по RECORD.size байт на токен, сразу за заголовком
+    строки      (число строк + 1) смещений uint64 и затем UTF-8 данные
+
+Запись токена "<BBxxIiIq": тип (TokenType.value), вид литерала, строка,
+столбец, индекс лексемы в таблице строк, литерал (int64, float64 или индекс
+строки). Лексемы и строковые литералы дедуплицируются в общей таблице строк.
+"""
+import json
+import mmap
+import struct
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .tokens import Token, TokenType
+
+FORMATS = ("text", "jsonl", "binary")
+
+MAGIC = b"MCTOKENS"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQ")
+RECORD = struct.Struct("<BBxxIiIq")
+_FLOAT = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+
+# Вид литерала в записи
+LIT_NONE, LIT_INT, LIT_FLOAT, LIT_STRING, LIT_BOOL, LIT_BIGINT = range(6)
+
+_TYPES_BY_VALUE = {t.value: t for t in TokenType}
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+# Размер порции строк при буферизованной записи текстовых форматов
+WRITE_BATCH = 4096
+
+
+class TokenFormatError(Exception):
+    """Файл не является двоичным потоком токенов поддерживаемой версии"""
+    pass
+
+
+# --- Текстовые форматы ---
+
+def token_to_json(token: Token) -> dict:
+    return {
+        "type": token.type.name,
+        "lexeme": token.lexeme,
+        "line": token.line,
+        "column": token.column,
+        "value": token.literal_value,
+    }
+
+
+def token_from_json(data: dict) -> Token:
+    return Token(TokenType[data["type"]], data["lexeme"], data["line"], data["column"], data["value"])
+
+
+def format_token(token: Token, fmt: str, extra: Optional[dict] = None) -> str:
+    """Одна строка вывода токена в формате text или jsonl"""
+    if fmt == "jsonl":
+        data = token_to_json(token)
+        if extra:
+            data.update(extra)
+        return json.dumps(data, ensure_ascii=False)
+    return str(token)
+
+
+def write_lines(lines: Iterable[str], out: TextIO):
+    """
+    Буферизованная запись: строки отдаются в out порциями по WRITE_BATCH.
+    Если источник строк прерван исключением, уже полученные строки дописываются.
+    """
+    batch: List[str] = []
+    try:
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= WRITE_BATCH:
+                out.write("\n".join(batch) + "\n")
+                batch.clear()
+    finally:
+        if batch:
+            out.write("\n".join(batch) + "\n")
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[Token]:
+    for line in lines:
+        if line.strip():
+            yield token_from_json(json.loads(line))
+
+
+# --- Двоичный формат ---
+
+def write_binary(tokens: Iterable[Token], out: BinaryIO) -> int:
+    """Записать токены в двоичном формате; возвращает число токенов"""
+    strings: Dict[str, int] = {}
+    records = bytearray()
+    pack = RECORD.pack
+    count = 0
+
+    def intern(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    for token in tokens:
+        value = token.literal_value
+        if value is None:
+            kind, payload = LIT_NONE, 0
+        elif isinstance(value, bool):
+            kind, payload = LIT_BOOL, int(value)
+        elif isinstance(value, int):
+            if _INT64_MIN <= value <= _INT64_MAX:
+                kind, payload = LIT_INT, value
+            else:
+                kind, payload = LIT_BIGINT, intern(str(value))
+        elif isinstance(value, float):
+            kind, payload = LIT_FLOAT, _INT64.unpack(_FLOAT.pack(value))[0]
+        else:
+            kind, payload = LIT_STRING, intern(str(value))
+        records += pack(token.type.value, kind, token.line, token.column, intern(token.lexeme), payload)
+        count += 1
+
+    blobs = [text.encode("utf-8", "surrogatepass") for text in strings]
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    strings_offset = HEADER.size + len(records)
+    out.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, count, strings_offset, len(blobs)))
+    out.write(records)
+    out.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+    out.write(b"".join(blobs))
+    return count
+
+
+class TokenFile:
+    """
+    Двоичный поток токенов, отображенный в память (mmap) без копирования.
+
+    records -- memoryview над записями токенов; строки декодируются из
+    таблицы строк только при обращении к токену. Используется как
+    контекстный менеджер (или close()).
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Пустой файл нельзя отобразить в память
+                raise TokenFormatError(f"{path}: пустой файл")
+        self._view = memoryview(self._mmap)
+        try:
+            self._load_header(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _load_header(self, path: str):
+        if len(self._view) < HEADER.size:
+            raise TokenFormatError(f"{path}: файл короче заголовка")
+        magic, version, record_size, _, count, strings_offset, strings_count = HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise TokenFormatError(f"{path}: не двоичный поток токенов")
+        if version != VERSION or record_size != RECORD.size:
+            raise TokenFormatError(f"{path}: неподдерживаемая версия формата {version}")
+        if strings_offset != HEADER.size + count * RECORD.size:
+            raise TokenFormatError(f"{path}: поврежденный заголовок")
+        self._count = count
+        self.records = self._view[HEADER.size:strings_offset]
+        offsets_end = strings_offset + 8 * (strings_count + 1)
+        raw_offsets = self._view[strings_offset:offsets_end]
+        if sys.byteorder == "little":
+            self._offsets = raw_offsets.cast("Q")
+        else:
+            self._offsets = struct.unpack(f"<{strings_count + 1}Q", raw_offsets)
+        self._blob = self._view[offsets_end:]
+
+    def close(self):
+        # memoryview нужно освободить до закрытия mmap
+        for name in ("records", "_offsets", "_blob", "_view"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "TokenFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def string(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8", "surrogatepass")
+
+    def raw_records(self) -> Iterator[Tuple[int, int, int, int, int, int]]:
+        """Поля записей без декодирования строк (struct.iter_unpack прямо по mmap)"""
+        return RECORD.iter_unpack(self.records)
+
+    def _decode(self, record, string) -> Token:
+        type_value, kind, line, column, lexeme, payload = record
+        if kind == LIT_NONE:
+            value = None
+        elif kind == LIT_INT:
+            value = payload
+        elif kind == LIT_FLOAT:
+            value = _FLOAT.unpack(_INT64.pack(payload))[0]
+        elif kind == LIT_BOOL:
+            value = bool(payload)
+        elif kind == LIT_BIGINT:
+            value = int(string(payload))
+        else:
+            value = string(payload)
+        return Token(_TYPES_BY_VALUE[type_value], string(lexeme), line, column, value)
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("индекс токена вне диапазона")
+        return self._decode(RECORD.unpack_from(self.records, index * RECORD.size), self.string)
+
+    def __iter__(self) -> Iterator[Token]:
+        # Ключевые слова, операторы и повторяющиеся имена декодируются один раз
+        decoded: Dict[int, str] = {}
+
+        def string(index: int) -> str:
+            text = decoded.get(index)
+            if text is None:
+                text = decoded[index] = self.string(index)
+            return text
+
+        decode = self._decode
+        for record in self.raw_records():
+            yield decode(record, string)
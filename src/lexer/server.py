@@ -0,0 +1,502 @@
+"""
+Долгоживущий сервер лексического анализа для редакторов (JSON-RPC 2.0).
+
+Сообщения передаются с заголовком Content-Length, как в Language Server
+Protocol, через stdio или локальный сокет (TCP на 127.0.0.1 или Unix-сокет):
+
+    python -m src.lexer.server                  # stdio
+    python -m src.lexer.server --port 0         # TCP, порт печатается в stderr
+    python -m src.lexer.server --socket /tmp/lexer.sock
+
+Сервер держит сканер "прогретым" (модули импортированы, таблица DFA
+загружена) и кэширует открытые документы по версии: didOpen сканирует текст,
+didChange пересканирует только задетую правкой часть (relex), а
+semanticTokens/full отдает закэшированный для этой версии массив. Токены
+кодируются в формате семантических токенов LSP: по 5 целых на токен (сдвиг
+строки, сдвиг столбца, длина, тип, модификаторы), тип выводится из TokenType.
+
+Методы:
+    initialize, shutdown, exit
+    textDocument/didOpen, textDocument/didChange, textDocument/didClose
+    textDocument/semanticTokens/full, textDocument/semanticTokens/full/delta
+    lexer/tokenize          {"text": ...} или {"textDocument": {"uri": ...}}
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .backends import BACKENDS, DEFAULT_BACKEND, create_scanner
+from .diagnostics import DiagnosticCollector
+from .incremental import LexSnapshot
+from .serialize import token_to_json
+from .symbols import SymbolTable
+from .tokens import Token, TokenType
+
+# Коды ошибок JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Легенда семантических токенов: индекс в списке -- код типа в массиве data
+SEMANTIC_TOKEN_TYPES = ["keyword", "type", "variable", "number", "string", "operator"]
+SEMANTIC_TOKEN_MODIFIERS: List[str] = []
+
+_TYPE_KEYWORDS = {TokenType.KW_INT, TokenType.KW_FLOAT, TokenType.KW_BOOL, TokenType.KW_VOID}
+
+
+def _semantic_type(type_t: TokenType) -> Optional[int]:
+    """Код семантического типа токена или None (разделители, EOF и ошибки не выделяются)"""
+    if type_t in _TYPE_KEYWORDS:
+        return SEMANTIC_TOKEN_TYPES.index("type")
+    if type_t.name.startswith("KW_") or type_t == TokenType.BOOL_LITERAL:
+        return SEMANTIC_TOKEN_TYPES.index("keyword")
+    if type_t == TokenType.IDENTIFIER:
+        return SEMANTIC_TOKEN_TYPES.index("variable")
+    if type_t in (TokenType.INT_LITERAL, TokenType.FLOAT_LITERAL):
+        return SEMANTIC_TOKEN_TYPES.index("number")
+    if type_t == TokenType.STRING_LITERAL:
+        return SEMANTIC_TOKEN_TYPES.index("string")
+    if TokenType.PLUS.value <= type_t.value <= TokenType.SLASH_ASSIGN.value:
+        return SEMANTIC_TOKEN_TYPES.index("operator")
+    return None
+
+
+SEMANTIC_TYPES: Dict[TokenType, Optional[int]] = {t: _semantic_type(t) for t in TokenType}
+
+# Столбцы в UTF-16 (кодировка позиций LSP по умолчанию) отличаются от столбцов
+# в символах только при символах вне BMP: для остальных текстов пересчет не нужен
+_ASTRAL = re.compile('[\U00010000-\U0010ffff]')
+
+# Документы больше этого размера сканируются в отдельном потоке, чтобы
+# соединения с короткими запросами не ждали конца сканирования
+OFFLOAD_CHARS = 256 * 1024
+
+
+class RawJSON(str):
+    """Уже закодированный результат: вставляется в ответ без повторного json.dumps"""
+
+
+class RpcError(Exception):
+    """Ошибка обработки запроса, возвращаемая клиенту в поле error"""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def encode_message(message: dict) -> bytes:
+    result = message.get("result")
+    if isinstance(result, RawJSON):
+        body = ('{"jsonrpc":"2.0","id":%s,"result":%s}' % (json.dumps(message["id"]), result)).encode("utf-8")
+    else:
+        body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Тело следующего сообщения или None, если поток закрыт"""
+    length = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length is None:
+        raise RpcError(INVALID_REQUEST, "Нет заголовка Content-Length")
+    return await reader.readexactly(length)
+
+
+def encode_semantic_tokens(tokens: List[Token], source: str, utf16: bool = False) -> List[int]:
+    """
+    Массив data семантических токенов LSP: для каждого токена сдвиг строки
+    относительно предыдущего токена, столбец (относительно предыдущего токена
+    на той же строке), длина, код типа и битовая маска модификаторов.
+    """
+    data: List[int] = []
+    append = data.extend
+    types = SEMANTIC_TYPES
+    prev_line = 0
+    prev_char = 0
+    convert = utf16 and _ASTRAL.search(source) is not None
+    lines = source.split('\n') if convert else None
+    for token in tokens:
+        code = types[token.type]
+        if code is None:
+            continue
+        line = token.line - 1
+        char = token.column - 1
+        length = len(token.lexeme)
+        if convert:
+            prefix = lines[line][:char]
+            char += len(_ASTRAL.findall(prefix))
+            length += len(_ASTRAL.findall(token.lexeme))
+        if line != prev_line:
+            append((line - prev_line, char, length, code, 0))
+        else:
+            append((0, char - prev_char, length, code, 0))
+        prev_line = line
+        prev_char = char
+    return data
+
+
+def _common_prefix(old: List[int], new: List[int], limit: int) -> int:
+    """Длина общего начала: бинарный поиск со сравнением срезов (сравнение идет в C)"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[lo:mid] == new[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(old: List[int], new: List[int], limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:len(old) - lo] == new[len(new) - mid:len(new) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def diff_semantic_tokens(old: List[int], new: List[int]) -> List[dict]:
+    """Правки массива data (одна замена между общими началом и концом)"""
+    limit = min(len(old), len(new))
+    start = _common_prefix(old, new, limit)
+    if start == len(old) == len(new):
+        return []
+    end = _common_suffix(old, new, limit - start)
+    return [{"start": start, "deleteCount": len(old) - start - end, "data": new[start:len(new) - end]}]
+
+
+@dataclass
+class Document:
+    """Открытый документ: последняя версия текста с потоком токенов"""
+    uri: str
+    version: int
+    snapshot: LexSnapshot
+    # Последний отданный массив семантических токенов (resultId, data) и снимок,
+    # по которому он построен: после правки он служит основой для full/delta
+    semantic: Optional[Tuple[str, List[int]]] = None
+    semantic_for: Optional[LexSnapshot] = None
+    # Закодированный ответ semanticTokens/full для этого массива (повторные запросы версии)
+    semantic_json: Optional[RawJSON] = None
+
+
+class LexerSession:
+    """
+    Состояние одного соединения: открытые документы и кодировка позиций.
+    У каждого документа своя таблица символов: она живет, пока документ открыт
+    (полная замена текста начинает новую), а lexer/tokenize с текстом
+    идентификаторы не интернирует: память соединения не растет с его возрастом.
+    handle() обрабатывает одно разобранное сообщение и возвращает ответ (или
+    None для уведомлений).
+    """
+    def __init__(self, backend: str = DEFAULT_BACKEND):
+        self.backend = backend
+        self.documents: Dict[str, Document] = {}
+        # Ошибки сканирования клиент получает токенами ERROR (lexer/tokenize); сборщик
+        # нужен, чтобы они не печатались в stderr, и очищается после каждого сообщения
+        self.diagnostics = DiagnosticCollector(max_errors=1)
+        self.utf16 = True
+        self.shutdown_requested = False
+        self.exit_requested = False
+        self._result_ids = 0
+        self._methods: Dict[str, Callable[[dict], Any]] = {
+            "initialize": self._initialize,
+            "initialized": lambda params: None,
+            "shutdown": self._shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didClose": self._did_close,
+            "textDocument/semanticTokens/full": self._semantic_tokens_full,
+            "textDocument/semanticTokens/full/delta": self._semantic_tokens_delta,
+            "lexer/tokenize": self._tokenize,
+        }
+
+    def handle(self, message: Any) -> Optional[dict]:
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error_response(message.get("id") if isinstance(message, dict) else None,
+                                   INVALID_REQUEST, "Ожидался объект запроса JSON-RPC с полем method")
+        request_id = message.get("id")
+        is_request = "id" in message
+        method = self._methods.get(message["method"])
+        try:
+            if method is None:
+                if message["method"].startswith("$/") or not is_request:
+                    return None  # Необязательные уведомления LSP игнорируются
+                raise RpcError(METHOD_NOT_FOUND, f"Неизвестный метод '{message['method']}'")
+            params = message.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params должен быть объектом")
+            result = method(params)
+        except RpcError as e:
+            return _error_response(request_id, e.code, str(e)) if is_request else None
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            return _error_response(request_id, INVALID_PARAMS, f"Некорректные параметры: {e!r}") if is_request else None
+        except Exception as e:
+            # Ошибка сервера не должна обрывать соединение: о ней узнает только этот запрос
+            return _error_response(request_id, INTERNAL_ERROR, f"Внутренняя ошибка: {e!r}") if is_request else None
+        finally:
+            self.diagnostics.clear()
+        if not is_request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def is_heavy(self, message: Any) -> bool:
+        """Сообщение с большим текстом (сканирование лучше вынести из цикла событий)"""
+        params = message.get("params") if isinstance(message, dict) else None
+        if not isinstance(params, dict):
+            return False
+        document = params.get("textDocument")
+        text = params.get("text")
+        if isinstance(document, dict):
+            if isinstance(document.get("text"), str):
+                text = document["text"]
+            elif document.get("uri") in self.documents:
+                cached = self.documents[document["uri"]]
+                # Уже закодированная версия отдается из кэша без сканирования
+                if cached.semantic_for is cached.snapshot and message.get("method") != "lexer/tokenize":
+                    return False
+                text = cached.snapshot.source
+        return isinstance(text, str) and len(text) > OFFLOAD_CHARS
+
+    # --- Методы ---
+
+    def _initialize(self, params: dict) -> dict:
+        general = (params.get("capabilities") or {}).get("general") or {}
+        encodings = general.get("positionEncodings") or []
+        # Столбцы сканера -- в символах (UTF-32); UTF-16 поддерживается пересчетом
+        self.utf16 = "utf-32" not in encodings
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                "textDocumentSync": {"openClose": True, "change": 2},  # 2 -- инкрементальные правки
+                "semanticTokensProvider": {
+                    "legend": {"tokenTypes": SEMANTIC_TOKEN_TYPES, "tokenModifiers": SEMANTIC_TOKEN_MODIFIERS},
+                    "full": {"delta": True},
+                },
+            },
+            "serverInfo": {"name": "minicompiler-lexer", "backend": self.backend},
+        }
+
+    def _shutdown(self, params: dict) -> None:
+        self.shutdown_requested = True
+        return None
+
+    def _exit(self, params: dict) -> None:
+        self.exit_requested = True
+        return None
+
+    def _did_open(self, params: dict) -> None:
+        document = params["textDocument"]
+        text = document["text"]
+        snapshot = LexSnapshot.from_source(text, self.backend, SymbolTable(), self.diagnostics)
+        self.documents[document["uri"]] = Document(document["uri"], document.get("version", 0), snapshot)
+
+    def _did_change(self, params: dict) -> None:
+        identifier = params["textDocument"]
+        document = self._document(identifier["uri"])
+        snapshot = document.snapshot
+        for change in params["contentChanges"]:
+            if "range" not in change:
+                snapshot = LexSnapshot.from_source(change["text"], self.backend, SymbolTable(), self.diagnostics)
+                continue
+            start = self._offset(snapshot, change["range"]["start"])
+            end = self._offset(snapshot, change["range"]["end"])
+            if end < start:
+                raise RpcError(INVALID_PARAMS, "Конец диапазона правки раньше его начала")
+            snapshot = snapshot.apply_edit(start, end - start, change["text"])
+        document.snapshot = snapshot
+        document.version = identifier.get("version", document.version + 1)
+
+    def _did_close(self, params: dict) -> None:
+        self.documents.pop(params["textDocument"]["uri"], None)
+
+    def _semantic_tokens_full(self, params: dict) -> RawJSON:
+        document = self._document(params["textDocument"]["uri"])
+        result_id, data = self._encode(document)
+        if document.semantic_json is None:
+            document.semantic_json = RawJSON(json.dumps({"resultId": result_id, "data": data},
+                                                        separators=(",", ":")))
+        return document.semantic_json
+
+    def _semantic_tokens_delta(self, params: dict) -> dict:
+        document = self._document(params["textDocument"]["uri"])
+        previous = document.semantic
+        result_id, data = self._encode(document)
+        if previous is None or previous[0] != params.get("previousResultId"):
+            # Клиент ссылается на неизвестный результат: отдаем массив целиком
+            return {"resultId": result_id, "data": data}
+        return {"resultId": result_id, "edits": diff_semantic_tokens(previous[1], data)}
+
+    def _tokenize(self, params: dict) -> dict:
+        if "text" in params:
+            scanner = create_scanner(params["text"], params.get("backend", self.backend), lazy=True,
+                                     diagnostics=self.diagnostics)
+            tokens = list(scanner)
+        else:
+            tokens = self._document(params["textDocument"]["uri"]).snapshot.tokens
+        return {
+            "tokens": [token_to_json(token) for token in tokens],
+            "errors": sum(1 for token in tokens if token.type == TokenType.ERROR),
+        }
+
+    # --- Вспомогательные ---
+
+    def _document(self, uri: str) -> Document:
+        document = self.documents.get(uri)
+        if document is None:
+            raise RpcError(INVALID_PARAMS, f"Документ '{uri}' не открыт")
+        return document
+
+    def _encode(self, document: Document) -> Tuple[str, List[int]]:
+        """Семантические токены текущей версии (из кэша, если эта версия уже кодировалась)"""
+        if document.semantic is not None and document.semantic_for is document.snapshot:
+            return document.semantic
+        snapshot = document.snapshot
+        self._result_ids += 1
+        document.semantic = (f"{document.version}.{self._result_ids}",
+                             encode_semantic_tokens(snapshot.tokens, snapshot.source, self.utf16))
+        document.semantic_for = snapshot
+        document.semantic_json = None
+        return document.semantic
+
+    def _offset(self, snapshot: LexSnapshot, position: dict) -> int:
+        """Смещение в тексте по позиции LSP (строка и столбец с 0)"""
+        line = position["line"]
+        character = position["character"]
+        starts = snapshot.line_starts
+        if line >= len(starts):
+            return len(snapshot.source)
+        start = starts[line]
+        end = starts[line + 1] - 1 if line + 1 < len(starts) else len(snapshot.source)
+        if self.utf16:
+            # Символ вне BMP занимает две единицы UTF-16
+            text = snapshot.source[start:end]
+            if _ASTRAL.search(text):
+                units = 0
+                for index, c in enumerate(text):
+                    if units >= character:
+                        return start + index
+                    units += 2 if c > '\uffff' else 1
+                return end
+        return min(start + character, end)
+
+
+def _error_response(request_id: Any, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def serve_connection(reader: asyncio.StreamReader, writer, session: Optional[LexerSession] = None,
+                           backend: str = DEFAULT_BACKEND):
+    """
+    Обработать одно соединение до exit или закрытия потока. Сообщения одного
+    соединения обрабатываются по порядку (правка документа всегда применяется
+    до следующего запроса), соединения между собой -- конкурентно.
+    """
+    session = session if session is not None else LexerSession(backend)
+    try:
+        while not session.exit_requested:
+            try:
+                body = await read_message(reader)
+            except RpcError as e:
+                writer.write(encode_message(_error_response(None, e.code, str(e))))
+                break
+            except (asyncio.IncompleteReadError, ValueError):
+                break
+            if body is None:
+                break
+            try:
+                message = json.loads(body)
+            except ValueError as e:
+                response = _error_response(None, PARSE_ERROR, f"Некорректный JSON: {e}")
+            else:
+                if session.is_heavy(message):
+                    response = await asyncio.to_thread(session.handle, message)
+                else:
+                    response = session.handle(message)
+            if response is not None:
+                writer.write(encode_message(response))
+                await writer.drain()
+    finally:
+        writer.close()
+
+
+class _StdoutWriter:
+    """Минимальный writer для stdout в режиме stdio (запись синхронная и буферизованная)"""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+    async def drain(self):
+        self._stream.flush()
+
+    def close(self):
+        self._stream.flush()
+
+
+async def serve_stdio(backend: str = DEFAULT_BACKEND):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await serve_connection(reader, _StdoutWriter(sys.stdout.buffer), backend=backend)
+
+
+async def serve_socket(port: Optional[int] = None, path: Optional[str] = None,
+                       backend: str = DEFAULT_BACKEND):
+    def connected(reader, writer):
+        return serve_connection(reader, writer, backend=backend)
+
+    if path is not None:
+        server = await asyncio.start_unix_server(connected, path)
+        address = path
+    else:
+        server = await asyncio.start_server(connected, "127.0.0.1", port or 0)
+        address = "127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+    print(f"Сервер лексера слушает {address}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.lexer.server",
+        description="Сервер лексического анализа (JSON-RPC, заголовки Content-Length как в LSP)",
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--stdio", action="store_true", help="обмен через stdin/stdout (по умолчанию)")
+    transport.add_argument("--port", type=int, help="слушать TCP-порт на 127.0.0.1 (0 -- свободный)")
+    transport.add_argument("--socket", metavar="PATH", help="слушать Unix-сокет")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="реализация сканера (по умолчанию: %(default)s)")
+    args = parser.parse_args(argv)
+    # Прогрев: таблица DFA и модули загружаются до первого запроса
+    create_scanner("", args.backend)
+    try:
+        if args.port is not None or args.socket is not None:
+            asyncio.run(serve_socket(args.port, args.socket, args.backend))
+        else:
+            asyncio.run(serve_stdio(args.backend))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from array import array
+from bisect import bisect_right
+from typing import Optional, Sequence, Tuple
+
+
+class SourceMap:
+    """
+    Индекс начал строк исходного текста.
+
+    Строится одним проходом str.find по переводам строк прямо в array (8 байт
+    на строку, без промежуточного списка строк), после чего строка и столбец
+    любого смещения находятся бинарным поиском за O(log n). Нужен для
+    произвольного доступа (диагностика, инкрементальное пересканирование):
+    сам сканер идет по тексту вперед и считает строки курсором.
+    """
+    def __init__(self, source: str, line_starts: Optional[Sequence[int]] = None):
+        self.source = source
+        if line_starts is None:
+            line_starts = array('q', [0])
+            append = line_starts.append
+            find = source.find
+            pos = find('\n')
+            while pos != -1:
+                pos += 1
+                append(pos)
+                pos = find('\n', pos)
+        self.line_starts = line_starts
+
+    def __len__(self) -> int:
+        """Число строк (после завершающего '\\n' начинается еще одна, пустая)"""
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """Номер строки (1-based), в которой находится смещение"""
+        return bisect_right(self.line_starts, offset)
+
+    def line_start(self, line: int) -> int:
+        return self.line_starts[line - 1]
+
+    def line_end(self, line: int) -> int:
+        """Смещение конца строки (без '\\n')"""
+        if line < len(self.line_starts):
+            return self.line_starts[line] - 1
+        return len(self.source)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """(строка, столбец) смещения, обе координаты 1-based"""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def token_position(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Позиция токена так, как ее сообщает Scanner: строка -- строка конца
+        лексемы, столбец отсчитывается от начала этой строки (для многострочной
+        лексемы ошибки незакрытого комментария он может быть отрицательным).
+        """
+        line = bisect_right(self.line_starts, end)
+        return line, start - self.line_starts[line - 1] + 1
+
+    def offset(self, line: int, column: int) -> int:
+        """Обратное преобразование: смещение по строке и столбцу позиции токена"""
+        return self.line_starts[line - 1] + column - 1
+
+    def line_text(self, line: int) -> str:
+        return self.source[self.line_start(line):self.line_end(line)]
+
+    def snippet(self, start: int, length: int = 1) -> str:
+        """
+        Строка исходного текста с подчеркиванием фрагмента [start, start + length)
+        для сообщений об ошибках. Многострочный фрагмент подчеркивается до конца
+        первой строки.
+        """
+        line = self.line_of(start)
+        text = self.line_text(line)
+        column = start - self.line_start(line)
+        width = max(1, min(length, len(text) - column))
+        # Табуляции сохраняются в отступе, чтобы подчеркивание совпало с текстом
+        indent = "".join(c if c == '\t' else ' ' for c in text[:column])
+        return f"{line:>5} | {text}\n      | {indent}{'^' * width}"
@@ -0,0 +1,226 @@
+"""
+Статистика и профилирование сканера.
+
+Инструментирование подключается к конкретному экземпляру сканера
+(Scanner(source, stats=LexerStats())) подменой его методов, поэтому без
+stats горячий цикл не содержит ни одной лишней проверки.
+"""
+import json
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+from .tokens import Token, TokenType
+
+# Категории по подсканерам: по первому символу лексемы видно, какая ветка
+# _scan_token ее обрабатывала
+CATEGORIES = ("whitespace", "comment", "identifier", "number", "string", "operator")
+
+CATEGORY_NAMES = {
+    "whitespace": "пробелы",
+    "comment": "комментарии",
+    "identifier": "идентификаторы",
+    "number": "числа",
+    "string": "строки",
+    "operator": "операторы и прочее",
+}
+
+# callback(категория, число символов, время в секундах, токен или None)
+StatsCallback = Callable[[str, int, float, Optional[Token]], None]
+
+
+def categorize(first: str, second: str) -> str:
+    """Категория лексемы по ее первым двум символам"""
+    if first in (' ', '\r', '\t', '\n'):
+        return "whitespace"
+    if first == '/' and second in ('/', '*'):
+        return "comment"
+    if first == '"':
+        return "string"
+    if first.isdigit():
+        return "number"
+    if first.isalpha() or first == '_':
+        return "identifier"
+    return "operator"
+
+
+class LexerStats:
+    """
+    Накопленная статистика сканирования: число токенов по типам, число
+    символов, вызовов и время по категориям, число ошибок по категориям.
+    Статистику нескольких файлов можно сложить методом merge.
+    """
+    def __init__(self, callback: Optional[StatsCallback] = None):
+        self.callback = callback
+        self.token_counts: Counter = Counter()
+        self.chars: Counter = Counter()
+        self.calls: Counter = Counter()
+        self.seconds: Dict[str, float] = dict.fromkeys(CATEGORIES, 0.0)
+        self.errors: Counter = Counter()
+        self.files = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.token_counts.values())
+
+    @property
+    def total_errors(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def record(self, category: str, chars: int, seconds: float, token: Optional[Token]):
+        self.chars[category] += chars
+        self.calls[category] += 1
+        self.seconds[category] += seconds
+        if token is not None:
+            self.token_counts[token.type.name] += 1
+            if token.type == TokenType.ERROR:
+                self.errors[category] += 1
+        if self.callback is not None:
+            self.callback(category, chars, seconds, token)
+
+    def attach(self, scanner) -> None:
+        """Подключить сбор статистики к сканеру (до начала сканирования)"""
+        from .scanner import Scanner
+        self.files += 1
+        if type(scanner)._token_stream is Scanner._token_stream:
+            self._wrap_scan_token(scanner)
+        else:
+            self._wrap_token_stream(scanner)
+
+    def _wrap_scan_token(self, scanner):
+        # Точный режим: каждый вызов _scan_token -- одна лексема, пробел или комментарий
+        scan_token = scanner._scan_token
+        pending = scanner._pending
+        record = self.record
+        clock = time.perf_counter
+
+        def instrumented_scan_token():
+            t0 = clock()
+            scan_token()
+            elapsed = clock() - t0
+            # StreamScanner может сдвинуть окно внутри вызова: берем индексы после него
+            source, start = scanner._source, scanner._start
+            category = categorize(source[start], source[start + 1:start + 2])
+            record(category, scanner._current - start, elapsed, pending[-1] if pending else None)
+
+        scanner._scan_token = instrumented_scan_token
+        eof_token = scanner._eof_token
+
+        def counted_eof_token() -> Token:
+            self.token_counts[TokenType.END_OF_FILE.name] += 1
+            return eof_token()
+
+        scanner._eof_token = counted_eof_token
+
+    def _wrap_token_stream(self, scanner):
+        # Бэкенды со своим основным циклом (dfa): пропущенный текст перед токеном
+        # делится на пробелы и комментарии, а время между токенами относится к
+        # категории токена вместе с пропущенным перед ним текстом
+        token_stream = scanner._token_stream
+        record = self.record
+        clock = time.perf_counter
+
+        def instrumented_token_stream():
+            source = scanner._source
+            previous_end = scanner._current
+            t0 = clock()
+            for token in token_stream():
+                elapsed = clock() - t0
+                start = scanner._start
+                whitespace, comments = split_gap(source[previous_end:start])
+                if whitespace:
+                    record("whitespace", whitespace, 0.0, None)
+                if comments:
+                    record("comment", comments, 0.0, None)
+                if token.type != TokenType.END_OF_FILE:
+                    category = categorize(source[start], source[start + 1:start + 2])
+                    record(category, len(token.lexeme), elapsed, token)
+                    previous_end = start + len(token.lexeme)
+                else:
+                    self.token_counts[token.type.name] += 1
+                yield token
+                t0 = clock()
+
+        scanner._token_stream = instrumented_token_stream
+
+    def merge(self, other: "LexerStats") -> "LexerStats":
+        self.token_counts.update(other.token_counts)
+        self.chars.update(other.chars)
+        self.calls.update(other.calls)
+        for category, seconds in other.seconds.items():
+            self.seconds[category] = self.seconds.get(category, 0.0) + seconds
+        self.errors.update(other.errors)
+        self.files += other.files
+        return self
+
+    # --- Представление ---
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "tokens": self.total_tokens,
+            "errors": self.total_errors,
+            "seconds": self.total_seconds,
+            "token_counts": {t.name: self.token_counts[t.name] for t in TokenType if self.token_counts[t.name]},
+            "categories": {
+                category: {
+                    "chars": self.chars[category],
+                    "calls": self.calls[category],
+                    "seconds": self.seconds[category],
+                    "errors": self.errors[category],
+                }
+                for category in CATEGORIES
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LexerStats":
+        stats = cls()
+        stats.files = data["files"]
+        stats.token_counts.update(data["token_counts"])
+        for category, row in data["categories"].items():
+            stats.chars[category] = row["chars"]
+            stats.calls[category] = row["calls"]
+            stats.seconds[category] = row["seconds"]
+            stats.errors[category] = row["errors"]
+        return stats
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def format(self) -> str:
+        total_chars = sum(self.chars.values()) or 1
+        total_seconds = self.total_seconds or 1.0
+        lines = [f"Статистика: файлов {self.files}, токенов {self.total_tokens}, "
+                 f"ошибок {self.total_errors}, время {self.total_seconds * 1000:.1f} мс",
+                 f"  {'категория':<20}{'символов':>12}{'доля':>8}{'вызовов':>10}{'время, мс':>12}{'доля':>8}{'ошибок':>8}"]
+        for category in CATEGORIES:
+            lines.append(f"  {CATEGORY_NAMES[category]:<20}{self.chars[category]:>12}"
+                         f"{self.chars[category] / total_chars:>8.1%}{self.calls[category]:>10}"
+                         f"{self.seconds[category] * 1000:>12.1f}{self.seconds[category] / total_seconds:>8.1%}"
+                         f"{self.errors[category]:>8}")
+        lines.append("Токены по типам:")
+        for type_t in TokenType:
+            if self.token_counts[type_t.name]:
+                lines.append(f"  {type_t.name:<20}{self.token_counts[type_t.name]:>12}")
+        return "\n".join(lines) + "\n"
+
+
+def split_gap(gap: str) -> tuple:
+    """(пробелы, комментарии): число символов текста между токенами каждого вида"""
+    comments = 0
+    pos = gap.find('/')
+    while pos >= 0:
+        if gap.startswith('//', pos):
+            end = gap.find('\n', pos)
+            end = len(gap) if end < 0 else end
+        else:
+            end = gap.find('*/', pos + 2)
+            end = len(gap) if end < 0 else end + 2
+        comments += end - pos
+        pos = gap.find('/', end)
+    return len(gap) - comments, comments
@@ -0,0 +1,94 @@
+import codecs
+from typing import BinaryIO, TextIO, Union
+
+from .scanner import Scanner
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class StreamScanner(Scanner):
+    """
+    Сканер над потоком (файл, stdin, pipe), читающий текст порциями по chunk_size.
+
+    В памяти держится только окно текста от начала текущей лексемы: уже
+    разобранный префикс отбрасывается, а следующая порция подкачивается, когда
+    сканеру не хватает символов (в том числе для предпросмотра _peek_next).
+    Поэтому лексемы на границе порций ('3.' + '14', '/' + '*', длинные
+    идентификаторы, строки) разбираются так же, как Scanner разбирает строку
+    целиком. Объем памяти ограничен размером порции плюс длина самой длинной
+    лексемы (незакрытый комментарий попадает в лексему ошибки целиком).
+
+    Бинарные потоки декодируются инкрементально (многобайтовый символ может
+    быть разрезан границей порции).
+    """
+    def __init__(self, stream: Union[TextIO, BinaryIO], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 encoding: str = "utf-8", lazy: bool = True, **kwargs):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size должен быть положительным")
+        if kwargs.get("compact") or kwargs.get("cache") is not None:
+            # TokenBuffer и ключ кэша требуют весь исходный текст, а окно потока сдвигается
+            raise ValueError("StreamScanner не поддерживает компактный режим и кэш токенов")
+        self._input = stream
+        self._chunk_size = chunk_size
+        self._decoder = None if isinstance(stream.read(0), str) else codecs.getincrementaldecoder(encoding)()
+        self._input_done = False
+        # Абсолютное смещение начала окна self._source во всем потоке
+        self._window_base = 0
+        super().__init__("", lazy=lazy, **kwargs)
+
+    @property
+    def offset(self) -> int:
+        """Абсолютное смещение текущей позиции сканирования"""
+        return self._window_base + self._current
+
+    def _fill(self) -> bool:
+        while not self._input_done:
+            chunk = self._input.read(self._chunk_size)
+            if self._decoder is not None:
+                final = not chunk
+                chunk = self._decoder.decode(chunk, final=final)
+                if final:
+                    self._input_done = True
+            elif not chunk:
+                self._input_done = True
+            if chunk:
+                self._source += chunk
+                return True
+        return False
+
+    def _is_at_source_end(self) -> bool:
+        return self._current >= len(self._source) and not self._fill()
+
+    def _peek_next(self) -> str:
+        while self._current + 1 >= len(self._source):
+            if not self._fill():
+                return '\0'
+        return self._source[self._current + 1]
+
+    def _find(self, sub: str) -> int:
+        # Ищем в окне и подкачиваем порции, пока sub не найдется или поток не кончится;
+        # повторный поиск начинается с хвоста, который мог быть началом sub
+        pos = self._current
+        while True:
+            index = self._source.find(sub, pos)
+            if index != -1:
+                return index
+            pos = max(pos, len(self._source) - len(sub) + 1)
+            if not self._fill():
+                return -1
+
+    def _scan_token(self):
+        # Отбрасываем разобранный префикс окна; координаты и курсор строк (его начало
+        # строки после сдвига может стать отрицательным) сдвигаются вместе с ним
+        cut = self._start
+        if cut >= self._chunk_size:
+            # Переводы строк в отбрасываемом префиксе учитываются до сдвига
+            self._count_lines(cut)
+            self._source = self._source[cut:]
+            self._window_base += cut
+            self._start -= cut
+            self._current -= cut
+            self._column_start_of_line -= cut
+            self._counted -= cut
+            self._line_end -= cut
+        super()._scan_token()
@@ -0,0 +1,52 @@
+from typing import Dict, Iterator, List, Optional
+
+
+class SymbolTable:
+    """
+    Таблица символов одной компиляции: имя идентификатора <-> плотный целый номер.
+
+    Сканер интернирует каждый идентификатор: все вхождения одного имени получают
+    один и тот же объект строки (лексема и значение токена) и номер symbol_id,
+    поэтому повторяющиеся имена хранятся один раз, а следующие фазы сравнивают
+    и ищут идентификаторы по целым ключам. Одну таблицу можно передавать
+    сканерам всех файлов компиляции (Scanner(source, symbols=table)): номера
+    останутся согласованными между файлами.
+    """
+    def __init__(self, names: Optional[List[str]] = None):
+        # Номер символа -- индекс в names (0, 1, 2, ... в порядке первого появления)
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for name in names or ():
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """Номер символа name; новое имя получает следующий свободный номер"""
+        symbol_id = self._ids.get(name)
+        if symbol_id is None:
+            symbol_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol_id
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Номер уже встречавшегося имени или None (без добавления)"""
+        return self._ids.get(name)
+
+    def name(self, symbol_id: int) -> str:
+        return self.names[symbol_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __getstate__(self):
+        # Словарь восстанавливается по списку имен: в pickle (пул процессов) -- только имена
+        # (кортеж, а не список: пустое состояние pickle не передал бы в __setstate__)
+        return (self.names,)
+
+    def __setstate__(self, state: tuple):
+        self.__init__(state[0])
@@ -0,0 +1,204 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Union, overload
+
+from .symbols import SymbolTable
+from .tokens import Token, TokenType
+
+# Сериализованный буфер: сигнатура, версия, число токенов, длина таблицы сообщений
+_HEADER = struct.Struct("<4sHII")
+_MAGIC = b"LXTB"
+_FORMAT_VERSION = 1
+
+# TokenType по его значению (значения auto() начинаются с 1 и помещаются в байт)
+_TYPES_BY_VALUE: List[Optional[TokenType]] = [None] * (max(t.value for t in TokenType) + 1)
+for _type in TokenType:
+    _TYPES_BY_VALUE[_type.value] = _type
+
+
+class TokenBuffer:
+    """
+    Компактное хранилище потока токенов в виде "структуры массивов".
+
+    Для каждого токена в типизированных массивах хранятся только тип, смещение
+    начала лексемы в исходном тексте, длина, строка и столбец (около 21 байта
+    на токен вместо нескольких сотен у экземпляра Token). Лексема и значение
+    литерала вырезаются из исходного текста только при обращении; объект Token
+    создается лишь тогда, когда его запрашивают по индексу.
+    """
+    def __init__(self, source: str, symbols: Optional[SymbolTable] = None):
+        self._source = source
+        # Таблица символов, по которой материализуются идентификаторы (если задана)
+        self.symbols = symbols
+        # Коды типов с фиксированным размером элемента на всех платформах
+        self._types = array('B')
+        self._starts = array('q')
+        self._lengths = array('I')
+        self._lines = array('I')
+        self._columns = array('i')  # столбец ошибки незавершенного комментария бывает отрицательным
+        # Сообщения токенов ERROR по индексу (их нельзя восстановить из лексемы)
+        self._messages: Dict[int, str] = {}
+        # Строка и смещение ее начала для последнего добавленного токена
+        self._cursor = (1, 0)
+
+    @classmethod
+    def from_tokens(cls, source: str, tokens: Iterable[Token]) -> "TokenBuffer":
+        """Упаковать поток токенов (например, ленивый поток Scanner) без хранения списка"""
+        buffer = cls(source)
+        buffer.extend(tokens)
+        return buffer
+
+    def intern_identifiers(self, symbols: SymbolTable):
+        """
+        Интернировать идентификаторы буфера в symbols в порядке файла и
+        материализовать их по этой таблице. Номера совпадают с номерами при
+        сканировании текста, в каком бы порядке потом ни читались токены.
+        """
+        self.symbols = symbols
+        intern = symbols.intern
+        identifier = TokenType.IDENTIFIER.value
+        for index, code in enumerate(self._types):
+            if code == identifier:
+                intern(self.lexeme_at(index))
+
+    def extend(self, tokens: Iterable[Token]):
+        append = self.append
+        for token in tokens:
+            append(token)
+
+    def append(self, token: Token):
+        """
+        Добавить токен. Смещение восстанавливается по строке и столбцу: начало
+        строки продвигается по исходному тексту монотонно, вместе с потоком токенов.
+        """
+        source = self._source
+        line, line_start = self._cursor
+        while line < token.line:
+            line_start = source.index('\n', line_start) + 1
+            line += 1
+        self._cursor = (line, line_start)
+        message = token.literal_value if token.type == TokenType.ERROR else None
+        self.append_raw(token.type, line_start + token.column - 1, len(token.lexeme),
+                        token.line, token.column, message)
+
+    def append_raw(self, type_t: TokenType, start: int, length: int, line: int, column: int,
+                   message: Optional[str] = None):
+        """Добавить токен по его полям без создания объекта Token"""
+        if message is not None:
+            self._messages[len(self._types)] = message
+        self._types.append(type_t.value)
+        self._starts.append(start)
+        self._lengths.append(length)
+        self._lines.append(line)
+        self._columns.append(column)
+
+    # --- Доступ к полям без материализации Token ---
+
+    def type_at(self, index: int) -> TokenType:
+        return _TYPES_BY_VALUE[self._types[index]]
+
+    def lexeme_at(self, index: int) -> str:
+        start = self._starts[index]
+        return self._source[start:start + self._lengths[index]]
+
+    def span_at(self, index: int) -> tuple:
+        """(смещение начала, длина) лексемы в исходном тексте"""
+        return self._starts[index], self._lengths[index]
+
+    def literal_at(self, index: int):
+        """Значение литерала, вычисленное из лексемы (как его строит Scanner)"""
+        type_t = self.type_at(index)
+        if type_t == TokenType.ERROR:
+            return self._messages.get(index)
+        if type_t == TokenType.IDENTIFIER:
+            return self.lexeme_at(index)
+        if type_t == TokenType.INT_LITERAL:
+            return int(self.lexeme_at(index))
+        if type_t == TokenType.FLOAT_LITERAL:
+            return float(self.lexeme_at(index))
+        if type_t == TokenType.STRING_LITERAL:
+            return self.lexeme_at(index)[1:-1]
+        if type_t == TokenType.BOOL_LITERAL:
+            return self.lexeme_at(index) == "true"
+        return None
+
+    # --- Интерфейс последовательности ---
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[Token]: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("индекс токена вне диапазона")
+        if self.symbols is not None and self._types[index] == TokenType.IDENTIFIER.value:
+            symbol_id = self.symbols.intern(self.lexeme_at(index))
+            name = self.symbols.names[symbol_id]
+            return Token(TokenType.IDENTIFIER, name, self._lines[index], self._columns[index], name, symbol_id)
+        return Token(
+            type=self.type_at(index),
+            lexeme=self.lexeme_at(index),
+            line=self._lines[index],
+            column=self._columns[index],
+            literal_value=self.literal_at(index),
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _arrays(self) -> tuple:
+        return self._types, self._starts, self._lengths, self._lines, self._columns
+
+    def nbytes(self) -> int:
+        """Объем памяти, занятый массивами (без исходного текста)"""
+        return sum(a.itemsize * len(a) for a in self._arrays())
+
+    # --- Сериализация ---
+
+    def to_bytes(self) -> bytes:
+        """
+        Компактное представление: массивы в порядке little-endian и сообщения
+        ошибок, сжатые zlib. Исходный текст не сохраняется.
+        """
+        messages = json.dumps({str(k): v for k, v in self._messages.items()}, ensure_ascii=False).encode("utf-8")
+        parts = []
+        for data in self._arrays():
+            if sys.byteorder == "big":
+                data = array(data.typecode, data)
+                data.byteswap()
+            parts.append(data.tobytes())
+        parts.append(messages)
+        return _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self), len(messages)) + zlib.compress(b"".join(parts), 1)
+
+    @classmethod
+    def from_bytes(cls, source: str, data: bytes) -> "TokenBuffer":
+        """Восстановить буфер, сохраненный to_bytes, для того же исходного текста"""
+        magic, version, count, messages_length = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("неподдерживаемый формат буфера токенов")
+        payload = zlib.decompress(data[_HEADER.size:])
+        buffer = cls(source)
+        offset = 0
+        for target in buffer._arrays():
+            size = target.itemsize * count
+            target.frombytes(payload[offset:offset + size])
+            if sys.byteorder == "big":
+                target.byteswap()
+            offset += size
+        if offset + messages_length != len(payload):
+            raise ValueError("поврежденный буфер токенов")
+        messages = json.loads(payload[offset:].decode("utf-8"))
+        buffer._messages = {int(k): v for k, v in messages.items()}
+        return buffer
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Optional, Union
+
+from .token_buffer import TokenBuffer
+
+# Переменная окружения для включения кэша в тестах и generate_expected.py
+CACHE_ENV = "MINICOMPILER_TOKEN_CACHE"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".tok"
+
+_lexer_version: Optional[str] = None
+
+
+def lexer_version() -> str:
+    """
+    Версия лексера -- хэш исходного кода пакета src/lexer. Любое изменение
+    сканера делает старые записи кэша недостижимыми.
+    """
+    global _lexer_version
+    if _lexer_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(Path(__file__).parent.glob("*.py")):
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+        _lexer_version = digest.hexdigest()[:16]
+    return _lexer_version
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "minicompiler" / "tokens"
+
+
+class TokenCache:
+    """
+    Постоянный кэш токенов на диске.
+
+    Ключ записи -- хэш содержимого исходника, версии лексера и имени бэкенда;
+    значение -- TokenBuffer.to_bytes() (лексемы восстанавливаются из самого
+    исходника). Запись атомарна (временный файл + os.replace), поэтому кэш
+    можно использовать из нескольких процессов одновременно: читатель видит
+    либо старую, либо новую запись целиком. При превышении max_bytes
+    удаляются записи, к которым дольше всего не обращались (LRU по mtime).
+    """
+    def __init__(self, directory: Union[str, Path, None] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Оценка объема кэша: полный подсчет делается при первой записи в процессе
+        self._size_estimate: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["TokenCache"]:
+        """Кэш из MINICOMPILER_TOKEN_CACHE (пустое значение -- каталог по умолчанию) или None"""
+        directory = os.environ.get(CACHE_ENV)
+        if directory is None:
+            return None
+        return cls(directory or None)
+
+    def key(self, source: str, backend: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{lexer_version()}\0{backend}\0".encode("utf-8"))
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + ENTRY_SUFFIX)
+
+    def get(self, source: str, backend: str) -> Optional[TokenBuffer]:
+        path = self._path(self.key(source, backend))
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            buffer = TokenBuffer.from_bytes(source, data)
+        except (ValueError, zlib.error, struct.error):
+            # Поврежденная запись: удаляем и сканируем заново
+            self._unlink(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # отметка для LRU
+        except OSError:
+            pass
+        self.hits += 1
+        return buffer
+
+    def put(self, source: str, backend: str, buffer: TokenBuffer):
+        path = self._path(self.key(source, backend))
+        data = buffer.to_bytes()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            self._unlink(Path(tmp))
+            return
+        if self._size_estimate is None:
+            self._size_estimate = self.size()
+        else:
+            self._size_estimate += len(data)
+        if self._size_estimate > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self, target_bytes: Optional[int] = None):
+        """Удалить самые старые записи, пока объем не станет не больше target_bytes"""
+        if target_bytes is None:
+            target_bytes = self.max_bytes * 9 // 10
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            self._unlink(Path(path))
+            total -= size
+        self._size_estimate = total
+
+    def clear(self):
+        self.evict(0)
+
+    def _entries(self):
+        try:
+            subdirs = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                yield from (e for e in os.scandir(subdir.path) if e.name.endswith(ENTRY_SUFFIX))
+            except OSError:
+                continue
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
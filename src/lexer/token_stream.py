@@ -0,0 +1,150 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .scanner import Scanner
+from .tokens import Token, TokenType
+
+DEFAULT_CAPACITY = 16
+
+
+class TokenStream:
+    """
+    Поток токенов для синтаксического анализатора: просмотр на k токенов вперед
+    и точки возврата поверх ленивого сканера.
+
+    Токены хранятся в кольцевом буфере, позиции в потоке -- сквозные номера
+    токенов. Буфер держит только токены от текущей позиции (или от самой
+    ранней живой точки возврата mark) до самого дальнего просмотренного
+    peek(k): без точек возврата память не зависит от длины входа, в том числе
+    для StreamScanner. Если токенов нужно больше, чем вмещает буфер, его
+    емкость удваивается.
+
+    skip -- типы токенов, которые поток пропускает (обычно TokenType.ERROR:
+    сканер при этом по-прежнему сообщает об ошибках в stderr или в
+    DiagnosticCollector). После END_OF_FILE поток отдает тот же токен EOF.
+    """
+    def __init__(self, scanner: Scanner, skip: Iterable[TokenType] = (),
+                 capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity должен быть положительным")
+        self._scanner = scanner
+        self._skip = frozenset(skip)
+        # Емкость -- степень двойки: слот токена с номером i -- i & mask
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._capacity = size
+        self._buffer: List[Optional[Token]] = [None] * size
+        self._mask = size - 1
+        # Номер самого раннего хранимого токена, текущая позиция и номер,
+        # следующий за последним прочитанным из сканера токеном
+        self._base = 0
+        self._pos = 0
+        self._end = 0
+        self._eof: Optional[Token] = None
+        # Живые точки возврата: позиция -> сколько раз она отмечена
+        self._marks: Dict[int, int] = {}
+
+    @property
+    def position(self) -> int:
+        """Номер текущего токена от начала потока (с учетом пропущенных типов)"""
+        return self._pos
+
+    @property
+    def retained(self) -> int:
+        """Сколько токенов сейчас хранится в буфере"""
+        return self._end - self._base
+
+    def peek(self, k: int = 0) -> Token:
+        """Токен на k позиций впереди текущего (peek(0) -- текущий), без продвижения"""
+        if k < 0:
+            raise ValueError("peek: k не может быть отрицательным")
+        index = self._pos + k
+        if index >= self._end and not self._fetch(index):
+            return self._eof
+        return self._buffer[index & self._mask]
+
+    def next(self) -> Token:
+        """Текущий токен с продвижением (на END_OF_FILE позиция не сдвигается)"""
+        pos = self._pos
+        if pos >= self._end and not self._fetch(pos):
+            return self._eof
+        token = self._buffer[pos & self._mask]
+        if token is self._eof:
+            return token
+        self._pos = pos + 1
+        if not self._marks:
+            self._base = pos + 1
+        return token
+
+    def at_end(self) -> bool:
+        return self.peek().type == TokenType.END_OF_FILE
+
+    def __iter__(self) -> Iterator[Token]:
+        """Оставшиеся токены, включая END_OF_FILE, с продвижением"""
+        while True:
+            token = self.next()
+            yield token
+            if token.type == TokenType.END_OF_FILE:
+                return
+
+    # --- Точки возврата ---
+
+    def mark(self) -> int:
+        """
+        Отметить текущую позицию. Пока отметка жива (до release), токены от нее
+        остаются в буфере и к ней можно вернуться reset.
+        """
+        pos = self._pos
+        self._marks[pos] = self._marks.get(pos, 0) + 1
+        return pos
+
+    def reset(self, mark: int):
+        """Вернуться к отметке; отметка остается живой до release"""
+        if mark not in self._marks:
+            raise ValueError(f"Точка возврата {mark} не отмечена или уже освобождена")
+        self._pos = mark
+
+    def release(self, mark: int):
+        """Освободить отметку: токены до самой ранней живой отметки больше не хранятся"""
+        count = self._marks.get(mark)
+        if count is None:
+            raise ValueError(f"Точка возврата {mark} не отмечена или уже освобождена")
+        if count > 1:
+            self._marks[mark] = count - 1
+            return
+        del self._marks[mark]
+        base = min(self._marks) if self._marks else self._pos
+        self._base = min(base, self._pos)
+        if not self._marks and len(self._buffer) > self._capacity and self.retained <= self._capacity:
+            # Буфер, выросший ради отметки, возвращается к исходной емкости
+            # и не держит ссылок на уже ненужные токены
+            self._resize(self._capacity)
+
+    # --- Внутренние методы ---
+
+    def _fetch(self, index: int) -> bool:
+        """Дочитать токены из сканера до номера index включительно (False -- поток кончился раньше)"""
+        if self._eof is not None:
+            return False
+        scanner = self._scanner
+        skip = self._skip
+        while self._end <= index:
+            token = scanner.next_token()
+            if token.type in skip:
+                continue
+            if self._end - self._base > self._mask:
+                self._resize(len(self._buffer) * 2)
+            self._buffer[self._end & self._mask] = token
+            self._end += 1
+            if token.type == TokenType.END_OF_FILE:
+                self._eof = token
+                return index < self._end
+        return True
+
+    def _resize(self, size: int):
+        """Новая емкость кольцевого буфера (степень двойки) с сохранением хранимых токенов"""
+        old, old_mask = self._buffer, self._mask
+        self._buffer = [None] * size
+        self._mask = size - 1
+        for index in range(self._base, self._end):
+            self._buffer[index & self._mask] = old[index & old_mask]
@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional
 
 class TokenType(Enum):
@@ -88,6 +88,8 @@ class Token:
     line: int                  # Номер строки (1-индексация)
     column: int                # Номер столбца (1-индексация)
     literal_value: Optional[Any] = None # Извлеченное значение (например, int или float)
+    # Номер идентификатора в SymbolTable сканера; в сравнении токенов не участвует
+    symbol_id: Optional[int] = field(default=None, compare=False)
 
     def __str__(self) -> str:
         """Формат вывода как запрошено в TEST-3"""
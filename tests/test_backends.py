@@ -0,0 +1,83 @@
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.backends import BACKENDS, create_scanner
+from src.lexer import lexgen
+from src.lexer.lexgen import compile_rules, load_table, parse_regex, LexSpecError
+from src.lexer.lexspec import RULES
+
+BASE_DIR = Path(__file__).parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+# Inputs that exercise the corner cases of the reference Scanner
+TRICKY_SOURCES = [
+    "3. 3.x 3.14.15 .5 12abc",
+    "a&b | c && d || e &",
+    "/ /= // line\n/* a ** b */ /*/ */ /**/ x",
+    "/* unterminated *",
+    "/* unterminated\n  over lines\n",
+    '"ok" "unterminated\n"" "at eof',
+    "x" * 255 + " " + "y" * 256,
+    "if iff _under __x9 true false truex int_ fn(){}[];,:",
+    "\t\r\n  a\r\nb  \n",
+    "переменная = 1; ñ2 = 3.0;",
+    "$ @ # ~ ` ' \\ .",
+    "+=+-=-*=*/=%==!=!<=<>=>",
+    "x² = 2²; y = 1.5³ + ٣٤.٥ + 3.²",
+    "a½b 1½ _٣x ﬁx Ⅻ3 é\u0301t",
+    '// no newline at eof */ "',
+    '"a\\"b" "\r\n" /***/ /* ** / */ */',
+    "",
+]
+
+
+def scan(source: str, backend: str) -> list[str]:
+    return [str(t) for t in create_scanner(source, backend)._tokens]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_backend_against_expected_output(src_path: Path, backend: str):
+    source = src_path.read_text(encoding="utf-8")
+    expected = src_path.with_suffix(".txt").read_text(encoding="utf-8").strip().splitlines()
+    assert scan(source, backend) == [line.strip() for line in expected if line.strip()]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("source", TRICKY_SOURCES)
+def test_backend_matches_reference_scanner(source: str, backend: str):
+    assert scan(source, backend) == [str(t) for t in Scanner(source)._tokens]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_scanner("", "nope")
+
+
+def test_dfa_table_is_cached_on_disk(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(lexgen, "_loaded", {})
+    table = load_table(cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("lexer_dfa.*.json"))) == 1
+
+    # Second process start: the table is read back instead of being regenerated
+    monkeypatch.setattr(lexgen, "_loaded", {})
+    monkeypatch.setattr(lexgen, "compile_rules", lambda rules: pytest.fail("table was regenerated"))
+    reloaded = load_table(cache_dir=tmp_path)
+    assert reloaded.transitions == table.transitions
+    assert reloaded.accept == table.accept
+
+
+def test_dfa_is_minimal():
+    table = compile_rules(RULES)
+    rows = {
+        (table.accept[s], tuple(table.transitions[s * table.num_classes:(s + 1) * table.num_classes]))
+        for s in range(table.num_states)
+    }
+    # No two states share the same acceptance and outgoing transitions
+    assert len(rows) == table.num_states
+
+
+@pytest.mark.parametrize("pattern", ["(ab", "[ab", "*a", "a\\"])
+def test_bad_regex_is_rejected(pattern: str):
+    with pytest.raises(LexSpecError):
+        parse_regex(pattern)
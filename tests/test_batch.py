@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from pathlib import Path
+from src.lexer.batch import collect_inputs, format_summary, lex_files
+from src.lexer.scanner import Scanner
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+LEXER_DIR = BASE_DIR / "lexer"
+
+
+def test_collect_inputs_expands_directories_and_globs():
+    from_dir = collect_inputs([str(LEXER_DIR)])
+    assert from_dir == sorted(from_dir)
+    assert len(from_dir) == len(list(LEXER_DIR.rglob("*.src")))
+    from_glob = collect_inputs([str(LEXER_DIR / "valid" / "*.src"), str(LEXER_DIR / "valid")])
+    # Duplicates are dropped, the first occurrence keeps its position
+    assert from_glob == sorted(str(p) for p in (LEXER_DIR / "valid").glob("*.src"))
+    assert collect_inputs(["missing/*.src"]) == ["missing/*.src"]
+
+
+def test_parallel_results_are_ordered_and_complete():
+    paths = collect_inputs([str(LEXER_DIR)])
+    sequential = list(lex_files(paths, jobs=1))
+    parallel = list(lex_files(paths, jobs=2))
+    assert [r.path for r in parallel] == paths
+    assert [(r.output, r.counts, r.stderr) for r in parallel] == [(r.output, r.counts, r.stderr) for r in sequential]
+    for result in parallel:
+        source = Path(result.path).read_text(encoding="utf-8")
+        assert result.output.splitlines() == [str(t) for t in Scanner(source)._tokens]
+
+
+def test_summary_reports_errors_per_file():
+    results = list(lex_files(collect_inputs([str(LEXER_DIR / "invalid"), "missing.src"])))
+    summary = format_summary(results)
+    assert "test_invalid_char.src: 2" in summary
+    assert "missing.src: не прочитан" in summary
+    assert results[-1].failure is not None
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.lexer", *args], cwd=ROOT_DIR,
+                          capture_output=True, text=True, encoding="utf-8")
+
+
+def test_cli_exit_code_reflects_lexical_errors():
+    assert run_cli(str(LEXER_DIR / "valid"), "-j", "2").returncode == 0
+    failed = run_cli(str(LEXER_DIR), "-j", "2", "--summary", "--no-tokens")
+    assert failed.returncode == 1
+    assert failed.stdout == ""
+    assert "лексических ошибок 7" in failed.stderr
+
+
+def test_cli_single_file_output_is_unchanged():
+    path = LEXER_DIR / "valid" / "test_numbers.src"
+    result = run_cli(str(path))
+    assert result.returncode == 0
+    assert result.stdout == path.with_suffix(".txt").read_text(encoding="utf-8")
+
+
+def test_cli_errors_name_their_file(tmp_path: Path):
+    first = tmp_path / "a.src"
+    second = tmp_path / "b.src"
+    first.write_text("x $\n", encoding="utf-8")
+    second.write_text("\n  y & z\n", encoding="utf-8")
+    for jobs in ("1", "2"):
+        result = run_cli(str(first), str(second), "--no-tokens", "-j", jobs)
+        assert result.returncode == 1
+        assert result.stderr.splitlines() == [
+            f"{first}:1:3: Ошибка: Недопустимый символ '$'. Лексема: '$'",
+            f"{second}:2:5: Ошибка: Неожиданный символ '&', ожидалось '&&'. Лексема: '&'",
+        ]
+    # A single file keeps the plain format
+    assert run_cli(str(first), "--no-tokens").stderr == "[1:3] Ошибка: Недопустимый символ '$'. Лексема: '$'\n"
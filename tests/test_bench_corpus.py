@@ -0,0 +1,46 @@
+import pytest
+from collections import Counter
+from src.lexer.backends import BACKENDS
+from src.lexer.scanner import Scanner
+from src.lexer.tokens import TokenType
+from benchmarks.corpus import MAX_IDENTIFIER, SCENARIOS, corpus
+from benchmarks.suite import compare
+
+SIZE = 20_000
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_corpus_is_deterministic_and_backends_agree(name: str, capsys):
+    source = corpus(name, SIZE)
+    assert source == corpus(name, SIZE)
+    assert source != corpus(name, SIZE, seed=1)
+    assert SIZE <= len(source) < SIZE * 1.5
+    expected = [str(t) for t in Scanner(source)._tokens]
+    for backend in BACKENDS.values():
+        assert [str(t) for t in backend(source)._tokens] == expected
+
+
+def test_scenarios_stress_their_paths(capsys):
+    def counts(name):
+        return Counter(t.type for t in Scanner(corpus(name, SIZE))._tokens)
+
+    identifiers = Scanner(corpus("identifiers", 200_000))._tokens
+    long_names = [t for t in identifiers if t.type == TokenType.IDENTIFIER and len(t.lexeme) > 200]
+    assert max(len(t.lexeme) for t in long_names) == MAX_IDENTIFIER
+    assert any(t.type == TokenType.ERROR and "слишком длинный" in t.literal_value for t in identifiers)
+    assert counts("numbers")[TokenType.FLOAT_LITERAL] > 100
+    assert counts("strings")[TokenType.STRING_LITERAL] > 100
+    assert counts("comments")[TokenType.ERROR] == 0
+    garbage = counts("garbage")
+    assert garbage[TokenType.ERROR] > sum(garbage.values()) / 2
+
+
+def test_compare_flags_regressions():
+    row = {"tokens": 100, "tokens_per_sec": 1000.0, "peak_bytes": 1000}
+    baseline = {"results": {"a/scanner": row, "gone/scanner": row}}
+    same = {"results": {"a/scanner": dict(row, tokens_per_sec=900.0)}}
+    assert compare(same, baseline, 0.15) == []
+    slow = {"results": {"a/scanner": dict(row, tokens_per_sec=800.0, peak_bytes=2000)}}
+    assert len(compare(slow, baseline, 0.15)) == 2
+    changed = {"results": {"a/scanner": dict(row, tokens=99)}}
+    assert "token count changed" in compare(changed, baseline, 0.15)[0]
@@ -0,0 +1,121 @@
+import subprocess
+import sys
+import time
+import pytest
+from pathlib import Path
+from src.lexer.bytes_scanner import BytesScanner
+from src.lexer.diagnostics import DiagnosticCollector
+from src.lexer.scanner import Scanner
+from src.lexer.token_cache import TokenCache
+from tests.test_backends import TRICKY_SOURCES
+from tests.test_stream import BOUNDARY_SOURCES
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+# Non-ASCII characters next to ASCII tokens: columns are counted in characters
+UNICODE_SOURCES = [
+    "é",
+    "x\n/* é\nщ */ y",
+    "щ = 1; /* щ\n",
+    "ab\n  /* x\né",
+    "\U0001F600 x",
+    "ёж2 3.٣ 1½ x.y",
+    "a" * 300 + "é",
+    '"строка" + "без конца\nпривет',
+    # Lexemes longer than the initial decode window, and a window edge before '.'
+    "щ" * 300 + " x",
+    "1" + "٣" * 300 + "." + "٣" * 300,
+    "é" * 127 + "1.٣ x",
+    "中文。" * 200,
+]
+
+
+def reference(source: str) -> list[str]:
+    return [str(t) for t in Scanner(source)._tokens]
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_matches_scanner_on_golden_files(src_path: Path, capsys):
+    source = src_path.read_text(encoding="utf-8")
+    with BytesScanner.from_file(str(src_path)) as scanner:
+        assert [str(t) for t in scanner._tokens] == reference(source)
+
+
+@pytest.mark.parametrize("source", TRICKY_SOURCES + BOUNDARY_SOURCES + UNICODE_SOURCES)
+def test_matches_scanner_on_tricky_sources(source: str, capsys):
+    assert [str(t) for t in BytesScanner(source.encode("utf-8"))._tokens] == reference(source)
+    expected = DiagnosticCollector()
+    Scanner(source, diagnostics=expected)
+    collector = DiagnosticCollector()
+    BytesScanner(source, diagnostics=collector)
+    # Diagnostic offsets are character offsets, as with the str scanner
+    assert [d.to_dict() for d in collector] == [d.to_dict() for d in expected]
+
+
+def test_non_ascii_text_scans_in_linear_time():
+    # Every token sits in one long non-ASCII run: decoding the rest of the run per token is quadratic
+    def best(source: str) -> float:
+        times = []
+        for _ in range(3):
+            t0 = time.perf_counter()
+            BytesScanner(source, diagnostics=DiagnosticCollector())._tokens
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    for unit in ("中文。", "é."):
+        small, large = best(unit * 2000), best(unit * 8000)
+        assert large < small * 8  # linear: about 4x; quadratic: about 16x
+
+
+def test_lazy_mode_and_eof(capsys):
+    source = "щ = 1;\nx"
+    scanner = BytesScanner(bytearray(source.encode("utf-8")), lazy=True)
+    tokens = [scanner.next_token() for _ in range(7)]
+    assert [str(t) for t in tokens[:6]] == reference(source)
+    # Past the end both scanners keep returning the same END_OF_FILE token
+    reference_scanner = Scanner(source, lazy=True)
+    for _ in range(7):
+        last = reference_scanner.next_token()
+    assert str(tokens[6]) == str(last)
+
+
+def test_from_file_maps_and_closes(tmp_path: Path):
+    path = tmp_path / "input.src"
+    path.write_text("int щ = 2;\n", encoding="utf-8")
+    scanner = BytesScanner.from_file(str(path), lazy=True)
+    assert scanner._mmap is not None
+    tokens = list(scanner)
+    scanner.close()
+    assert scanner._mmap is None
+    assert [t.lexeme for t in tokens] == ["int", "щ", "=", "2", ";", ""]
+
+    empty = tmp_path / "empty.src"
+    empty.write_bytes(b"")
+    assert [t.type.name for t in BytesScanner.from_file(str(empty))._tokens] == ["END_OF_FILE"]
+
+
+def test_str_only_options_are_rejected(tmp_path: Path):
+    for kwargs in ({"compact": True}, {"cache": TokenCache(tmp_path)}):
+        with pytest.raises(ValueError):
+            BytesScanner(b"x", **kwargs)
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.lexer", *args], cwd=ROOT_DIR,
+                          capture_output=True, text=True, encoding="utf-8")
+
+
+def test_cli_mmap(tmp_path: Path):
+    first = tmp_path / "a.src"
+    first.write_text("int щ = 1; $\n", encoding="utf-8")
+    second = tmp_path / "b.src"
+    second.write_bytes(b"x = 1; \xff\n")
+    single = run_cli(str(first), "--mmap")
+    assert single.stdout == run_cli(str(first)).stdout
+    assert single.returncode == 1 and "Недопустимый символ '$'" in single.stderr
+    batch = run_cli(str(first), str(second), "--mmap", "-j", "1")
+    assert batch.returncode == 1
+    assert f"Ошибка при чтении файла {second}" in batch.stdout
+    assert run_cli(str(first), "--mmap", "--backend", "dfa").returncode == 2
@@ -0,0 +1,98 @@
+import io
+import json
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from src.lexer.backends import BACKENDS
+from src.lexer.diagnostics import DiagnosticCollector, TooManyErrors, error_code
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.token_cache import TokenCache
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+SOURCE = 'int x;\n@@@ $ "open\na & b | c /* end'
+
+
+def collect(source: str, scanner_cls=Scanner, **kwargs) -> DiagnosticCollector:
+    collector = DiagnosticCollector(**kwargs)
+    scanner_cls(source, diagnostics=collector)
+    return collector
+
+
+def test_collector_replaces_stderr_and_keeps_tokens(capsys):
+    expected = Scanner(SOURCE)._tokens
+    legacy_stderr = capsys.readouterr().err
+    collector = DiagnosticCollector(collapse=False)
+    assert Scanner(SOURCE, diagnostics=collector)._tokens == expected
+    assert capsys.readouterr().err == ""
+    out = io.StringIO()
+    collector.render(out)
+    # Without collapsing, rendering reproduces the per-error messages exactly
+    assert out.getvalue() == legacy_stderr
+    assert len(collector) == 0
+
+
+def test_diagnostic_fields():
+    collector = collect(SOURCE)
+    assert [d.code for d in collector] == ["L001", "L001", "L002", "L006", "L007", "L004"]
+    run = collector.diagnostics[0]
+    assert (run.line, run.column, run.offset, run.length, run.count, run.lexeme) == (2, 1, 7, 3, 3, "@@@")
+    assert run.span == (7, 10)
+    assert "(и еще 2 подряд)" in run.render()
+    assert collector.error_count == 8
+    assert json.loads(collector.to_json())["diagnostics"][2]["severity"] == "ERROR"
+    assert error_code("Некорректный числовой литерал '2²'") == "L008"
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_backends_and_stream_report_the_same_spans(backend: str):
+    expected = [d.to_dict() for d in collect(SOURCE)]
+    assert [d.to_dict() for d in collect(SOURCE, BACKENDS[backend])] == expected
+    collector = DiagnosticCollector()
+    list(StreamScanner(io.StringIO(SOURCE), chunk_size=3, diagnostics=collector))
+    assert [d.to_dict() for d in collector] == expected
+
+
+def test_cached_errors_reach_the_collector(tmp_path: Path):
+    cold = DiagnosticCollector()
+    Scanner(SOURCE, cache=TokenCache(tmp_path), diagnostics=cold)
+    cache = TokenCache(tmp_path)
+    warm = DiagnosticCollector()
+    Scanner(SOURCE, cache=cache, diagnostics=warm)
+    assert cache.hits == 1
+    assert [d.to_dict() for d in warm] == [d.to_dict() for d in cold]
+
+
+def test_limit_and_abort():
+    capped = collect("$ " * 50, max_errors=3)
+    assert len(capped) == 3 and capped.suppressed == 47
+    out = io.StringIO()
+    capped.render(out)
+    assert out.getvalue().splitlines()[-1] == "Примечание: еще 47 ошибок не показано (предел 3)"
+
+    with pytest.raises(TooManyErrors) as info:
+        collect("ok;" + "$ " * 50, max_errors=5, abort=True)
+    assert info.value.count == 5
+    lazy = Scanner("a b $ c", lazy=True, diagnostics=DiagnosticCollector(abort=True))
+    assert [t.lexeme for t in (lazy.next_token(), lazy.next_token())] == ["a", "b"]
+    with pytest.raises(TooManyErrors):
+        lazy.next_token()
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.lexer", *args], cwd=ROOT_DIR,
+                          capture_output=True, text=True, encoding="utf-8")
+
+
+def test_cli_fail_fast_and_max_errors(tmp_path: Path):
+    path = tmp_path / "garbage.src"
+    path.write_text("int x;\n" + "$ " * 20 + "\n", encoding="utf-8")
+    aborted = run_cli(str(path), "--fail-fast")
+    assert aborted.returncode == 1
+    assert aborted.stdout.splitlines()[-1] == '1:6 SEMICOLON ";"'
+    assert "прервано после 1 ошибок" in aborted.stderr
+    capped = run_cli(str(path), "--max-errors", "2", "--no-tokens")
+    assert capped.returncode == 1
+    assert len(capped.stderr.splitlines()) == 3
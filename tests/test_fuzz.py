@@ -0,0 +1,53 @@
+from collections import Counter
+from benchmarks import fuzz
+from benchmarks.corpus import MAX_IDENTIFIER
+from src.lexer.diagnostics import error_code
+from src.lexer.scanner import Scanner
+
+
+def test_cases_are_reproducible_and_reach_the_tricky_paths(capsys):
+    assert fuzz.case_source(3, 17) == fuzz.case_source(3, 17)
+    assert fuzz.case_source(3, 17) != fuzz.case_source(4, 17)
+    codes = Counter()
+    lengths = set()
+    for index in range(2000):
+        for token in Scanner(fuzz.case_source(0, index))._tokens:
+            if token.type.name == "ERROR":
+                codes[error_code(token.literal_value)] += 1
+            else:
+                lengths.add(len(token.lexeme))
+    # Invalid characters, both unterminated strings, unterminated comments, too long
+    # identifiers, lone '&' / '|' and non-ASCII digits all occur
+    assert set(codes) == {"L001", "L002", "L003", "L004", "L005", "L006", "L007", "L008"}
+    assert MAX_IDENTIFIER in lengths
+
+
+def test_all_modes_agree_with_scanner():
+    batches = list(fuzz.fuzz(300, list(fuzz.MODES), seed=1))
+    assert sum(count for count, _ in batches) == 300
+    assert [divergence for _, found in batches for divergence in found] == []
+
+
+def test_process_pool_covers_every_case():
+    batches = list(fuzz.fuzz(fuzz.BATCH_SIZE + 10, ["bytes"], seed=2, jobs=2))
+    assert [count for count, _ in batches] == [fuzz.BATCH_SIZE, 10]
+
+
+def test_divergence_is_minimized(monkeypatch, capsys):
+    # A broken mode that scans every '&&' as '||'
+    monkeypatch.setitem(fuzz.MODES, "broken", lambda source: fuzz.reference(source.replace("&&", "||")))
+    source = "int x = a && b; // " + "padding " * 10
+    [divergence] = fuzz.check_case(source, ["broken", "dfa"])
+    assert divergence.mode == "broken"
+    assert divergence.reproducer == "&&"
+    assert "expected '1:1 AND_AND" in divergence.detail
+
+
+def test_cli(monkeypatch, capsys):
+    assert fuzz.main(["--cases", "20", "-j", "1", "--mode", "dfa"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("20 cases x 1 modes") and out.endswith(", 0 divergences\n")
+    # A replayed case prints its source and every divergence
+    monkeypatch.setitem(fuzz.MODES, "broken", lambda source: (["nothing"], None))
+    assert fuzz.main(["--replay", "5", "--mode", "broken"]) == 1
+    assert "[broken] case 5: token 0: expected" in capsys.readouterr().out
@@ -0,0 +1,73 @@
+import random
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.incremental import LexSnapshot, TextEdit, relex
+
+BASE_DIR = Path(__file__).parent
+SAMPLE = (BASE_DIR.parent / "examples" / "hello.src").read_text(encoding="utf-8")
+
+# Fragments that open or close comments and strings, or glue tokens together
+FRAGMENTS = ["/*", "*/", "//", '"', "\n", " ", "3.", "14", "x", "&", "|", "=", "*", "/", ";", ""]
+
+
+def full_scan(source: str) -> list[str]:
+    return [str(t) for t in Scanner(source)._tokens]
+
+
+def check(snapshot: LexSnapshot, edit: TextEdit) -> LexSnapshot:
+    updated = relex(snapshot, edit)
+    expected_source = snapshot.source[:edit.offset] + edit.inserted_text + snapshot.source[edit.offset + edit.deleted_length:]
+    assert updated.source == expected_source
+    assert [str(t) for t in updated.tokens] == full_scan(expected_source)
+    return updated
+
+
+@pytest.mark.parametrize("edit", [
+    TextEdit(0, 0, "/*"),                      # opens a comment swallowing the whole file
+    TextEdit(SAMPLE.index("Многострочный") - 4, 2, ""),  # deletes the opening "/*"
+    TextEdit(SAMPLE.index("*/"), 2, ""),       # deletes the closing "*/"
+    TextEdit(SAMPLE.index('"Hello'), 1, ""),   # deletes the opening quote
+    TextEdit(SAMPLE.index('!";') + 1, 1, ""),  # deletes the closing quote
+    TextEdit(SAMPLE.index("3.1415") + 2, 0, "x"),  # splits a float literal
+    TextEdit(SAMPLE.index("counter"), 0, "\n\n"),  # shifts all following lines
+    TextEdit(len(SAMPLE), 0, "/* tail"),       # unterminated comment at EOF
+])
+def test_targeted_edits_match_full_rescan(edit: TextEdit):
+    check(LexSnapshot.from_source(SAMPLE), edit)
+
+
+def test_random_edit_sequences_match_full_rescan():
+    rng = random.Random(1234)
+    snapshot = LexSnapshot.from_source(SAMPLE)
+    for _ in range(300):
+        offset = rng.randint(0, len(snapshot.source))
+        deleted = rng.randint(0, min(4, len(snapshot.source) - offset))
+        inserted = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 2)))
+        snapshot = check(snapshot, TextEdit(offset, deleted, inserted))
+
+
+def test_edit_rescans_only_damaged_region():
+    source = "int a = 1;\n" * 500
+    snapshot = LexSnapshot.from_source(source)
+    updated = snapshot.apply_edit(source.index("1;", 2000), 1, "42")
+    assert updated.rescanned_tokens <= 3
+    # Tokens on untouched lines are shared with the previous snapshot
+    assert updated.tokens[-2] is snapshot.tokens[-2]
+
+
+def test_line_shift_is_applied_on_read():
+    source = "int a = 1;\n" * 500
+    snapshot = LexSnapshot.from_source(source)
+    updated = snapshot.apply_edit(source.index("int", 2000), 0, "\n\n")
+    # The tail after a newline edit is not copied: it is the old list with a line delta
+    assert updated.rescanned_tokens <= 3
+    assert updated._locate(len(updated) - 2)[0] is snapshot.tokens[-2]
+    assert updated.token_start(len(updated) - 1) == len(updated.source)
+    assert [str(t) for t in updated.tokens] == full_scan(updated.source)
+    assert len(updated._pieces) == 1
+
+
+def test_edit_out_of_range_is_rejected():
+    with pytest.raises(ValueError):
+        LexSnapshot.from_source("abc").apply_edit(2, 5, "")
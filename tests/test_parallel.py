@@ -0,0 +1,103 @@
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from src.lexer.diagnostics import DiagnosticCollector
+from src.lexer.parallel import lex_chunk, lex_parallel, split_chunks
+from src.lexer.scanner import Scanner
+from src.lexer.symbols import SymbolTable
+from src.lexer.tokens import TokenType
+from benchmarks.common import synthetic_source
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+# Chunk boundaries inside comments, with '*/' hidden in strings and line comments
+# (wrong guesses), and comments left open across several chunks or until EOF
+TRICKY_SOURCES = [
+    "a /*\nb\nc */ d\ne\n",
+    'x = "*/";\ny /* z\n*/ w\n',
+    "// */ not a close\nq\n/* open\n*/\nr\n",
+    "p /*\n\n\n\nnever closed\n",
+    "s\n/* one */ /* two\n*/ t $ \"open\nu\n",
+    "щ = 1;\n/*\nж\n*/ ё\n",
+]
+
+
+def reference(source: str):
+    collector = DiagnosticCollector(collapse=False)
+    tokens = [str(t) for t in Scanner(source, diagnostics=collector)._tokens]
+    return tokens, [d.to_dict() for d in collector]
+
+
+def run_parallel(source: str, **kwargs):
+    collector = DiagnosticCollector(collapse=False)
+    result = lex_parallel(source, diagnostics=collector, **kwargs)
+    return result, ([str(t) for t in result.tokens], [d.to_dict() for d in collector])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64])
+@pytest.mark.parametrize("source", TRICKY_SOURCES)
+def test_matches_scanner_at_every_boundary(source: str, chunk_size: int):
+    result, outcome = run_parallel(source, jobs=8, chunk_size=chunk_size)
+    assert outcome == reference(source)
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_matches_scanner_on_golden_files(src_path: Path):
+    source = src_path.read_text(encoding="utf-8")
+    assert run_parallel(source, jobs=2, chunk_size=16)[1] == reference(source)
+
+
+def test_wrong_guesses_are_relexed():
+    # The second chunk opens with '*/' inside a string: the guess "inside a comment" is wrong
+    result, outcome = run_parallel('aaaa\n"*/" b\n', jobs=1, chunk_size=1)
+    assert result.chunks == 2 and result.mispredicted == [1]
+    assert outcome == reference('aaaa\n"*/" b\n')
+    # A chunk inside a comment that the worker could not see coming
+    result, outcome = run_parallel("/*\nx\ny\n", jobs=1, chunk_size=1)
+    assert result.mispredicted == [1, 2]
+    assert outcome == reference("/*\nx\ny\n")
+
+
+def test_chunk_lines_are_rebased_without_padding():
+    # The worker's cost must not depend on how many lines precede the chunk
+    chunk = lex_chunk("a\n  b $\n", False, line_offset=10 ** 9)
+    assert list(zip(chunk.lexemes, chunk.lines, chunk.columns)) == \
+        [("a", 10 ** 9 + 1, 1), ("b", 10 ** 9 + 2, 3), ("$", 10 ** 9 + 2, 5)]
+    assert chunk.errors == [2]
+
+
+def test_process_pool_and_symbols(capsys):
+    source = synthetic_source(200_000)
+    result = lex_parallel(source, jobs=2, chunk_size=20_000, backend="dfa", symbols=SymbolTable())
+    expected = Scanner(source, symbols=SymbolTable())._tokens
+    assert result.chunks == 8
+    assert result.tokens == expected
+    # Identifiers are interned in file order, as Scanner does
+    identifiers = [t for t in result.tokens if t.type == TokenType.IDENTIFIER]
+    assert [t.symbol_id for t in identifiers] == [t.symbol_id for t in expected if t.type == TokenType.IDENTIFIER]
+
+
+def test_split_chunks_at_line_starts():
+    source = "aaaa\nbb\n\ncccccc\nd"
+    starts = split_chunks(source, 4)
+    assert starts[0] == 0 and all(source[s - 1] == "\n" for s in starts[1:])
+    assert starts == sorted(set(starts))
+    assert split_chunks("no newline at all", 4) == [0]
+
+
+def test_cli_parallel(tmp_path: Path):
+    path = tmp_path / "big.src"
+    path.write_text("int x;\n/* a\n*/ $\n" * 50, encoding="utf-8")
+
+    def run(*args):
+        return subprocess.run([sys.executable, "-m", "src.lexer", str(path), *args], cwd=ROOT_DIR,
+                              capture_output=True, text=True, encoding="utf-8")
+
+    parallel = run("--parallel", "-j", "2")
+    sequential = run()
+    assert (parallel.returncode, parallel.stdout, parallel.stderr) == \
+        (sequential.returncode, sequential.stdout, sequential.stderr)
+    assert run("--parallel", "--mmap").returncode == 2
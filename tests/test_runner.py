@@ -1,13 +1,17 @@
 import pytest
 from pathlib import Path
 from src.lexer.scanner import Scanner
+from src.lexer.token_cache import TokenCache
 
 BASE_DIR = Path(__file__).parent
 VALID_DIR = BASE_DIR / "lexer" / "valid"
 INVALID_DIR = BASE_DIR / "lexer" / "invalid"
 
+# Opt-in persistent token cache: set MINICOMPILER_TOKEN_CACHE to a directory
+TOKEN_CACHE = TokenCache.from_env()
+
 def get_tokens_as_strings(source: str) -> list[str]:
-    scanner = Scanner(source)
+    scanner = Scanner(source, cache=TOKEN_CACHE)
     return [str(token) for token in scanner._tokens]
 
 # Collect all .src files for parameterized testing
@@ -0,0 +1,68 @@
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.tokens import TokenType
+from src.lexer.token_buffer import TokenBuffer
+
+BASE_DIR = Path(__file__).parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+
+def drain(scanner: Scanner) -> list[str]:
+    tokens = []
+    while True:
+        token = scanner.next_token()
+        tokens.append(str(token))
+        if token.type == TokenType.END_OF_FILE:
+            return tokens
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_lazy_stream_matches_eager(src_path: Path):
+    source = src_path.read_text(encoding="utf-8")
+    eager = [str(t) for t in Scanner(source)._tokens]
+    assert drain(Scanner(source, lazy=True)) == eager
+
+
+def test_lazy_does_not_scan_in_constructor():
+    scanner = Scanner("int x = 1;\n" * 1000, lazy=True)
+    assert scanner._tokens == []
+    assert scanner._current == 0
+    assert scanner.next_token().type == TokenType.KW_INT
+    assert scanner._current < 10
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_peek_and_end_behaviour(lazy: bool):
+    scanner = Scanner("a + 1", lazy=lazy)
+    assert scanner.peek_token().lexeme == "a"
+    assert scanner.next_token().lexeme == "a"
+    assert scanner.get_column() == 3
+    assert not scanner.is_at_end()
+    assert [t.type for t in scanner] == [TokenType.PLUS, TokenType.INT_LITERAL, TokenType.END_OF_FILE]
+    assert scanner.is_at_end()
+    assert str(scanner.next_token()) == "1:5 END_OF_FILE \"\""
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_compact_buffer_matches_list(src_path: Path):
+    source = src_path.read_text(encoding="utf-8")
+    eager = [str(t) for t in Scanner(source)._tokens]
+    scanner = Scanner(source, compact=True)
+    assert isinstance(scanner._tokens, TokenBuffer)
+    assert [str(t) for t in scanner._tokens] == eager
+    assert drain(scanner) == eager
+
+
+def test_token_buffer_fields_are_sliced_from_source():
+    source = 'x = 2.5; "s" true'
+    buffer = TokenBuffer.from_tokens(source, Scanner(source, lazy=True))
+    assert buffer.type_at(2) == TokenType.FLOAT_LITERAL
+    assert buffer.lexeme_at(2) == "2.5"
+    assert buffer.span_at(2) == (4, 3)
+    assert buffer.literal_at(4) == "s"
+    assert buffer.literal_at(5) is True
+    assert buffer[-1].type == TokenType.END_OF_FILE
+    assert buffer[0:2] == Scanner(source)._tokens[0:2]
+    with pytest.raises(IndexError):
+        buffer[len(buffer)]
@@ -0,0 +1,97 @@
+import io
+import json
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.serialize import TokenFile, TokenFormatError, read_jsonl, write_binary, write_lines, format_token
+from src.lexer.tokens import Token, TokenType
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+
+def scan(path: Path):
+    return Scanner(path.read_text(encoding="utf-8"))._tokens
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_binary_round_trip(src_path: Path, tmp_path: Path, capsys):
+    tokens = scan(src_path)
+    target = tmp_path / "tokens.bin"
+    with open(target, "wb") as f:
+        assert write_binary(tokens, f) == len(tokens)
+    with TokenFile(str(target)) as loaded:
+        assert len(loaded) == len(tokens)
+        assert list(loaded) == tokens
+        assert loaded[-1] == tokens[-1]
+        assert len(loaded.records) == len(tokens) * 24
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_jsonl_round_trip(src_path: Path, capsys):
+    tokens = scan(src_path)
+    out = io.StringIO()
+    write_lines((format_token(t, "jsonl") for t in tokens), out)
+    assert list(read_jsonl(out.getvalue().splitlines())) == tokens
+
+
+def test_binary_literal_kinds(tmp_path: Path):
+    tokens = [
+        Token(TokenType.INT_LITERAL, "9" * 30, 1, 1, int("9" * 30)),
+        Token(TokenType.INT_LITERAL, "7", 1, 32, 7),
+        Token(TokenType.FLOAT_LITERAL, "0.1", 1, 34, 0.1),
+        Token(TokenType.BOOL_LITERAL, "false", 1, 38, False),
+        Token(TokenType.STRING_LITERAL, '"жук"', 2, 1, "жук"),
+        Token(TokenType.ERROR, "/* x", 4, -52, "Незавершенный комментарий"),
+        Token(TokenType.END_OF_FILE, "", 4, 60, None),
+    ]
+    target = tmp_path / "tokens.bin"
+    with open(target, "wb") as f:
+        write_binary(tokens, f)
+    with TokenFile(str(target)) as loaded:
+        decoded = list(loaded)
+    assert decoded == tokens
+    assert [type(t.literal_value) for t in decoded] == [type(t.literal_value) for t in tokens]
+
+
+def test_rejects_foreign_files(tmp_path: Path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    text = tmp_path / "tokens.txt"
+    text.write_text("1:1 KW_INT \"int\"\n" * 10, encoding="utf-8")
+    for path in (empty, text):
+        with pytest.raises(TokenFormatError):
+            TokenFile(str(path))
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.lexer", *args], cwd=ROOT_DIR, capture_output=True)
+
+
+def test_cli_formats(tmp_path: Path):
+    path = BASE_DIR / "lexer" / "valid" / "test_numbers.src"
+    tokens = scan(path)
+
+    jsonl = run_cli(str(path), "--format", "jsonl")
+    assert jsonl.returncode == 0
+    assert list(read_jsonl(jsonl.stdout.decode("utf-8").splitlines())) == tokens
+
+    binary = run_cli(str(path), "--format", "binary")
+    assert binary.returncode == 0
+    target = tmp_path / "stdout.bin"
+    target.write_bytes(binary.stdout)
+    with TokenFile(str(target)) as loaded:
+        assert list(loaded) == tokens
+
+    output = tmp_path / "out.bin"
+    assert run_cli(str(path), "--format", "binary", "-o", str(output)).stdout == b""
+    assert output.read_bytes() == binary.stdout
+
+    multi = run_cli(str(BASE_DIR / "lexer" / "valid"), "--format", "jsonl", "-j", "1")
+    files = {json.loads(line)["file"] for line in multi.stdout.decode("utf-8").splitlines()}
+    assert len(files) == len(list((BASE_DIR / "lexer" / "valid").glob("*.src")))
+
+    assert run_cli(str(BASE_DIR / "lexer"), "--format", "binary").returncode == 2
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.server import (LexerSession, SEMANTIC_TOKEN_TYPES, diff_semantic_tokens,
+                              encode_message, encode_semantic_tokens, read_message, serve_connection)
+
+ROOT_DIR = Path(__file__).parent.parent
+URI = "file:///demo.src"
+TEXT = "fn main() {\n    int x = 42; // note\n    x += 1.5;\n}\n"
+
+
+def request(session: LexerSession, method: str, params: dict, request_id=1):
+    response = session.handle({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+    assert "error" not in response, response
+    # Decode the message as the client sees it (cached results are pre-encoded JSON)
+    body = encode_message(response).split(b"\r\n\r\n", 1)[1]
+    return json.loads(body)["result"]
+
+
+def notify(session: LexerSession, method: str, params: dict):
+    assert session.handle({"jsonrpc": "2.0", "method": method, "params": params}) is None
+
+
+def decode(data: list) -> list:
+    """Absolute (line, char, length, type name) of every semantic token"""
+    tokens = []
+    line = char = 0
+    for i in range(0, len(data), 5):
+        delta_line, delta_char, length, code, _ = data[i:i + 5]
+        char = char + delta_char if delta_line == 0 else delta_char
+        line += delta_line
+        tokens.append((line, char, length, SEMANTIC_TOKEN_TYPES[code]))
+    return tokens
+
+
+def test_diff_semantic_tokens():
+    old = list(range(20))
+    assert diff_semantic_tokens(old, old) == []
+    assert diff_semantic_tokens(old, old[:5] + [99] + old[7:]) == [{"start": 5, "deleteCount": 2, "data": [99]}]
+    assert diff_semantic_tokens(old, old + [1]) == [{"start": 20, "deleteCount": 0, "data": [1]}]
+    assert diff_semantic_tokens([1, 1, 1], [1, 1]) == [{"start": 2, "deleteCount": 1, "data": []}]
+
+
+def test_semantic_tokens_encoding():
+    tokens = decode(encode_semantic_tokens(Scanner(TEXT)._tokens, TEXT))
+    assert tokens[:3] == [(0, 0, 2, "keyword"), (0, 3, 4, "variable"), (1, 4, 3, "type")]
+    assert (2, 6, 2, "operator") in tokens and (2, 9, 3, "number") in tokens
+    # Delimiters, comments and EOF are not highlighted
+    assert len(tokens) == 9
+    # Characters outside the BMP take two UTF-16 code units
+    astral = 'x = "\U0001F600"; y'
+    data = encode_semantic_tokens(Scanner(astral)._tokens, astral, utf16=True)
+    assert decode(data)[-2:] == [(0, 4, 4, "string"), (0, 10, 1, "variable")]
+
+
+def test_document_cache_and_incremental_changes():
+    session = LexerSession()
+    capabilities = request(session, "initialize", {"capabilities": {"general": {"positionEncodings": ["utf-32"]}}})
+    assert capabilities["capabilities"]["positionEncoding"] == "utf-32"
+    notify(session, "textDocument/didOpen", {"textDocument": {"uri": URI, "version": 1, "text": TEXT}})
+    first = request(session, "textDocument/semanticTokens/full", {"textDocument": {"uri": URI}})
+    # The same version is served from the cache
+    cached = session.documents[URI].semantic_json
+    assert request(session, "textDocument/semanticTokens/full", {"textDocument": {"uri": URI}}) == first
+    assert session.documents[URI].semantic_json is cached
+
+    edit = {"range": {"start": {"line": 1, "character": 8}, "end": {"line": 1, "character": 9}}, "text": "total"}
+    notify(session, "textDocument/didChange", {"textDocument": {"uri": URI, "version": 2}, "contentChanges": [edit]})
+    document = session.documents[URI]
+    expected_source = TEXT.replace("int x", "int total")
+    assert document.snapshot.source == expected_source
+    assert document.snapshot.tokens == Scanner(expected_source)._tokens
+    assert document.snapshot.rescanned_tokens < len(document.snapshot.tokens)
+
+    delta = request(session, "textDocument/semanticTokens/full/delta",
+                    {"textDocument": {"uri": URI}, "previousResultId": first["resultId"]})
+    data = list(first["data"])
+    for change in delta["edits"]:
+        data[change["start"]:change["start"] + change["deleteCount"]] = change["data"]
+    assert data == encode_semantic_tokens(Scanner(expected_source)._tokens, expected_source)
+    # Symbols are scoped to the document and survive incremental edits
+    assert document.snapshot.symbols is not None and "total" in document.snapshot.symbols
+
+    tokens = request(session, "lexer/tokenize", {"text": "a $ 1"})
+    assert [t["type"] for t in tokens["tokens"]] == ["IDENTIFIER", "ERROR", "INT_LITERAL", "END_OF_FILE"]
+    assert tokens["errors"] == 1
+
+
+def test_errors_do_not_break_the_session():
+    session = LexerSession()
+    missing = session.handle({"jsonrpc": "2.0", "id": 7, "method": "textDocument/semanticTokens/full",
+                              "params": {"textDocument": {"uri": "file:///nope"}}})
+    assert missing["id"] == 7 and missing["error"]["code"] == -32602
+    unknown = session.handle({"jsonrpc": "2.0", "id": 8, "method": "nope"})
+    assert unknown["error"]["code"] == -32601
+    assert session.handle({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 1}}) is None
+    assert request(session, "lexer/tokenize", {"text": "ok"})["errors"] == 0
+
+
+def test_concurrent_socket_clients():
+    async def client(port: int, n: int) -> list:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        uri = f"file:///doc{n}.src"
+        writer.write(encode_message({"jsonrpc": "2.0", "method": "textDocument/didOpen",
+                                     "params": {"textDocument": {"uri": uri, "version": 1, "text": f"x{n} = {n};"}}}))
+        # Pipelined requests: responses come back in order
+        for i in range(5):
+            writer.write(encode_message({"jsonrpc": "2.0", "id": i, "method": "textDocument/semanticTokens/full",
+                                         "params": {"textDocument": {"uri": uri}}}))
+        results = [json.loads(await read_message(reader)) for _ in range(5)]
+        writer.close()
+        return results
+
+    async def main():
+        server = await asyncio.start_server(serve_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(*(client(port, n) for n in range(8)))
+
+    for n, results in enumerate(asyncio.run(main())):
+        assert [r["id"] for r in results] == list(range(5))
+        assert decode(results[0]["result"]["data"]) == [(0, 0, 1 + len(str(n)), "variable"),
+                                                         (0, 2 + len(str(n)), 1, "operator"),
+                                                         (0, 4 + len(str(n)), len(str(n)), "number")]
+
+
+def test_stdio_server_process():
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "lexer/tokenize", "params": {"text": "int x;"}},
+        {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+    result = subprocess.run([sys.executable, "-m", "src.lexer.server"], cwd=ROOT_DIR, timeout=30,
+                            input=b"".join(encode_message(m) for m in messages), capture_output=True)
+    assert result.returncode == 0, result.stderr
+    bodies = result.stdout.split(b"Content-Length: ")[1:]
+    responses = [json.loads(body.split(b"\r\n\r\n", 1)[1]) for body in bodies]
+    assert [r["id"] for r in responses] == [1, 2, 3]
+    assert len(responses[1]["result"]["tokens"]) == 4
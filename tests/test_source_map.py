@@ -0,0 +1,69 @@
+import io
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.source_map import SourceMap
+from src.lexer.stream import StreamScanner
+from tests.test_backends import TRICKY_SOURCES
+
+BASE_DIR = Path(__file__).parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+SOURCES = TRICKY_SOURCES + [p.read_text(encoding="utf-8") for p in src_files]
+
+
+def naive_position(source: str, offset: int) -> tuple:
+    """What the old per-character line tracking computed"""
+    line = source.count("\n", 0, offset) + 1
+    return line, offset - (source.rfind("\n", 0, offset) + 1) + 1
+
+
+@pytest.mark.parametrize("source", ["", "\n", "a", "ab\ncd\n\nef", "x\n" * 5])
+def test_position_matches_naive_line_counting(source: str):
+    source_map = SourceMap(source)
+    assert len(source_map) == source.count("\n") + 1
+    for offset in range(len(source) + 1):
+        line, column = source_map.position(offset)
+        assert (line, column) == naive_position(source, offset)
+        assert source_map.offset(line, column) == offset
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_token_positions_resolve_from_spans(source: str, capsys):
+    scanner = Scanner(source, compact=True)
+    source_map = scanner.source_map
+    for index, token in enumerate(scanner._tokens):
+        start, length = scanner._tokens.span_at(index)
+        assert source_map.token_position(start, start + length) == (token.line, token.column)
+        # The column of an unterminated comment may be negative, the offset is still exact
+        assert source_map.offset(token.line, token.column) == start
+
+
+def test_unterminated_comment_reports_end_line():
+    token = Scanner("x\n/* open\nstill\n")._tokens[1]
+    assert (token.line, token.column) == (4, -13)
+    assert SourceMap("x\n/* open\nstill\n").token_position(2, 17) == (4, -13)
+
+
+def test_snippet_underlines_the_lexeme():
+    source_map = SourceMap('int x;\n\tbad $$ here\n')
+    assert source_map.snippet(12, 2) == "    2 | \tbad $$ here\n      | \t    ^^"
+    assert source_map.line_text(2) == "\tbad $$ here"
+    # A multi-line span is underlined up to the end of its first line
+    assert source_map.snippet(4, 10).splitlines()[1] == "      |     ^^"
+
+
+def test_stream_scanner_positions_across_chunks(capsys):
+    source = "\n".join(TRICKY_SOURCES)
+    expected = Scanner(source)._tokens
+    for chunk_size in (1, 3, 64):
+        assert list(StreamScanner(io.StringIO(source), chunk_size=chunk_size)) == expected
+
+
+def test_lazy_scanner_does_not_index_the_whole_file():
+    # Positions come from a forward-only line cursor; the index is built only on request
+    scanner = Scanner("a\n" * 1000 + "b", lazy=True)
+    assert (scanner.next_token().line, scanner.next_token().line) == (1, 2)
+    assert scanner._source_map is None
+    assert list(scanner)[-2].line == 1001
+    assert scanner._source_map is None
+    assert len(scanner.source_map) == 1001
@@ -0,0 +1,78 @@
+import io
+import json
+import subprocess
+import sys
+import pytest
+from collections import Counter
+from pathlib import Path
+from src.lexer.backends import BACKENDS
+from src.lexer.scanner import Scanner
+from src.lexer.stats import LexerStats, split_gap
+from src.lexer.stream import StreamScanner
+from src.lexer.token_cache import TokenCache
+
+BASE_DIR = Path(__file__).parent
+ROOT_DIR = BASE_DIR.parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+
+def scan_with_stats(backend, source: str) -> tuple:
+    stats = LexerStats()
+    tokens = backend(source, stats=stats)._tokens
+    return tokens, stats
+
+
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_stats_are_consistent_across_backends(src_path: Path, capsys):
+    source = src_path.read_text(encoding="utf-8")
+    expected_tokens = Scanner(source)._tokens
+    reference = None
+    for backend in BACKENDS.values():
+        tokens, stats = scan_with_stats(backend, source)
+        # Instrumentation must not change the token stream
+        assert tokens == expected_tokens
+        assert stats.token_counts == Counter(t.type.name for t in tokens)
+        assert sum(stats.chars.values()) == len(source)
+        assert stats.total_errors == sum(1 for t in tokens if t.type.name == "ERROR")
+        row = (stats.token_counts, stats.chars, stats.errors)
+        assert reference is None or row == reference
+        reference = row
+
+    stream_stats = LexerStats()
+    assert list(StreamScanner(io.StringIO(source), chunk_size=7, stats=stream_stats)) == expected_tokens
+    assert (stream_stats.token_counts, stream_stats.chars, stream_stats.errors) == reference
+
+
+def test_callback_and_merge(capsys):
+    events = []
+    stats = LexerStats(callback=lambda *event: events.append(event))
+    Scanner('int x = 1; // note\n"s" @', stats=stats)
+    assert [category for category, *_ in events if category != "whitespace"] == \
+        ["identifier", "identifier", "operator", "number", "operator", "comment", "string", "operator"]
+    assert events[-1][3].type.name == "ERROR"
+    assert stats.errors == {"operator": 1}
+
+    merged = LexerStats.from_dict(json.loads(stats.to_json())).merge(stats)
+    assert merged.files == 2
+    assert merged.token_counts == stats.token_counts + stats.token_counts
+
+
+def test_split_gap():
+    assert split_gap("  // a\n /* b\n */\t") == (5, 12)
+    assert split_gap(" /* open") == (1, 7)
+
+
+def test_stats_reject_cache(tmp_path: Path):
+    with pytest.raises(ValueError):
+        Scanner("int x;", stats=LexerStats(), cache=TokenCache(tmp_path))
+
+
+def test_cli_stats_json():
+    result = subprocess.run([sys.executable, "-m", "src.lexer", str(BASE_DIR / "lexer" / "valid"),
+                             "--stats", "json", "--no-tokens", "-j", "2"],
+                            cwd=ROOT_DIR, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 0
+    stats = json.loads(result.stderr)
+    assert stats["files"] == len(list((BASE_DIR / "lexer" / "valid").glob("*.src")))
+    assert stats["errors"] == 0
+    assert stats["categories"]["comment"]["chars"] > 0
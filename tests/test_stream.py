@@ -0,0 +1,72 @@
+import io
+import pytest
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+
+BASE_DIR = Path(__file__).parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+# Tokens that straddle chunk boundaries for small chunk sizes
+BOUNDARY_SOURCES = [
+    "x = 3.14; y = 3.x;",
+    "a /* multi\nline */ b // tail\nc",
+    "long_" + "identifier" * 30 + " " + "z" * 256,
+    '"a string" "unterminated\n"at eof',
+    "a <= b && c != d || e /= f",
+    "/* never closed\n\n",
+    "привет = 1;\r\nмир = 2;",
+    "a /* star **/ b /***/ c // end",
+    "12345678901 1.2345 x1_2_3 a½b ٣٤.٥x 2²",
+]
+
+
+def reference(source: str) -> list[str]:
+    return [str(t) for t in Scanner(source)._tokens]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_stream_matches_scanner_on_golden_files(src_path: Path, chunk_size: int):
+    source = src_path.read_text(encoding="utf-8")
+    scanner = StreamScanner(io.BytesIO(source.encode("utf-8")), chunk_size=chunk_size)
+    assert [str(t) for t in scanner] == reference(source)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+@pytest.mark.parametrize("source", BOUNDARY_SOURCES)
+def test_tokens_across_chunk_boundaries(source: str, chunk_size: int):
+    expected = reference(source)
+    assert [str(t) for t in StreamScanner(io.StringIO(source), chunk_size=chunk_size)] == expected
+    # Multi-byte UTF-8 characters split by the chunk boundary
+    assert [str(t) for t in StreamScanner(io.BytesIO(source.encode("utf-8")), chunk_size=chunk_size)] == expected
+
+
+def test_window_stays_bounded():
+    chunk_size = 1024
+    line = "int value = 42; // comment\n"
+    scanner = StreamScanner(io.StringIO(line * 20000), chunk_size=chunk_size)
+    largest = 0
+    count = 0
+    for _ in scanner:
+        largest = max(largest, len(scanner._source))
+        count += 1
+    assert count == 5 * 20000 + 1
+    assert largest <= 3 * chunk_size
+
+
+def test_whitespace_run_does_not_grow_the_window():
+    chunk_size = 64
+    scanner = StreamScanner(io.StringIO("a" + " \n\t" * 10000 + "b"), chunk_size=chunk_size)
+    largest = 0
+    tokens = []
+    for token in scanner:
+        largest = max(largest, len(scanner._source))
+        tokens.append(token.lexeme)
+    assert tokens == ["a", "b", ""]
+    assert largest <= 3 * chunk_size
+
+
+def test_compact_mode_is_rejected():
+    with pytest.raises(ValueError):
+        StreamScanner(io.StringIO(""), compact=True)
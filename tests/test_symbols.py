@@ -0,0 +1,72 @@
+import io
+import pickle
+import pytest
+from pathlib import Path
+from src.lexer.backends import BACKENDS
+from src.lexer.incremental import LexSnapshot, TextEdit, relex
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.symbols import SymbolTable
+from src.lexer.token_cache import TokenCache
+from src.lexer.tokens import TokenType
+
+SOURCE = "int count = 0; count += step; fn step() { return count; } " + "y" * 256
+
+
+def identifiers(tokens) -> list:
+    return [t for t in tokens if t.type == TokenType.IDENTIFIER]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_identifiers_are_interned(backend: str, capsys):
+    table = SymbolTable()
+    tokens = BACKENDS[backend](SOURCE, symbols=table)._tokens
+    names = identifiers(tokens)
+    assert [t.symbol_id for t in names] == [0, 0, 1, 1, 0]
+    assert table.names == ["count", "step"]
+    # One string object per name, shared by lexeme and value of every occurrence
+    assert names[0].lexeme is names[1].literal_value is table.name(0)
+    # Keywords, literals and the too-long identifier error get no symbol
+    assert all(t.symbol_id is None for t in tokens if t.type != TokenType.IDENTIFIER)
+    assert "y" * 256 not in table
+
+
+def test_table_is_shared_across_files():
+    table = SymbolTable()
+    first = Scanner("a b", symbols=table)._tokens
+    second = StreamScanner(io.StringIO("b c a"), chunk_size=1, symbols=table)
+    assert [t.symbol_id for t in identifiers(first)] == [0, 1]
+    assert [t.symbol_id for t in identifiers(second)] == [1, 2, 0]
+    assert pickle.loads(pickle.dumps(table)).names == ["a", "b", "c"]
+    assert pickle.loads(pickle.dumps(SymbolTable())).intern("x") == 0
+
+
+def test_compact_and_cached_tokens_carry_symbols(tmp_path: Path):
+    Scanner(SOURCE, cache=TokenCache(tmp_path))
+    for scanner in (Scanner(SOURCE, compact=True, symbols=SymbolTable()),
+                    Scanner(SOURCE, cache=TokenCache(tmp_path), symbols=SymbolTable())):
+        assert [t.symbol_id for t in identifiers(scanner._tokens)] == [0, 0, 1, 1, 0]
+    # A warm cache read out of order still numbers names in file order
+    Scanner("b a b c a", cache=TokenCache(tmp_path))
+    table = SymbolTable()
+    tokens = Scanner("b a b c a", compact=True, cache=TokenCache(tmp_path), symbols=table)._tokens
+    assert tokens[4].symbol_id == 1 and table.names == ["b", "a", "c"]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_interning_is_opt_in(backend: str, capsys):
+    scanner = BACKENDS[backend](SOURCE)
+    assert scanner.symbols is None
+    assert all(t.symbol_id is None for t in scanner._tokens)
+    assert [t.lexeme for t in identifiers(scanner._tokens)] == ["count", "count", "step", "step", "count"]
+    assert all(t.lexeme == t.literal_value for t in identifiers(scanner._tokens))
+    stream = StreamScanner(io.StringIO(SOURCE), chunk_size=4)
+    assert all(t.symbol_id is None for t in stream) and stream.symbols is None
+
+
+def test_relex_keeps_symbol_ids_consistent():
+    snapshot = LexSnapshot.from_source("a = b;\nc = a;\n", symbols=SymbolTable())
+    edited = relex(snapshot, TextEdit(0, 1, "d"))
+    assert [(t.lexeme, t.symbol_id) for t in identifiers(edited.tokens)] == \
+        [("d", 3), ("b", 1), ("c", 2), ("a", 0)]
+    assert edited.symbols is snapshot.symbols
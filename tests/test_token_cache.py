@@ -0,0 +1,83 @@
+import os
+import time
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from src.lexer.scanner import Scanner
+from src.lexer.dfa_scanner import DFAScanner
+from src.lexer.token_cache import TokenCache
+
+BASE_DIR = Path(__file__).parent
+src_files = sorted((BASE_DIR / "lexer").rglob("*.src"))
+
+
+def no_lexing(self):
+    pytest.fail("source was lexed despite a warm cache")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("src_path", src_files, ids=lambda p: p.name)
+def test_warm_cache_skips_lexing(src_path: Path, lazy: bool, tmp_path: Path, monkeypatch, capsys):
+    source = src_path.read_text(encoding="utf-8")
+    cold = Scanner(source, lazy=lazy, cache=TokenCache(tmp_path))
+    expected = [str(t) for t in cold]
+    expected_after_end = str(cold.next_token())
+    expected_stderr = capsys.readouterr().err
+
+    monkeypatch.setattr(Scanner, "_token_stream", no_lexing)
+    cache = TokenCache(tmp_path)
+    warm = Scanner(source, lazy=lazy, cache=cache)
+    assert [str(t) for t in warm] == expected
+    assert cache.hits == 1
+    # Error messages are replayed and the scanner ends in the same state
+    assert capsys.readouterr().err == expected_stderr
+    assert str(warm.next_token()) == expected_after_end
+
+
+def test_cache_key_depends_on_content_and_backend(tmp_path: Path):
+    cache = TokenCache(tmp_path)
+    Scanner("int a;", cache=cache)
+    Scanner("int b;", cache=cache)
+    DFAScanner("int a;", cache=cache)
+    assert cache.hits == 0 and cache.misses == 3
+    Scanner("int a;", cache=cache)
+    assert cache.hits == 1
+
+
+def test_corrupt_entry_is_treated_as_miss(tmp_path: Path):
+    cache = TokenCache(tmp_path)
+    Scanner("x = 1;", cache=cache)
+    entry = next(tmp_path.rglob("*.tok"))
+    entry.write_bytes(b"garbage")
+    assert [str(t) for t in Scanner("x = 1;", cache=cache)._tokens] == [str(t) for t in Scanner("x = 1;")._tokens]
+    assert cache.hits == 0
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path: Path):
+    cache = TokenCache(tmp_path, max_bytes=10**9)
+    sources = [f"int v{i} = {i};" for i in range(10)]
+    for i, source in enumerate(sources):
+        Scanner(source, cache=cache)
+        entry = Path(cache._path(cache.key(source, "Scanner")))
+        os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+    cache.get(sources[0], "Scanner")  # refreshes the oldest entry
+    entry_size = cache.size() // len(sources)
+    cache.evict(entry_size * 3)
+    assert cache.size() <= entry_size * 3
+    assert cache.get(sources[0], "Scanner") is not None
+    assert cache.get(sources[-1], "Scanner") is not None
+    assert cache.get(sources[1], "Scanner") is None
+
+
+def _lex_with_cache(args):
+    directory, source = args
+    return [str(t) for t in Scanner(source, cache=TokenCache(directory))._tokens]
+
+
+def test_concurrent_writers_share_entries(tmp_path: Path):
+    source = "fn main() { return 1 + 2; }"
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_lex_with_cache, [(str(tmp_path), source)] * 16))
+    assert all(result == results[0] for result in results)
+    assert len(list(tmp_path.rglob("*.tok"))) == 1
+    assert not list(tmp_path.rglob("*.tmp"))
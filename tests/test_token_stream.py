@@ -0,0 +1,94 @@
+import io
+import pytest
+from src.lexer.diagnostics import DiagnosticCollector
+from src.lexer.scanner import Scanner
+from src.lexer.stream import StreamScanner
+from src.lexer.token_stream import TokenStream
+from src.lexer.tokens import TokenType
+
+SOURCE = "int x = 1; $ x += 2.5; /* c */ fn f() { return x; }"
+
+
+def lexemes(tokens) -> list:
+    return [t.lexeme for t in tokens]
+
+
+def test_matches_scanner_and_repeats_eof(capsys):
+    expected = Scanner(SOURCE)._tokens
+    stream = TokenStream(Scanner(SOURCE, lazy=True), capacity=2)
+    assert list(stream) == expected
+    assert stream.next() == expected[-1] and stream.peek(5) == expected[-1]
+    assert stream.at_end()
+
+
+def test_peek_arbitrary_distance(capsys):
+    expected = Scanner(SOURCE)._tokens
+    stream = TokenStream(Scanner(SOURCE, lazy=True), capacity=4)
+    assert stream.peek(10) == expected[10]
+    assert [stream.peek(k) for k in range(len(expected))] == expected
+    assert stream.peek(len(expected) + 100) == expected[-1]
+    stream.next()
+    assert stream.peek(0) == expected[1] and stream.position == 1
+    with pytest.raises(ValueError):
+        stream.peek(-1)
+
+
+def test_errors_are_skipped_but_still_reported():
+    collector = DiagnosticCollector()
+    stream = TokenStream(Scanner(SOURCE, lazy=True, diagnostics=collector), skip={TokenType.ERROR})
+    tokens = list(stream)
+    assert "$" not in lexemes(tokens)
+    assert lexemes(tokens) == [t.lexeme for t in Scanner(SOURCE)._tokens if t.type != TokenType.ERROR]
+    assert [d.lexeme for d in collector] == ["$"]
+
+
+def test_mark_reset_release(capsys):
+    stream = TokenStream(Scanner(SOURCE, lazy=True), capacity=2)
+    stream.next()
+    outer = stream.mark()
+    first = [stream.next() for _ in range(3)]
+    inner = stream.mark()
+    ahead = [stream.next() for _ in range(8)]
+    stream.reset(inner)
+    assert [stream.next() for _ in range(8)] == ahead
+    stream.reset(outer)
+    assert [stream.next() for _ in range(3)] == first
+    # The mark stays live after reset, so a parser can retry several alternatives
+    stream.reset(outer)
+    assert stream.next() == first[0]
+    stream.release(inner)
+    stream.release(outer)
+    with pytest.raises(ValueError):
+        stream.reset(outer)
+    with pytest.raises(ValueError):
+        stream.release(outer)
+    assert lexemes(stream)[:2] == ["=", "1"]
+
+
+def test_memory_is_bounded_without_marks():
+    line = "int value = 42; // comment\n"
+    stream = TokenStream(StreamScanner(io.StringIO(line * 5000), chunk_size=256), capacity=8)
+    largest = 0
+    while not stream.at_end():
+        stream.peek(3)
+        stream.next()
+        largest = max(largest, stream.retained)
+    assert largest <= 4
+    assert len(stream._buffer) == 8
+
+
+def test_marked_region_is_released():
+    stream = TokenStream(Scanner("a " * 1000, lazy=True), capacity=8)
+    mark = stream.mark()
+    for _ in range(500):
+        stream.next()
+    assert stream.retained == 500
+    nested = stream.mark()
+    stream.mark()  # the same position marked twice
+    stream.release(mark)
+    assert stream.retained == 0
+    stream.release(nested)
+    assert stream.retained == 0 and len(stream._buffer) > 8
+    stream.release(nested)
+    assert len(stream._buffer) == 8
+    assert stream.next().lexeme == "a" and stream.position == 501